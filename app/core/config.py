@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import Field, ConfigDict
 from functools import lru_cache
 
@@ -10,12 +10,20 @@ class Settings(BaseSettings):
     db_password: str = Field(env="DB_PASSWORD")
     db_host: str = Field(env="DB_HOST")
     db_port: int = Field(env="DB_PORT")
+    DB_POOL_MIN_SIZE: int = Field(default=1, env="DB_POOL_MIN_SIZE")
+    DB_POOL_MAX_SIZE: int = Field(default=10, env="DB_POOL_MAX_SIZE")
+    DB_POOL_TIMEOUT: float = Field(default=5.0, env="DB_POOL_TIMEOUT")
+    DB_POOL_HEALTH_CHECK: bool = Field(default=True, env="DB_POOL_HEALTH_CHECK")
     
     # Configuración de AWS S3
     aws_access_key_id: str = Field(env="AWS_ACCESS_KEY_ID")
     aws_secret_access_key: str = Field(env="AWS_SECRET_ACCESS_KEY")
     aws_bucket_name: str = Field(env="AWS_BUCKET_NAME")
     
+    # Almacén de PDFs referenciados desde los mensajes ("s3" o "local")
+    BLOB_STORE_BACKEND: str = Field(default="local", env="BLOB_STORE_BACKEND")
+    LOCAL_BLOB_DIR: str = Field(default="/tmp/capp_blobs", env="LOCAL_BLOB_DIR")
+    
     # Configuración de RabbitMQ
     RABBITMQ_HOST: str = Field(default="localhost", env="RABBITMQ_HOST")
     RABBITMQ_PORT: int = Field(default=5672, env="RABBITMQ_PORT")
@@ -29,6 +37,9 @@ class Settings(BaseSettings):
     
     # Límites de archivos
     MAX_FILES: int = Field(default=100, env="MAX_FILES")
+    # Subidas en streaming: tamaño máximo por archivo y directorio de los temporales
+    MAX_UPLOAD_SIZE: int = Field(default=512 * 1024 * 1024, env="MAX_UPLOAD_SIZE")
+    UPLOAD_DIR: str = Field(default="/tmp", env="UPLOAD_DIR")
     ALLOWED_EXTENSIONS: set = {'.pdf'}
     BATCH_SIZE: int = Field(default=5, env="BATCH_SIZE")
     
@@ -37,13 +48,104 @@ class Settings(BaseSettings):
     aws_secret_access_key: Optional[str] = Field(default=None, env="AWS_SECRET_ACCESS_KEY")
     aws_bucket_name: Optional[str] = Field(default=None, env="AWS_BUCKET_NAME")
     
-    # Configuración de workers
+    # Configuración de workers: *_WORKERS son los handlers concurrentes de cada
+    # proceso consumidor (no el número de procesos, que es *_PROCESSES)
     UPLOAD_WORKERS: int = Field(default=2, env="UPLOAD_WORKERS")
     PROCESSING_WORKERS: int = Field(default=3, env="PROCESSING_WORKERS")
+    UPLOAD_PREFETCH: int = Field(default=4, env="UPLOAD_PREFETCH")
+    PROCESSING_PREFETCH: int = Field(default=3, env="PROCESSING_PREFETCH")
+    CONSUMER_DRAIN_TIMEOUT: float = Field(default=30.0, env="CONSUMER_DRAIN_TIMEOUT")
+    
+    # Supervisor de procesos worker (app/workers.py): procesos por cola
+    UPLOAD_PROCESSES: int = Field(default=1, env="UPLOAD_PROCESSES")
+    PROCESSING_PROCESSES: int = Field(default=2, env="PROCESSING_PROCESSES")
+    WORKER_AUTOSCALE: bool = Field(default=False, env="WORKER_AUTOSCALE")
+    WORKER_MAX_PROCESSES: int = Field(default=4, env="WORKER_MAX_PROCESSES")
+    AUTOSCALE_MESSAGES_PER_WORKER: int = Field(default=10, env="AUTOSCALE_MESSAGES_PER_WORKER")
+    # Tiempo con menos carga de la necesaria antes de retirar cada worker
+    AUTOSCALE_SCALE_DOWN_DELAY: float = Field(default=120.0, env="AUTOSCALE_SCALE_DOWN_DELAY")
+    SUPERVISOR_INTERVAL: float = Field(default=2.0, env="SUPERVISOR_INTERVAL")
+    WORKER_RESTART_BACKOFF: float = Field(default=1.0, env="WORKER_RESTART_BACKOFF")
+    WORKER_RESTART_BACKOFF_MAX: float = Field(default=60.0, env="WORKER_RESTART_BACKOFF_MAX")
+    WORKER_STATUS_PORT: int = Field(default=8081, env="WORKER_STATUS_PORT")
+    
+    # Extracción de PDF
+    PDF_EXTRACTION_MODE: str = Field(default="process", env="PDF_EXTRACTION_MODE")
+    PDF_EXTRACTION_WORKERS: int = Field(default=4, env="PDF_EXTRACTION_WORKERS")
+    PDF_PAGES_PER_TASK: int = Field(default=8, env="PDF_PAGES_PER_TASK")
+    # Motor por defecto ("auto", "layout" o "fast"); "auto" usa "fast" desde N páginas
+    EXTRACTION_ENGINE: str = Field(default="auto", env="EXTRACTION_ENGINE")
+    FAST_ENGINE_PAGE_THRESHOLD: int = Field(default=200, env="FAST_ENGINE_PAGE_THRESHOLD")
+    # Copiar las imágenes embebidas al almacén de blobs (claves por contenido)
+    IMAGE_SPILL: bool = Field(default=False, env="IMAGE_SPILL")
+    
+    # Control de admisión de la API
+    MAX_CONCURRENT_EXTRACTIONS: int = Field(default=2, env="MAX_CONCURRENT_EXTRACTIONS")
+    EXTRACTION_QUEUE_DEPTH: int = Field(default=8, env="EXTRACTION_QUEUE_DEPTH")
+    RETRY_AFTER_SECONDS: int = Field(default=5, env="RETRY_AFTER_SECONDS")
+    BLOCKING_IO_WORKERS: int = Field(default=8, env="BLOCKING_IO_WORKERS")
+    
+    # Caché de resultados de extracción por hash de contenido
+    RESULT_CACHE_BACKEND: str = Field(default="local", env="RESULT_CACHE_BACKEND")
+    RESULT_CACHE_TTL: int = Field(default=86400, env="RESULT_CACHE_TTL")
+    RESULT_CACHE_MAX_ENTRIES: int = Field(default=256, env="RESULT_CACHE_MAX_ENTRIES")
+    REDIS_HOST: str = Field(default="localhost", env="REDIS_HOST")
+    REDIS_PORT: int = Field(default=6379, env="REDIS_PORT")
+    REDIS_DB: int = Field(default=0, env="REDIS_DB")
+    # Caché de páginas por hash de contenido (directorio vacío: solo en memoria)
+    PAGE_CACHE_ENABLED: bool = Field(default=True, env="PAGE_CACHE_ENABLED")
+    PAGE_CACHE_MAX_ENTRIES: int = Field(default=4096, env="PAGE_CACHE_MAX_ENTRIES")
+    PAGE_CACHE_DIR: str = Field(default="", env="PAGE_CACHE_DIR")
+    PAGE_CACHE_MAX_BYTES: int = Field(default=1024 ** 3, env="PAGE_CACHE_MAX_BYTES")
+    
+    # Modelos NLP precargados al arrancar (formato "tipo:nombre")
+    API_PRELOAD_MODELS: List[str] = Field(default=[], env="API_PRELOAD_MODELS")
+    WORKER_PRELOAD_MODELS: List[str] = Field(
+        default=[
+            "spacy:es_core_news_lg",
+            "sentence_transformer:sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+            "summarizer:facebook/bart-large-cnn"
+        ],
+        env="WORKER_PRELOAD_MODELS"
+    )
+    
+    # Embeddings por párrafo
+    EMBEDDING_BATCH_SIZE: int = Field(default=256, env="EMBEDDING_BATCH_SIZE")
+    EMBEDDING_CACHE_DIR: str = Field(default="/tmp/capp_embeddings", env="EMBEDDING_CACHE_DIR")
+    EMBEDDING_CACHE_DTYPE: str = Field(default="float16", env="EMBEDDING_CACHE_DTYPE")
+    
+    # Extracción de entidades (spaCy nlp.pipe)
+    NER_BATCH_SIZE: int = Field(default=64, env="NER_BATCH_SIZE")
+    NER_N_PROCESS: int = Field(default=1, env="NER_N_PROCESS")
+    
+    # Resumen map-reduce por fragmentos
+    SUMMARY_CHUNK_TOKENS: int = Field(default=900, env="SUMMARY_CHUNK_TOKENS")
+    SUMMARY_BATCH_SIZE: int = Field(default=4, env="SUMMARY_BATCH_SIZE")
+    SUMMARY_THREADS: int = Field(default=0, env="SUMMARY_THREADS")
+    SUMMARY_CACHE_MAX_ENTRIES: int = Field(default=4096, env="SUMMARY_CACHE_MAX_ENTRIES")
+    
+    # Índice de similitud entre documentos
+    VECTOR_INDEX_DIR: str = Field(default="/tmp/capp_vector_index", env="VECTOR_INDEX_DIR")
+    VECTOR_INDEX_MODE: str = Field(default="auto", env="VECTOR_INDEX_MODE")
+    VECTOR_INDEX_IVF_THRESHOLD: int = Field(default=20000, env="VECTOR_INDEX_IVF_THRESHOLD")
+    VECTOR_INDEX_NPROBE: int = Field(default=8, env="VECTOR_INDEX_NPROBE")
+    
+    # Pipeline de análisis (ProcessDocumentUseCase)
+    PIPELINE_STAGE_WORKERS: int = Field(default=4, env="PIPELINE_STAGE_WORKERS")
+    PIPELINE_STAGE_TIMEOUTS: Dict[str, float] = Field(
+        default={"clean": 30, "embeddings": 120, "entities": 120, "summary": 240},
+        env="PIPELINE_STAGE_TIMEOUTS"
+    )
+    PIPELINE_OPTIONAL_STAGES: List[str] = Field(
+        default=["embeddings", "entities", "summary"], env="PIPELINE_OPTIONAL_STAGES"
+    )
+    PIPELINE_SKIP_STAGES: List[str] = Field(default=[], env="PIPELINE_SKIP_STAGES")
     
-    # Timeouts y reintentos
+    # Timeouts y reintentos (en la cola de procesamiento el timeout es por
+    # documento y no puede ser menor que el peor caso de PIPELINE_STAGE_TIMEOUTS)
     MESSAGE_PROCESSING_TIMEOUT: int = Field(default=300, env="MESSAGE_PROCESSING_TIMEOUT")
     MAX_RETRIES: int = Field(default=3, env="MAX_RETRIES")
+    RETRY_BASE_DELAY: float = Field(default=5.0, env="RETRY_BASE_DELAY")
     
     model_config = ConfigDict(
         env_file=".env",
@@ -1,10 +1,39 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
 from app.domain.entities.document import Document
 
-class DocumentRepository:
+class DocumentRepository(ABC):
+    @abstractmethod
     def save_document(self, document: Document):
-        # Implementar lógica para guardar el documento en la base de datos
+        """Guarda el documento en la base de datos"""
         pass
 
-    def get_document(self, document_id: str) -> Document:
-        # Implementar lógica para recuperar el documento de la base de datos
+    @abstractmethod
+    def get_document(self, document_id: str) -> Optional[Dict]:
+        """Recupera el documento de la base de datos"""
+        pass
+
+    @abstractmethod
+    def save_paragraphs(self, document_id: str, paragraphs: List[Dict]):
+        """Guarda un lote de párrafos del documento"""
+        pass
+
+    @abstractmethod
+    def save_document_analysis(self, document_id: str, analysis_data: Dict):
+        """Guarda el análisis completo del documento"""
+        pass
+
+    @abstractmethod
+    def get_document_analysis(self, document_id: str) -> Optional[Dict]:
+        """Recupera el análisis del documento"""
+        pass
+
+    @abstractmethod
+    def update_status(self, document_id: str, status: str):
+        """Actualiza el estado de procesamiento del documento"""
+        pass
+
+    @abstractmethod
+    def close(self):
+        """Libera los recursos del repositorio"""
         pass
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    """Sustituto en memoria de RedisCache (LRU, mismo contrato de métodos)"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cache_document_analysis(
+        self,
+        document_id: str,
+        analysis_data: Dict[str, Any],
+        ttl: Optional[int] = None
+    ) -> bool:
+        """Almacena el análisis serializado, igual que en Redis"""
+        try:
+            data = json.dumps(analysis_data)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Análisis no serializable, no se guarda en caché: {e}")
+            return False
+        with self._lock:
+            self._entries[document_id] = data
+            self._entries.move_to_end(document_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def get_document_analysis(self, document_id: str) -> Optional[Dict]:
+        with self._lock:
+            data = self._entries.get(document_id)
+            if data is None:
+                return None
+            self._entries.move_to_end(document_id)
+        return json.loads(data)
+
+
+class DiskBackedCache(LocalCache):
+    """LRU en memoria respaldado por ficheros JSON en ``cache_dir``.
+
+    Las entradas expulsadas de memoria (o de un proceso anterior) se leen
+    del disco y vuelven al LRU. En disco las entradas caducan a los ``ttl``
+    segundos de escribirse y el directorio se poda por último acceso al
+    superar ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 256, max_bytes: int = 1024 ** 3, ttl: Optional[int] = None):
+        super().__init__(max_entries=max_entries)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+        self._disk_bytes = sum(size for _, _, _, size in self._scan())
+
+    def _path(self, key: str) -> str:
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, name[:2], f"{name}.json")
+
+    def _scan(self):
+        """(ruta, último acceso, escritura, tamaño) de cada entrada en disco"""
+        for directory in os.scandir(self.cache_dir):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, stat.st_atime, stat.st_mtime, stat.st_size
+
+    def _expired(self, written_at: float, now: float) -> bool:
+        return self.ttl is not None and written_at + self.ttl < now
+
+    def _prune(self):
+        """Borra las entradas caducadas y las de acceso más antiguo hasta quedar por debajo del 90% de ``max_bytes``"""
+        now = time.time()
+        entries = sorted(self._scan(), key=lambda entry: entry[1])
+        total = sum(entry[3] for entry in entries)
+        target = self.max_bytes * 0.9
+        for path, _, written_at, size in entries:
+            if total <= target and not self._expired(written_at, now):
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def cache_document_analysis(
+        self,
+        document_id: str,
+        analysis_data: Dict[str, Any],
+        ttl: Optional[int] = None
+    ) -> bool:
+        if not super().cache_document_analysis(document_id, analysis_data, ttl):
+            return False
+        path = self._path(document_id)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self._entries[document_id])
+                size = f.tell()
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._disk_bytes += size
+                prune = self._disk_bytes > self.max_bytes
+            if prune:
+                self._prune()
+        except (OSError, KeyError) as e:
+            logger.error(f"Error guardando en disco la entrada de caché {document_id}: {e}")
+        return True
+
+    def get_document_analysis(self, document_id: str) -> Optional[Dict]:
+        result = super().get_document_analysis(document_id)
+        if result is not None:
+            return result
+        path = self._path(document_id)
+        try:
+            written_at = os.stat(path).st_mtime
+            now = time.time()
+            if self._expired(written_at, now):
+                os.remove(path)
+                return None
+            with open(path, encoding="utf-8") as f:
+                data = f.read()
+            # El acceso ordena la poda; la fecha de escritura fija la caducidad
+            os.utime(path, (now, written_at))
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._entries[document_id] = data
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return json.loads(data)
+
+
+class ExtractionResultCache:
+    """Caché de resultados de extracción indexada por el SHA-256 del PDF.
+
+    La clave incluye la huella del extractor (versión y ``LAParams``) para
+    que un cambio de configuración invalide los resultados anteriores.
+    """
+
+    def __init__(self, backend, ttl: Optional[int] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, content_hash: str, fingerprint: str) -> str:
+        return f"extraction:{kind}:{content_hash}:{fingerprint}"
+
+    def get(self, kind: str, content_hash: str, fingerprint: str, file_size: int = 0) -> Optional[Dict]:
+        try:
+            result = self.backend.get_document_analysis(self.key(kind, content_hash, fingerprint))
+        except Exception as e:
+            self.logger.error(f"Error consultando la caché de resultados: {e}")
+            result = None
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.bytes_saved += file_size
+        return result
+
+    def put(self, kind: str, content_hash: str, fingerprint: str, result: Dict) -> bool:
+        # Un fallo de la caché no debe hacer fallar una extracción correcta
+        try:
+            return self.backend.cache_document_analysis(
+                self.key(kind, content_hash, fingerprint), result, self.ttl
+            )
+        except Exception as e:
+            self.logger.error(f"Error guardando en la caché de resultados: {e}")
+            return False
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend.__class__.__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0,
+                "bytes_saved": self.bytes_saved
+            }
+
+
+def build_cache_backend(max_entries: int):
+    """Redis o, por defecto, un LRU local propio de quien lo pide"""
+    settings = get_settings()
+    if settings.RESULT_CACHE_BACKEND == "redis":
+        from app.infraestructure.cache.redis_cache import RedisCache
+        return RedisCache(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+    return LocalCache(max_entries=max_entries)
+
+
+@lru_cache()
+def get_result_cache() -> ExtractionResultCache:
+    settings = get_settings()
+    backend = build_cache_backend(settings.RESULT_CACHE_MAX_ENTRIES)
+    return ExtractionResultCache(backend, ttl=settings.RESULT_CACHE_TTL)
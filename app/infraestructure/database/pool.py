@@ -0,0 +1,161 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from psycopg2 import OperationalError, extensions
+from psycopg2.pool import ThreadedConnectionPool
+from app.core.config import get_settings
+
+
+class PoolTimeoutError(Exception):
+    """No se obtuvo una conexión libre dentro del tiempo de espera."""
+
+
+class PostgresConnectionPool:
+    """Pool de conexiones compartido por todas las peticiones del proceso.
+
+    Añade a ``ThreadedConnectionPool`` un tiempo máximo de espera al pedir
+    conexión, comprobación de salud al entregarla y métricas de uso.
+    """
+
+    def __init__(
+        self,
+        min_size: int,
+        max_size: int,
+        checkout_timeout: float,
+        health_check: bool = True,
+        **connect_kwargs
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check = health_check
+        self._pool = ThreadedConnectionPool(min_size, max_size, **connect_kwargs)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.discarded = 0
+        self.total_wait_seconds = 0.0
+
+    def getconn(self):
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise PoolTimeoutError(
+                f"Sin conexiones libres tras {self.checkout_timeout}s (máximo {self.max_size})"
+            )
+        try:
+            # Tras un corte pueden estar caídas todas las conexiones libres: se
+            # descartan hasta dar con una sana; la última en probarse ya es nueva
+            for _ in range(self.max_size + 1):
+                connection = self._pool.getconn()
+                if self._is_healthy(connection):
+                    break
+                self._pool.putconn(connection, close=True)
+                with self._lock:
+                    self.discarded += 1
+            else:
+                raise OperationalError(f"Ninguna conexión sana tras {self.max_size + 1} intentos")
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.total_wait_seconds += time.perf_counter() - start
+        return connection
+
+    def putconn(self, connection):
+        close = bool(connection.closed)
+        if not close and connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            # No devolver al pool transacciones a medias
+            try:
+                connection.rollback()
+            except Exception:
+                close = True
+        try:
+            self._pool.putconn(connection, close=close)
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        connection = self.getconn()
+        try:
+            yield connection
+        finally:
+            self.putconn(connection)
+
+    def _is_healthy(self, connection) -> bool:
+        if connection.closed:
+            return False
+        if not self.health_check:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except Exception as e:
+            self.logger.warning(f"Conexión descartada por health check: {e}")
+            return False
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "in_use": self.in_use,
+                "utilization": self.in_use / self.max_size if self.max_size else 0,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "discarded_connections": self.discarded,
+                "average_wait_seconds": self.total_wait_seconds / self.checkouts if self.checkouts else 0
+            }
+
+    def close(self):
+        self._pool.closeall()
+
+
+_pool: Optional[PostgresConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> PostgresConnectionPool:
+    """Pool del proceso; se crea en el arranque o en el primer uso"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            settings = get_settings()
+            _pool = PostgresConnectionPool(
+                min_size=settings.DB_POOL_MIN_SIZE,
+                max_size=settings.DB_POOL_MAX_SIZE,
+                checkout_timeout=settings.DB_POOL_TIMEOUT,
+                health_check=settings.DB_POOL_HEALTH_CHECK,
+                dbname=settings.db_name,
+                user=settings.db_user,
+                password=settings.db_password,
+                host=settings.db_host,
+                port=settings.db_port
+            )
+        return _pool
+
+
+def get_pool_metrics() -> Dict:
+    return _pool.get_metrics() if _pool is not None else {}
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
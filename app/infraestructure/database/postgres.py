@@ -1,107 +1,61 @@
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import io
+import os
 import psycopg2
 import json
 import uuid
 from app.domain.entities.document import Document
+from app.domain.repositories.document_repository import DocumentRepository
+from app.infraestructure.database.pool import PostgresConnectionPool, get_pool
 from datetime import datetime
-from app.core.config import get_settings
 
-class PostgresDatabase:
-    def __init__(self):
-        settings = get_settings()
+# Caracteres con significado especial en el formato texto de COPY
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r'
+})
+
+
+def copy_value(value) -> str:
+    """Representa un valor en el formato texto de COPY (NULL como \\N)"""
+    if value is None:
+        return '\\N'
+    return str(value).translate(COPY_ESCAPES)
+
+
+def batch_uuid4(count: int) -> List[str]:
+    """Genera ``count`` UUID4 a partir de una sola lectura de os.urandom"""
+    random_bytes = os.urandom(16 * count)
+    return [
+        str(uuid.UUID(bytes=random_bytes[i:i + 16], version=4))
+        for i in range(0, 16 * count, 16)
+    ]
+
+
+class PostgresDatabase(DocumentRepository):
+    def __init__(self, pool: Optional[PostgresConnectionPool] = None):
+        """Toma una conexión del pool compartido; ``close`` la devuelve."""
+        self.pool = pool or get_pool()
+        self.connection = self.pool.getconn()
         try:
-            self.connection = psycopg2.connect(
-                dbname=settings.db_name,
-                user=settings.db_user,
-                password=settings.db_password,
-                host=settings.db_host,
-                port=settings.db_port
-            )
             self.cursor = self.connection.cursor()
-            print("Conexión a PostgreSQL establecida.")
         except Exception as e:
+            self.pool.putconn(self.connection)
             print(f"Error al conectar a PostgreSQL: {e}")
             raise e
     
-    def save_document_analysis(self, document_id: str, analysis_data: Dict):
-        """Guarda el análisis completo del documento."""
-        insert_analysis = """
-        INSERT INTO document_analysis (
-            document_id, 
-            total_paragraphs,
-            total_sentences,
-            total_entities
-        ) VALUES (%s, %s, %s, %s)
-        """
-        insert_paragraph = """
-        INSERT INTO paragraphs (
-            paragraph_id,
-            document_id,
-            text,
-            position,
-            style_info,
-            linguistic_features
-        ) VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        insert_entity = """
-        INSERT INTO entities (
-            document_id,
-            paragraph_id,
-            entity_text,
-            entity_label,
-            start_char,
-            end_char,
-            context
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        try:
-            self.cursor.execute("BEGIN;")
-            
-            # Insertar análisis del documento
-            self.cursor.execute(insert_analysis, (
-                document_id,
-                analysis_data.get('total_paragraphs'),
-                analysis_data.get('total_sentences'),
-                analysis_data.get('total_entities')
-            ))
-            
-            # Insertar párrafos
-            for paragraph_text in analysis_data.get('paragraphs', []):
-                paragraph_id = str(uuid.uuid4())
-                self.cursor.execute(insert_paragraph, (
-                    paragraph_id,
-                    document_id,
-                    paragraph_text,
-                    json.dumps({}),  # Asigna posición si está disponible
-                    json.dumps({}),  # Asigna estilo si está disponible
-                    json.dumps({})   # Asigna características lingüísticas si están disponibles
-                ))
-            
-            # Aquí puedes insertar entidades si las tienes
-            # for entity in analysis_data.get('entities', []):
-            #     self.cursor.execute(insert_entity, (
-            #         document_id,
-            #         entity.get('paragraph_id'),
-            #         entity.get('entity_text'),
-            #         entity.get('entity_label'),
-            #         entity.get('start_char'),
-            #         entity.get('end_char'),
-            #         entity.get('context')
-            #     ))
-            
-            self.connection.commit()
-            print("Análisis del documento guardado exitosamente.")
-        
-        except Exception as e:
-            self.connection.rollback()
-            print(f"Error al guardar el análisis del documento: {e}")
-            raise e
-
     def save_document(self, document: Document):
-        """Guarda un documento en la base de datos."""
+        """Guarda un documento en la base de datos.
+
+        Es idempotente: un mensaje reentregado tras el commit no falla por la
+        clave primaria, deja el registro existente.
+        """
         insert_doc = """
         INSERT INTO documents (id, filename, created_at, metadata)
         VALUES (%s, %s, %s, %s)
+        ON CONFLICT (id) DO NOTHING
         """
         try:
             self.cursor.execute(insert_doc, (
@@ -118,7 +72,13 @@ class PostgresDatabase:
             raise e
 
     def save_document_analysis(self, document_id: str, analysis_data: Dict):
-        """Guarda el análisis completo del documento."""
+        """Guarda el análisis completo del documento.
+
+        Los párrafos (textos o diccionarios) y sus entidades se escriben con
+        ``COPY FROM STDIN`` en la misma transacción que el análisis. Las
+        entidades pueden venir anidadas en cada párrafo o en
+        ``analysis_data['entities']`` con su ``paragraph_index``.
+        """
         insert_analysis = """
         INSERT INTO document_analysis (
             document_id, 
@@ -127,30 +87,7 @@ class PostgresDatabase:
             total_entities
         ) VALUES (%s, %s, %s, %s)
         """
-        insert_paragraph = """
-        INSERT INTO paragraphs (
-            paragraph_id,
-            document_id,
-            text,
-            position,
-            style_info,
-            linguistic_features
-        ) VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        insert_entity = """
-        INSERT INTO entities (
-            document_id,
-            paragraph_id,
-            entity_text,
-            entity_label,
-            start_char,
-            end_char,
-            context
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
         try:
-            self.cursor.execute("BEGIN;")
-            
             # Insertar análisis del documento
             self.cursor.execute(insert_analysis, (
                 document_id,
@@ -160,27 +97,21 @@ class PostgresDatabase:
             ))
 
             # Insertar párrafos y entidades
-            for paragraph in analysis_data.get('paragraphs', []):
-                paragraph_id = str(uuid.uuid4())
-                self.cursor.execute(insert_paragraph, (
-                    paragraph_id,
-                    document_id,
-                    paragraph.get('text'),
-                    json.dumps(paragraph.get('position')),
-                    json.dumps(paragraph.get('style_info')),
-                    json.dumps(paragraph.get('linguistic_features'))
-                ))
+            paragraphs = [
+                {'text': paragraph} if isinstance(paragraph, str) else paragraph
+                for paragraph in analysis_data.get('paragraphs', [])
+            ]
+            paragraph_ids = self._copy_paragraphs(document_id, paragraphs)
 
+            entities = []
+            for paragraph_id, paragraph in zip(paragraph_ids, paragraphs):
                 for entity in paragraph.get('entities', []):
-                    self.cursor.execute(insert_entity, (
-                        document_id,
-                        paragraph_id,
-                        entity.get('entity_text'),
-                        entity.get('entity_label'),
-                        entity.get('start_char'),
-                        entity.get('end_char'),
-                        entity.get('context')
-                    ))
+                    entities.append((paragraph_id, entity))
+            for entity in analysis_data.get('entities', []):
+                index = entity.get('paragraph_index')
+                paragraph_id = paragraph_ids[index] if index is not None and index < len(paragraph_ids) else None
+                entities.append((paragraph_id, entity))
+            self._copy_entities(document_id, entities)
 
             self.connection.commit()
             print("Análisis del documento guardado exitosamente.")
@@ -190,6 +121,114 @@ class PostgresDatabase:
             print(f"Error al guardar el análisis del documento: {e}")
             raise e
 
+    def save_paragraphs(self, document_id: str, paragraphs: List[Dict]):
+        """Guarda un lote de párrafos (p. ej. los de una página) en su propia transacción."""
+        try:
+            self._copy_paragraphs(document_id, paragraphs)
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            print(f"Error al guardar los párrafos: {e}")
+            raise e
+
+    def copy_paragraphs(self, source_document_id: str, document_id: str, batch_rows: int = 1000,
+                        expected: Optional[int] = None) -> int:
+        """Copia los párrafos de otro documento (el mismo PDF ya procesado) con ids nuevos.
+
+        Las filas se leen con un cursor de servidor por lotes de ``batch_rows``
+        y se escriben con COPY en una sola transacción. Devuelve cuántas se
+        copiaron; si no son ``expected`` la transacción se deshace.
+        """
+        source = self.connection.cursor(name=f"copy_paragraphs_{uuid.uuid4().hex}")
+        copied = 0
+        try:
+            source.execute(
+                "SELECT text, position, style_info, linguistic_features FROM paragraphs WHERE document_id = %s",
+                (source_document_id,)
+            )
+            while rows := source.fetchmany(batch_rows):
+                paragraph_ids = batch_uuid4(len(rows))
+                self._copy_rows(
+                    'paragraphs',
+                    ('paragraph_id', 'document_id', 'text', 'position', 'style_info', 'linguistic_features'),
+                    (
+                        (paragraph_id, document_id, text, *(
+                            value if value is None or isinstance(value, str) else json.dumps(value)
+                            for value in features
+                        ))
+                        for paragraph_id, (text, *features) in zip(paragraph_ids, rows)
+                    )
+                )
+                copied += len(rows)
+            source.close()
+            if expected is not None and copied != expected:
+                self.connection.rollback()
+                return copied
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            print(f"Error al copiar los párrafos: {e}")
+            raise e
+        return copied
+
+    def _copy_paragraphs(self, document_id: str, paragraphs: List[Dict]) -> List[str]:
+        """Escribe los párrafos con COPY y devuelve sus ids en el mismo orden"""
+        paragraph_ids = batch_uuid4(len(paragraphs))
+        rows = (
+            (
+                paragraph_id,
+                document_id,
+                paragraph.get('text'),
+                json.dumps(paragraph.get('position')),
+                json.dumps(paragraph.get('style_info')),
+                json.dumps(paragraph.get('linguistic_features'))
+            )
+            for paragraph_id, paragraph in zip(paragraph_ids, paragraphs)
+        )
+        self._copy_rows(
+            'paragraphs',
+            ('paragraph_id', 'document_id', 'text', 'position', 'style_info', 'linguistic_features'),
+            rows
+        )
+        return paragraph_ids
+
+    def _copy_entities(self, document_id: str, entities: List[Tuple[Optional[str], Dict]]):
+        rows = (
+            (
+                document_id,
+                paragraph_id,
+                entity.get('entity_text'),
+                entity.get('entity_label'),
+                entity.get('start_char'),
+                entity.get('end_char'),
+                entity.get('context')
+            )
+            for paragraph_id, entity in entities
+        )
+        self._copy_rows(
+            'entities',
+            ('document_id', 'paragraph_id', 'entity_text', 'entity_label', 'start_char', 'end_char', 'context'),
+            rows
+        )
+
+    def _copy_rows(self, table: str, columns: Sequence[str], rows: Iterable[Sequence], batch_rows: int = 10000):
+        """Envía filas con COPY FROM STDIN en formato texto, por lotes de ``batch_rows``"""
+        statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+        buffer = io.StringIO()
+        pending = 0
+        for row in rows:
+            buffer.write('\t'.join(copy_value(value) for value in row))
+            buffer.write('\n')
+            pending += 1
+            if pending >= batch_rows:
+                buffer.seek(0)
+                self.cursor.copy_expert(statement, buffer)
+                buffer = io.StringIO()
+                pending = 0
+        if pending:
+            buffer.seek(0)
+            self.cursor.copy_expert(statement, buffer)
+
     def get_document(self, document_id: str) -> Optional[Dict]:
         """Recupera un documento de la base de datos."""
         select_doc = """
@@ -212,11 +251,48 @@ class PostgresDatabase:
             print(f"Error al recuperar el documento: {e}")
             raise e
 
+    def get_document_analysis(self, document_id: str) -> Optional[Dict]:
+        """Recupera el análisis de un documento."""
+        select_analysis = """
+        SELECT document_id, total_paragraphs, total_sentences, total_entities
+        FROM document_analysis
+        WHERE document_id = %s
+        """
+        try:
+            self.cursor.execute(select_analysis, (document_id,))
+            analysis = self.cursor.fetchone()
+            if not analysis:
+                return None
+            return {
+                "document_id": analysis[0],
+                "total_paragraphs": analysis[1],
+                "total_sentences": analysis[2],
+                "total_entities": analysis[3]
+            }
+        except Exception as e:
+            print(f"Error al recuperar el análisis: {e}")
+            raise e
+
+    def update_status(self, document_id: str, status: str):
+        """Registra el estado de procesamiento en los metadatos del documento."""
+        update_doc = """
+        UPDATE documents
+        SET metadata = COALESCE(metadata::jsonb, '{}'::jsonb) || jsonb_build_object('status', %s::text)
+        WHERE id = %s
+        """
+        try:
+            self.cursor.execute(update_doc, (status, document_id))
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            print(f"Error al actualizar el estado del documento: {e}")
+            raise e
+
     def close(self):
-        """Cierra la conexión a la base de datos."""
+        """Devuelve la conexión al pool."""
         try:
             self.cursor.close()
-            self.connection.close()
-            print("Conexión a la base de datos cerrada correctamente.")
         except Exception as e:
-            print(f"Error al cerrar la conexión: {e}")
\ No newline at end of file
+            print(f"Error al cerrar el cursor: {e}")
+        finally:
+            self.pool.putconn(self.connection)
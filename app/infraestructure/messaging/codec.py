@@ -0,0 +1,19 @@
+# app/infraestructure/messaging/codec.py
+import json
+from typing import Any, Dict, Optional, Tuple
+import msgpack
+
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+JSON_CONTENT_TYPE = "application/json"
+
+
+def encode_message(message: Dict[str, Any]) -> Tuple[bytes, str]:
+    """Serializa un mensaje con msgpack; devuelve el cuerpo y su content type"""
+    return msgpack.packb(message, use_bin_type=True), MSGPACK_CONTENT_TYPE
+
+
+def decode_message(body: bytes, content_type: Optional[str] = None) -> Dict[str, Any]:
+    """Deserializa un mensaje; los mensajes sin content type se tratan como JSON"""
+    if content_type == MSGPACK_CONTENT_TYPE:
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
@@ -1,32 +1,230 @@
 # app/infraestructure/messaging/consumers/base_consumer.py
+import asyncio
+import inspect
 import logging
-import json
+import signal
+import threading
+import time
 from abc import ABC, abstractmethod
-from app.infraestructure.messaging.rabbitmq import RabbitMQClient
+from functools import partial
+import pika
+from app.core.config import get_settings
+from app.infraestructure.messaging.rabbitmq import (
+    RabbitMQClient, RETRY_COUNT_HEADER, LAST_ERROR_HEADER,
+    declare_retry_topology, retry_queue_name, dead_letter_queue_name
+)
+from app.infraestructure.messaging.codec import decode_message, encode_message
+
+
+class PartialFailure(Exception):
+    """Fallo de parte del trabajo de un mensaje: se reintenta solo ``retry_message``
+    en lugar del mensaje original (p. ej. los documentos fallidos de un batch)"""
+
+    def __init__(self, detail: str, retry_message: dict):
+        super().__init__(detail)
+        self.retry_message = retry_message
+
 
 class BaseConsumer(ABC):
-    def __init__(self, queue_name: str):
+    """Consumidor con hasta ``concurrency`` mensajes en proceso a la vez.
+
+    El hilo que llama a ``start`` es dueño de la conexión pika (que no es
+    thread-safe): recibe los mensajes y envía los ack. Los handlers se
+    ejecutan en un event loop propio en otro hilo; cada mensaje se confirma
+    al terminar su handler, nunca antes.
+
+    Un mensaje que falla (o excede ``processing_timeout``) se republica en
+    la cola de reintento de su intento, que lo devuelve a la cola principal
+    al expirar su TTL; tras ``max_retries`` intentos va a la DLQ.
+    """
+
+    def __init__(self, queue_name: str, concurrency: int = 1, prefetch: int = None,
+                 drain_timeout: float = 30.0, rabbitmq=None, max_retries: int = None,
+                 processing_timeout: float = None):
+        settings = get_settings()
         self.queue_name = queue_name
-        self.rabbitmq = RabbitMQClient()
+        self.concurrency = max(1, concurrency)
+        # El prefetch acota los mensajes sin ack que el broker nos entrega
+        self.prefetch = prefetch if prefetch is not None else self.concurrency
+        self.drain_timeout = drain_timeout
+        self.max_retries = settings.MAX_RETRIES if max_retries is None else max_retries
+        self.processing_timeout = (
+            settings.MESSAGE_PROCESSING_TIMEOUT if processing_timeout is None else processing_timeout
+        )
+        self.rabbitmq = rabbitmq or RabbitMQClient()
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.loop = None
+        self._slots = None
+        self._in_flight = 0
+        # Contador compartido con el supervisor (multiprocessing.Value): mensajes
+        # entregados a este consumidor y aún sin ack, que la cola ya no cuenta
+        self.held_messages = None
+        self._stopping = False
+        self.retried = 0
+        self.dead_lettered = 0
 
     @abstractmethod
     async def process_message(self, message: dict):
         pass
 
     def start(self):
-        self.logger.info(f"Iniciando consumidor para {self.queue_name}")
-        self.rabbitmq.channel.basic_consume(
-            queue=self.queue_name,
-            on_message_callback=self._on_message
+        self.logger.info(
+            f"Iniciando consumidor para {self.queue_name} "
+            f"(concurrencia={self.concurrency}, prefetch={self.prefetch})"
+        )
+        self.loop = asyncio.new_event_loop()
+        loop_thread = threading.Thread(
+            target=self.loop.run_forever, name=f"{self.queue_name}-handlers", daemon=True
         )
-        self.rabbitmq.channel.start_consuming()
+        loop_thread.start()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._install_signal_handlers()
+
+        channel = self.rabbitmq.channel
+        declare_retry_topology(channel, self.queue_name, self.max_retries)
+        channel.basic_qos(prefetch_count=self.prefetch)
+        channel.basic_consume(queue=self.queue_name, on_message_callback=self._on_message)
+        try:
+            channel.start_consuming()
+        finally:
+            self._drain()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            loop_thread.join()
+            self.loop.close()
+            self.rabbitmq.close()
+
+    def stop(self):
+        """Deja de recibir mensajes y termina los que están en curso. Thread-safe."""
+        if self._stopping:
+            return
+        self._stopping = True
+        self.rabbitmq.connection.add_callback_threadsafe(self.rabbitmq.channel.stop_consuming)
+
+    def _install_signal_handlers(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: self.stop())
+
+    def _drain(self):
+        """Espera a los handlers en curso y envía sus ack antes de cerrar"""
+        deadline = time.monotonic() + self.drain_timeout
+        while self._in_flight and time.monotonic() < deadline:
+            self.rabbitmq.connection.process_data_events(time_limit=0.1)
+        if self._in_flight:
+            self.logger.warning(
+                f"{self._in_flight} mensajes sin terminar tras {self.drain_timeout}s; el broker los reentregará"
+            )
 
     def _on_message(self, ch, method, properties, body):
         try:
-            message = json.loads(body)
-            self.process_message(message)
-            ch.basic_ack(delivery_tag=method.delivery_tag)
+            message = decode_message(body, properties.content_type)
         except Exception as e:
-            self.logger.error(f"Error procesando mensaje: {str(e)}")
-            ch.basic_nack(delivery_tag=method.delivery_tag)
\ No newline at end of file
+            # Mensaje envenenado: reintentarlo no sirve de nada
+            self.logger.error(f"Mensaje no decodificable: {str(e)}")
+            self._retry_or_dead_letter(ch, properties, body, e, retryable=False)
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+            return
+
+        self._track_in_flight(1)
+        future = asyncio.run_coroutine_threadsafe(self._handle(message), self.loop)
+        future.add_done_callback(partial(self._on_done, ch, method, properties, body))
+
+    def max_message_time(self) -> float:
+        """Lo que puede tardar un mensaje: un worker retirado espera al menos esto"""
+        return self.processing_timeout
+
+    def _track_in_flight(self, delta: int):
+        self._in_flight += delta
+        if self.held_messages is not None:
+            self.held_messages.value = self._in_flight
+
+    def message_timeout(self, message: dict):
+        """Tiempo máximo de procesamiento del mensaje (``None``: sin límite)"""
+        return self.processing_timeout
+
+    async def _handle(self, message: dict):
+        async with self._slots:
+            result = self.process_message(message)
+            if inspect.isawaitable(result):
+                timeout = self.message_timeout(message)
+                try:
+                    await asyncio.wait_for(result, timeout)
+                except asyncio.TimeoutError:
+                    # wait_for espera a que termine la cancelación (ver run_in_thread):
+                    # el hueco no se libera mientras siga trabajando un hilo del mensaje
+                    raise TimeoutError(f"Procesamiento excedió {timeout}s")
+
+    async def run_in_thread(self, func, *args):
+        """``asyncio.to_thread`` que, si se cancela, espera a que el hilo termine.
+
+        Un hilo no se puede interrumpir: tras un timeout el trabajo sigue
+        consumiendo CPU, así que el handler no devuelve su hueco hasta entonces.
+        """
+        task = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            await asyncio.wait({task})
+            raise
+
+    def _on_done(self, ch, method, properties, body, future):
+        # Se ejecuta en el hilo del event loop: el ack se delega al hilo de la conexión
+        error = future.exception()
+        if error is not None:
+            self.logger.error(f"Error procesando mensaje: {str(error)}")
+        self.rabbitmq.connection.add_callback_threadsafe(
+            partial(self._settle, ch, method, properties, body, error)
+        )
+
+    def _settle(self, ch, method, properties, body, error):
+        self._track_in_flight(-1)
+        if isinstance(error, PartialFailure):
+            body, content_type = encode_message(error.retry_message)
+            properties = pika.BasicProperties(content_type=content_type, headers=properties.headers)
+        if error is not None:
+            self._retry_or_dead_letter(ch, properties, body, error)
+        # El original se confirma siempre: su copia ya está en la cola de reintento o en la DLQ
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+
+    def _retry_or_dead_letter(self, ch, properties, body, error, retryable: bool = True):
+        headers = dict(properties.headers or {})
+        attempt = int(headers.get(RETRY_COUNT_HEADER, 0)) + 1
+        headers[RETRY_COUNT_HEADER] = attempt
+        headers[LAST_ERROR_HEADER] = f"{type(error).__name__}: {error}"[:1000]
+        if retryable and attempt <= self.max_retries:
+            target = retry_queue_name(self.queue_name, attempt)
+            self.retried += 1
+        else:
+            target = dead_letter_queue_name(self.queue_name)
+            self.dead_lettered += 1
+            self.logger.error(f"Mensaje enviado a {target} tras {attempt} intentos")
+        ch.basic_publish(
+            exchange='',
+            routing_key=target,
+            body=body,
+            properties=pika.BasicProperties(
+                content_type=properties.content_type,
+                headers=headers,
+                delivery_mode=2
+            )
+        )
+
+    async def call_in_connection(self, func, *args, **kwargs):
+        """Ejecuta ``func`` en el hilo de la conexión (p. ej. publicar) y espera su resultado"""
+        future = self.loop.create_future()
+
+        def resolve(setter, value):
+            if not future.done():
+                setter(value)
+
+        def callback():
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self.loop.call_soon_threadsafe(resolve, future.set_exception, e)
+            else:
+                self.loop.call_soon_threadsafe(resolve, future.set_result, result)
+
+        self.rabbitmq.connection.add_callback_threadsafe(callback)
+        return await future
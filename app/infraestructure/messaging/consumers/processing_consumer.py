@@ -1,36 +1,110 @@
 # app/infraestructure/messaging/consumers/processing_consumer.py
 from app.use_cases.process_document import ProcessDocumentUseCase
+from app.use_cases.extract_text import ExtractTextUseCase
+from app.infraestructure.storage.blob_store import get_blob_store, resolve_document_blob
+from app.semantic.vector_index import get_vector_index
 from app.core.config import get_settings
+import asyncio
+import os
+import tempfile
 import uuid
-from app.infraestructure.messaging.consumers.base_consumer import BaseConsumer
+from app.infraestructure.messaging.consumers.base_consumer import BaseConsumer, PartialFailure
 from app.infraestructure.metrics.performance_metrics import PerformanceMetrics
 
+consumer_metrics = PerformanceMetrics()
+
 class ProcessingConsumer(BaseConsumer):
     def __init__(self):
         settings = get_settings()
-        super().__init__(settings.PROCESSING_QUEUE)
+        super().__init__(
+            settings.PROCESSING_QUEUE,
+            concurrency=settings.PROCESSING_WORKERS,
+            prefetch=settings.PROCESSING_PREFETCH,
+            drain_timeout=settings.CONSUMER_DRAIN_TIMEOUT
+        )
         self.process_document = ProcessDocumentUseCase()
-        self.metrics = PerformanceMetrics()
+        self.extract_text = ExtractTextUseCase()
+        self.blob_store = get_blob_store()
+        self.vector_index = get_vector_index()
+        self.metrics = consumer_metrics
+        # MESSAGE_PROCESSING_TIMEOUT se aplica a cada documento del batch, y
+        # debe cubrir el peor caso de las etapas del pipeline
+        budget = self.process_document.time_budget()
+        if self.processing_timeout < budget:
+            raise ValueError(
+                f"MESSAGE_PROCESSING_TIMEOUT ({self.processing_timeout}s) es menor que el "
+                f"presupuesto de PIPELINE_STAGE_TIMEOUTS por documento ({budget:g}s)"
+            )
+
+    def max_message_time(self) -> float:
+        return self.processing_timeout * get_settings().BATCH_SIZE
+
+    def message_timeout(self, message: dict):
+        # Cada documento tiene su propio timeout en process_message
+        return None
         
-    @PerformanceMetrics().measure_time("batch")
+    @consumer_metrics.measure_time("batch")
     async def process_message(self, message: dict):
         batch = message["batch"]
         batch_id = str(uuid.uuid4())
-        
+        # Solo los documentos fallidos vuelven a la cola: los terminados ya
+        # están indexados y publicados y no deben repetirse
+        failed = []
         for document in batch:
-            await self.process_document_with_metrics(document, batch_id)
+            try:
+                await asyncio.wait_for(
+                    self.process_document_with_metrics(document, batch_id), self.processing_timeout
+                )
+            except asyncio.TimeoutError:
+                self.logger.error(
+                    f"Documento {document['document_id']} excedió {self.processing_timeout}s"
+                )
+                failed.append(document)
+            except Exception:
+                failed.append(document)
+        if failed:
+            raise PartialFailure(
+                f"{len(failed)} de {len(batch)} documentos fallaron",
+                {**message, "batch": failed}
+            )
     
-    @PerformanceMetrics().measure_time("document")
+    @consumer_metrics.measure_time("document")
     async def process_document_with_metrics(self, document: dict, batch_id: str):
         try:
-            analysis = await self.process_document.execute(document)
+            blob_key = await self.run_in_thread(resolve_document_blob, document, self.blob_store)
+            text = await self.run_in_thread(self._extract_text, blob_key)
+            analysis = await self.process_document.execute(document["document_id"], text)
+            self.metrics.record_stage_times(document["document_id"], {
+                f"{stage}{suffix}": timing[key]
+                for stage, timing in analysis.metadata["stages"].items()
+                for key, suffix in (("wall_seconds", ""), ("cpu_seconds", "_cpu"))
+                if timing.get(key) is not None
+            })
+            if analysis.embeddings:
+                await self.run_in_thread(self.vector_index.add, document["document_id"], analysis.embeddings)
             
-            self.rabbitmq.publish_analysis({
+            # pika no es thread-safe: la publicación se hace en el hilo de la conexión
+            await self.call_in_connection(self.rabbitmq.publish_analysis, {
                 "document_id": document["document_id"],
                 "batch_id": batch_id,
                 "analysis": analysis.to_dict(),
-                "processing_metrics": self.metrics.get_metrics()
+                "processing_metrics": self.metrics.get_global_metrics()
             })
+            # Documento terminado: el PDF ya no se necesita (si falla, se conserva para el reintento)
+            try:
+                await self.run_in_thread(self.blob_store.delete, blob_key)
+            except Exception as e:
+                self.logger.warning(f"No se pudo borrar el blob {blob_key}: {str(e)}")
         except Exception as e:
             self.logger.error(f"Error procesando documento {document['document_id']}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def _extract_text(self, blob_key: str) -> str:
+        # Recuperar el PDF referenciado por el mensaje (claim-check)
+        fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        try:
+            self.blob_store.get_to_file(blob_key, pdf_path)
+            return self.extract_text.execute(pdf_path)
+        finally:
+            os.remove(pdf_path)
\ No newline at end of file
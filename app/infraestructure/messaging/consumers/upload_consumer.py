@@ -1,29 +1,42 @@
 # app/infraestructure/messaging/consumers/upload_consumer.py
+import asyncio
+from datetime import datetime, timezone
 from app.core.config import get_settings
-from app.use_cases.extract_text import ExtractTextUseCase
-from app.infraestructure.storage.s3 import S3Client
-from app.domain.repositories.document_repository import DocumentRepository
+from app.domain.entities.document import Document
+from app.infraestructure.database.postgres import PostgresDatabase
 from app.infraestructure.messaging.consumers.base_consumer import BaseConsumer
 
 class UploadConsumer(BaseConsumer):
     def __init__(self):
         settings = get_settings()
-        super().__init__(settings.UPLOAD_QUEUE)
-        self.document_repository = DocumentRepository()
-        self.s3_client = S3Client()
+        super().__init__(
+            settings.UPLOAD_QUEUE,
+            concurrency=settings.UPLOAD_WORKERS,
+            prefetch=settings.UPLOAD_PREFETCH,
+            drain_timeout=settings.CONSUMER_DRAIN_TIMEOUT
+        )
         
     async def process_message(self, message: dict):
-        document_id = message["document_id"]
-        content = message["content"]
+        # Solo se registra el documento: el blob del PDF es del consumidor de
+        # procesamiento, que lo borra al terminar, así que aquí ni se guarda su
+        # clave ni se escribe el ``content`` de los mensajes antiguos
+        document = Document(
+            id=message["document_id"],
+            filename=message["filename"],
+            created_at=datetime.now(timezone.utc),
+            sections=[],
+            metadata={
+                "size": message.get("size"),
+                "status": "uploaded"
+            }
+        )
         
-        # Guardar en S3
-        await self.s3_client.upload_document({
-            "id": document_id,
-            "content": content
-        })
-        
-        # Actualizar estado en BD
-        await self.document_repository.update_status(
-            document_id, 
-            "uploaded"
-        )
\ No newline at end of file
+        # Registrar el documento en BD sin bloquear el event loop de los handlers
+        await asyncio.to_thread(self._save_document, document)
+
+    def _save_document(self, document: Document):
+        document_repository = PostgresDatabase()
+        try:
+            document_repository.save_document(document)
+        finally:
+            document_repository.close()
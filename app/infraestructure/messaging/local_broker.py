@@ -0,0 +1,248 @@
+# app/infraestructure/messaging/local_broker.py
+import heapq
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+from app.infraestructure.messaging.codec import encode_message
+
+
+class LocalBroker:
+    """Broker en memoria con la semántica de entrega de RabbitMQ que usan los consumidores.
+
+    Sustituye a RabbitMQ en benchmarks y pruebas locales: colas FIFO,
+    prefetch por canal, ack/nack con reencolado, colas con TTL y
+    dead-letter (para los reintentos diferidos) y una latencia de ida y
+    vuelta opcional que retrasa la liberación de crédito tras cada ack.
+    """
+
+    def __init__(self, round_trip: float = 0.0):
+        self.round_trip = round_trip
+        self.queues: Dict[str, deque] = {}
+        self.arguments: Dict[str, Dict[str, Any]] = {}
+        self.condition = threading.Condition()
+        self.acked = 0
+        self.nacked = 0
+
+    def queue_declare(self, queue: str, arguments: Optional[Dict[str, Any]] = None) -> int:
+        with self.condition:
+            if arguments:
+                self.arguments[queue] = arguments
+            return len(self.queues.setdefault(queue, deque()))
+
+    def publish(self, queue: str, message: Dict[str, Any], headers: Optional[Dict[str, Any]] = None):
+        body, content_type = encode_message(message)
+        self.publish_raw(queue, body, SimpleNamespace(content_type=content_type, headers=headers))
+
+    def publish_raw(self, queue: str, body: bytes, properties=None):
+        properties = SimpleNamespace(
+            content_type=getattr(properties, "content_type", None),
+            headers=getattr(properties, "headers", None)
+        )
+        entry = (body, properties)
+        with self.condition:
+            self.queues.setdefault(queue, deque()).append(entry)
+            self.condition.notify_all()
+            arguments = self.arguments.get(queue, {})
+        if "x-message-ttl" in arguments:
+            timer = threading.Timer(arguments["x-message-ttl"] / 1000, self._expire, (queue, entry))
+            timer.daemon = True
+            timer.start()
+
+    def _expire(self, queue: str, entry: tuple):
+        with self.condition:
+            try:
+                self.queues[queue].remove(entry)
+            except ValueError:
+                return
+            target = self.arguments[queue].get("x-dead-letter-routing-key")
+        if target is not None:
+            self.publish_raw(target, *entry)
+
+    def client(self) -> "LocalBrokerClient":
+        return LocalBrokerClient(self)
+
+
+class LocalBrokerClient:
+    """Equivalente a ``RabbitMQClient``: expone ``connection`` y ``channel``"""
+
+    def __init__(self, broker: LocalBroker):
+        self.connection = LocalConnection(broker)
+        self.channel = self.connection.channel()
+
+    def close(self):
+        self.connection.close()
+
+
+class LocalConnection:
+    """Subconjunto de ``pika.BlockingConnection``"""
+
+    def __init__(self, broker: LocalBroker):
+        self.broker = broker
+        self.is_closed = False
+        self._callbacks = deque()
+        self._channels = []
+
+    def channel(self) -> "LocalChannel":
+        channel = LocalChannel(self)
+        self._channels.append(channel)
+        return channel
+
+    def add_callback_threadsafe(self, callback):
+        with self.broker.condition:
+            self._callbacks.append(callback)
+            self.broker.condition.notify_all()
+
+    def process_data_events(self, time_limit: Optional[float] = 0):
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+        while True:
+            worked = self._run_pending()
+            if time_limit is None and worked:
+                return
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                return
+            with self.broker.condition:
+                if self._callbacks or any(channel.deliverable() for channel in self._channels):
+                    continue
+                wake = [channel.next_credit() for channel in self._channels]
+                wake = [moment - time.monotonic() for moment in wake if moment is not None]
+                if wake:
+                    timeout = min(wake) if timeout is None else min(timeout, min(wake))
+                self.broker.condition.wait(timeout)
+
+    def _run_pending(self) -> bool:
+        worked = False
+        while True:
+            with self.broker.condition:
+                callback = self._callbacks.popleft() if self._callbacks else None
+            if callback is None:
+                break
+            callback()
+            worked = True
+        for channel in self._channels:
+            worked = channel.deliver() or worked
+        return worked
+
+    def close(self):
+        for channel in self._channels:
+            channel.close()
+        self.is_closed = True
+
+
+class LocalChannel:
+    """Subconjunto de ``pika.adapters.blocking_connection.BlockingChannel``"""
+
+    def __init__(self, connection: LocalConnection):
+        self.connection = connection
+        self.broker = connection.broker
+        self.prefetch_count = 0
+        self.consumers: Dict[str, tuple] = {}
+        self.unacked: Dict[int, tuple] = {}
+        self._credits = []
+        self._next_tag = 0
+        self._consuming = False
+
+    def queue_declare(self, queue: str, passive: bool = False, durable: bool = False, arguments=None):
+        count = self.broker.queue_declare(queue, arguments)
+        return SimpleNamespace(method=SimpleNamespace(queue=queue, message_count=count))
+
+    def basic_qos(self, prefetch_count: int = 0):
+        self.prefetch_count = prefetch_count
+
+    def basic_publish(self, exchange: str, routing_key: str, body: bytes, properties=None):
+        self.broker.publish_raw(routing_key, body, properties)
+
+    def basic_get(self, queue: str, auto_ack: bool = False):
+        with self.broker.condition:
+            if not self.broker.queues.get(queue):
+                return None, None, None
+            body, properties = self.broker.queues[queue].popleft()
+            self._next_tag += 1
+            if not auto_ack:
+                self.unacked[self._next_tag] = (queue, body, properties)
+        return SimpleNamespace(delivery_tag=self._next_tag, routing_key=queue), properties, body
+
+    def basic_consume(self, queue: str, on_message_callback, auto_ack: bool = False) -> str:
+        consumer_tag = f"ctag-{len(self.consumers) + 1}"
+        self.consumers[consumer_tag] = (queue, on_message_callback)
+        self.broker.queue_declare(queue)
+        return consumer_tag
+
+    def basic_cancel(self, consumer_tag: str):
+        self.consumers.pop(consumer_tag, None)
+
+    def basic_ack(self, delivery_tag: int):
+        with self.broker.condition:
+            self.unacked.pop(delivery_tag)
+            self.broker.acked += 1
+            self._release_credit()
+
+    def basic_nack(self, delivery_tag: int, multiple: bool = False, requeue: bool = True):
+        with self.broker.condition:
+            tags = [tag for tag in self.unacked if tag <= delivery_tag] if multiple else [delivery_tag]
+            # Reencolar en orden inverso para conservar el orden original en la cabeza
+            for tag in sorted(tags, reverse=True):
+                queue, body, properties = self.unacked.pop(tag)
+                self.broker.nacked += 1
+                if requeue:
+                    self.broker.queues[queue].appendleft((body, properties))
+            self._release_credit()
+
+    def _release_credit(self):
+        # Con latencia, el broker tarda un viaje de ida y vuelta en ver el ack
+        if self.broker.round_trip:
+            heapq.heappush(self._credits, time.monotonic() + self.broker.round_trip)
+        self.broker.condition.notify_all()
+
+    def _pending_credits(self) -> int:
+        now = time.monotonic()
+        while self._credits and self._credits[0] <= now:
+            heapq.heappop(self._credits)
+        return len(self._credits)
+
+    def next_credit(self) -> Optional[float]:
+        return self._credits[0] if self._credits else None
+
+    def deliverable(self) -> bool:
+        """Indica si hay mensajes que entregar sin exceder el prefetch; requiere el lock"""
+        if not self.consumers:
+            return False
+        if self.prefetch_count and len(self.unacked) + self._pending_credits() >= self.prefetch_count:
+            return False
+        return any(self.broker.queues.get(queue) for queue, _ in self.consumers.values())
+
+    def deliver(self) -> bool:
+        delivered = False
+        while True:
+            with self.broker.condition:
+                if not self.deliverable():
+                    return delivered
+                for queue, callback in list(self.consumers.values()):
+                    if self.broker.queues.get(queue):
+                        break
+                body, properties = self.broker.queues[queue].popleft()
+                self._next_tag += 1
+                delivery_tag = self._next_tag
+                self.unacked[delivery_tag] = (queue, body, properties)
+            callback(self, SimpleNamespace(delivery_tag=delivery_tag, routing_key=queue), properties, body)
+            delivered = True
+
+    def start_consuming(self):
+        self._consuming = True
+        while self._consuming and self.consumers:
+            self.connection.process_data_events(time_limit=None)
+
+    def stop_consuming(self):
+        self._consuming = False
+        for consumer_tag in list(self.consumers):
+            self.basic_cancel(consumer_tag)
+
+    def close(self):
+        # Como RabbitMQ: lo no confirmado vuelve a la cola al cerrar el canal
+        with self.broker.condition:
+            for queue, body, properties in self.unacked.values():
+                self.broker.queues[queue].appendleft((body, properties))
+            self.unacked.clear()
+            self.broker.condition.notify_all()
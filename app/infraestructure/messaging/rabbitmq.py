@@ -1,14 +1,31 @@
 import pika
-import json
 from typing import Any, Dict, List
 from app.core.config import get_settings
+from app.infraestructure.messaging.codec import encode_message, decode_message
 
 settings = get_settings()
 
+RETRY_COUNT_HEADER = "x-retry-count"
+LAST_ERROR_HEADER = "x-last-error"
+
+
+def retry_queue_name(queue: str, attempt: int) -> str:
+    return f"{queue}.retry.{attempt}"
+
+
+def dead_letter_queue_name(queue: str) -> str:
+    return f"{queue}.dlq"
+
+
+def retry_delay(attempt: int) -> float:
+    """Espera antes del reintento ``attempt`` (1, 2, ...): backoff exponencial"""
+    return settings.RETRY_BASE_DELAY * 2 ** (attempt - 1)
+
+
 class RabbitMQClient:
     def __init__(self):
         self.credentials = pika.PlainCredentials(
-            settings.RABBITMQ_USER, 
+            settings.RABBITMQ_USER,
             settings.RABBITMQ_PASS
         )
         self.connection = pika.BlockingConnection(
@@ -19,36 +36,93 @@ class RabbitMQClient:
             )
         )
         self.channel = self.connection.channel()
-        
+
         # Declarar todas las colas
         self.channel.queue_declare(queue=settings.UPLOAD_QUEUE)
         self.channel.queue_declare(queue=settings.PROCESSING_QUEUE)
         self.channel.queue_declare(queue=settings.ANALYSIS_QUEUE)
+        for queue in (settings.UPLOAD_QUEUE, settings.PROCESSING_QUEUE):
+            declare_retry_topology(self.channel, queue)
 
-    def publish_upload(self, document: Dict[str, Any]):
-        """Publica documento en cola de subida"""
+    def _publish(self, queue: str, message: Dict[str, Any]):
+        body, content_type = encode_message(message)
         self.channel.basic_publish(
             exchange='',
-            routing_key=settings.UPLOAD_QUEUE,
-            body=json.dumps(document)
+            routing_key=queue,
+            body=body,
+            properties=pika.BasicProperties(content_type=content_type)
         )
 
+    def publish_upload(self, document: Dict[str, Any]):
+        """Publica la referencia de un documento en cola de subida"""
+        self._publish(settings.UPLOAD_QUEUE, document)
+
     def publish_processing(self, batch: List[Dict[str, Any]]):
-        """Publica batch en cola de procesamiento"""
-        self.channel.basic_publish(
-            exchange='',
-            routing_key=settings.PROCESSING_QUEUE,
-            body=json.dumps({"batch": batch})
-        )
+        """Publica batch de referencias en cola de procesamiento"""
+        self._publish(settings.PROCESSING_QUEUE, {"batch": batch})
 
     def publish_analysis(self, document: Dict[str, Any]):
         """Publica documento en cola de análisis"""
-        self.channel.basic_publish(
-            exchange='',
-            routing_key=settings.ANALYSIS_QUEUE,
-            body=json.dumps(document)
-        )
+        self._publish(settings.ANALYSIS_QUEUE, document)
+
+    def inspect_dead_letters(self, queue: str, limit: int = 20) -> Dict[str, Any]:
+        """Muestra hasta ``limit`` mensajes de la DLQ sin consumirlos"""
+        dlq = dead_letter_queue_name(queue)
+        total = self.channel.queue_declare(queue=dlq, passive=True).method.message_count
+        messages = []
+        last_tag = None
+        for _ in range(limit):
+            method, properties, body = self.channel.basic_get(queue=dlq, auto_ack=False)
+            if method is None:
+                break
+            last_tag = method.delivery_tag
+            try:
+                message = decode_message(body, properties.content_type)
+            except Exception:
+                # Los mensajes envenenados se muestran tal cual
+                message = {"raw": body[:1000].decode('utf-8', errors='replace')}
+            messages.append({"headers": properties.headers or {}, "message": message})
+        if last_tag is not None:
+            # Devolverlos a la DLQ en el mismo orden
+            self.channel.basic_nack(delivery_tag=last_tag, multiple=True, requeue=True)
+        return {"queue": dlq, "total": total, "messages": messages}
+
+    def replay_dead_letters(self, queue: str, limit: int = 1000) -> int:
+        """Reenvía a la cola original hasta ``limit`` mensajes de la DLQ con el contador a cero"""
+        dlq = dead_letter_queue_name(queue)
+        replayed = 0
+        while replayed < limit:
+            method, properties, body = self.channel.basic_get(queue=dlq, auto_ack=False)
+            if method is None:
+                break
+            headers = dict(properties.headers or {})
+            headers.pop(RETRY_COUNT_HEADER, None)
+            self.channel.basic_publish(
+                exchange='',
+                routing_key=queue,
+                body=body,
+                properties=pika.BasicProperties(content_type=properties.content_type, headers=headers)
+            )
+            self.channel.basic_ack(delivery_tag=method.delivery_tag)
+            replayed += 1
+        return replayed
 
     def close(self):
         if not self.connection.is_closed:
-            self.connection.close()
\ No newline at end of file
+            self.connection.close()
+
+
+def declare_retry_topology(channel, queue: str, max_retries: int = None):
+    """Declara las colas de reintento con TTL (vuelven a ``queue`` al expirar) y la DLQ"""
+    max_retries = settings.MAX_RETRIES if max_retries is None else max_retries
+    for attempt in range(1, max_retries + 1):
+        channel.queue_declare(
+            queue=retry_queue_name(queue, attempt),
+            durable=True,
+            arguments={
+                "x-message-ttl": int(retry_delay(attempt) * 1000),
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": queue
+            }
+        )
+    channel.queue_declare(queue=dead_letter_queue_name(queue), durable=True)
@@ -1,11 +1,29 @@
 import time
+import inspect
 import threading
+from collections import OrderedDict
+from functools import wraps
+from contextlib import contextmanager
 from typing import Dict, List, Optional
 from statistics import mean, median
 
+
+@contextmanager
+def stage_timer(stage_times: Dict[str, float], stage: str):
+    """Acumula en ``stage_times[stage]`` el tiempo de pared del bloque"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_times[stage] = stage_times.get(stage, 0.0) + time.perf_counter() - start
+
+
 class PerformanceMetrics:
     _instance = None
     _lock = threading.Lock()
+    # Documentos cuyos tiempos por etapa se conservan para consultarlos; las
+    # medias globales usan sumas acumuladas y no dependen de este límite
+    MAX_STAGE_DOCUMENTS = 1000
 
     def __init__(self):
         if PerformanceMetrics._instance is not None:
@@ -19,6 +37,10 @@ class PerformanceMetrics:
         self.lock = threading.Lock()
         self.processing_history: List[float] = []
         self.timers: Dict[str, float] = {}
+        self.stage_times: 'OrderedDict[str, Dict[str, float]]' = OrderedDict()
+        # Por etapa u operación: [número de mediciones, segundos acumulados]
+        self.stage_totals: Dict[str, List[float]] = {}
+        self.operation_totals: Dict[str, List[float]] = {}
 
     def start_timer(self, timer_id: str = "default") -> float:
         self.timers[timer_id] = time.time()
@@ -30,6 +52,35 @@ class PerformanceMetrics:
             raise ValueError(f"No se encontró inicio del temporizador '{timer_id}'.")
         return time.time() - start_time
 
+    def measure_time(self, operation: str):
+        """Decorador que registra la duración de cada llamada (síncrona o async)"""
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        self.record_operation_time(operation, time.perf_counter() - start)
+                return async_wrapper
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record_operation_time(operation, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def record_operation_time(self, operation: str, seconds: float):
+        with self.lock:
+            totals = self.operation_totals.setdefault(operation, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
     def record_document_metrics(self, 
                                 document_id: str, 
                                 processing_time: float,
@@ -44,6 +95,17 @@ class PerformanceMetrics:
             if stats:
                 self.document_stats[document_id] = stats
 
+    def record_stage_times(self, document_id: str, stage_times: Dict[str, float]):
+        with self.lock:
+            self.stage_times[document_id] = dict(stage_times)
+            self.stage_times.move_to_end(document_id)
+            while len(self.stage_times) > self.MAX_STAGE_DOCUMENTS:
+                self.stage_times.popitem(last=False)
+            for stage, seconds in stage_times.items():
+                totals = self.stage_totals.setdefault(stage, [0, 0.0])
+                totals[0] += 1
+                totals[1] += seconds
+
     def get_document_metrics(self, document_id: str) -> Dict:
         with self.lock:
             if document_id not in self.document_times:
@@ -67,7 +129,8 @@ class PerformanceMetrics:
                     "vs_median": doc_time - median(times),
                     "percentile": percentile
                 },
-                "document_stats": doc_stats
+                "document_stats": doc_stats,
+                "stage_times": self.stage_times.get(document_id, {})
             }
 
     def get_global_metrics(self) -> Dict:
@@ -80,5 +143,11 @@ class PerformanceMetrics:
                 "median_processing_time": median(times) if times else 0,
                 "min_processing_time": min(times) if times else 0,
                 "max_processing_time": max(times) if times else 0,
-                "total_data_processed_mb": sum(self.document_sizes.values()) / 1024 / 1024
+                "total_data_processed_mb": sum(self.document_sizes.values()) / 1024 / 1024,
+                "average_stage_times": {
+                    stage: total / count for stage, (count, total) in self.stage_totals.items()
+                },
+                "average_operation_times": {
+                    operation: total / count for operation, (count, total) in self.operation_totals.items()
+                }
             }
\ No newline at end of file
@@ -0,0 +1,127 @@
+import base64
+import io
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import BinaryIO, Dict
+from app.core.config import get_settings
+
+
+class BlobStore(ABC):
+    """Almacenamiento de PDFs referenciados desde los mensajes (claim-check)"""
+
+    @abstractmethod
+    def put_stream(self, key: str, stream: BinaryIO) -> int:
+        """Guarda el contenido de ``stream`` bajo ``key`` y devuelve los bytes escritos"""
+        pass
+
+    def put_file(self, key: str, path: str) -> int:
+        """Guarda el fichero local ``path`` bajo ``key``; puede moverlo en lugar de copiarlo"""
+        with open(path, "rb") as f:
+            return self.put_stream(key, f)
+
+    @abstractmethod
+    def get_to_file(self, key: str, path: str):
+        """Descarga el blob ``key`` en ``path``"""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+
+class LocalBlobStore(BlobStore):
+    """Sustituto de S3 sobre el sistema de ficheros local"""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root_dir, key))
+        if not path.startswith(os.path.abspath(self.root_dir) + os.sep):
+            raise ValueError(f"Clave de blob no válida: {key}")
+        return path
+
+    def put_stream(self, key: str, stream: BinaryIO) -> int:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escribir a un temporal y renombrar para no exponer blobs a medias
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(stream, f, 1024 * 1024)
+            size = f.tell()
+        os.replace(tmp_path, path)
+        return size
+
+    def put_file(self, key: str, path: str) -> int:
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        size = os.path.getsize(path)
+        # En el mismo sistema de ficheros es un rename; si no, copia por el temporal
+        tmp_path = f"{target}.{uuid.uuid4().hex}.part"
+        shutil.move(path, tmp_path)
+        os.replace(tmp_path, target)
+        return size
+
+    def get_to_file(self, key: str, path: str):
+        shutil.copyfile(self._path(key), path)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStore(BlobStore):
+    def __init__(self, s3_client):
+        self.s3_client = s3_client
+
+    def put_stream(self, key: str, stream: BinaryIO) -> int:
+        start = stream.tell() if stream.seekable() else 0
+        self.s3_client.upload_fileobj(stream, key)
+        return stream.tell() - start if stream.seekable() else 0
+
+    def get_to_file(self, key: str, path: str):
+        self.s3_client.download_file(key, path)
+
+    def delete(self, key: str):
+        self.s3_client.delete(key)
+
+
+@lru_cache()
+def get_blob_store() -> BlobStore:
+    settings = get_settings()
+    if settings.BLOB_STORE_BACKEND == "s3":
+        from app.infraestructure.storage.s3 import S3Client
+        return S3BlobStore(S3Client(
+            settings.aws_access_key_id,
+            settings.aws_secret_access_key,
+            settings.aws_bucket_name
+        ))
+    return LocalBlobStore(settings.LOCAL_BLOB_DIR)
+
+
+def document_blob_key(document_id: str) -> str:
+    return f"documents/{document_id}.pdf"
+
+
+def resolve_document_blob(document: Dict, store: BlobStore) -> str:
+    """``blob_key`` del PDF de un mensaje de documento.
+
+    Los mensajes anteriores al claim-check traen el PDF en base64 en
+    ``content``: se guarda en el almacén y el mensaje queda con su
+    ``blob_key`` y ``size``. Solo lo usa el consumidor de procesamiento, que
+    es quien borra el blob al terminar el documento.
+    """
+    if document.get("blob_key"):
+        return document["blob_key"]
+    if "content" not in document:
+        raise KeyError("El mensaje no trae blob_key ni content")
+    content = base64.b64decode(document.pop("content"))
+    document["blob_key"] = document_blob_key(document["document_id"])
+    document["size"] = store.put_stream(document["blob_key"], io.BytesIO(content))
+    return document["blob_key"]
@@ -31,4 +31,31 @@ class S3Client:
             raise
         except Exception as e:
             print(f"Error al subir el documento a S3: {e}")
-            raise e
\ No newline at end of file
+            raise e
+
+    def upload_fileobj(self, fileobj, key: str):
+        """Sube un objeto tipo fichero a S3 por partes, sin cargarlo en memoria."""
+        try:
+            self.s3.upload_fileobj(fileobj, self.bucket_name, key)
+        except NoCredentialsError:
+            print("Credenciales de AWS no disponibles.")
+            raise
+        except Exception as e:
+            print(f"Error al subir el objeto {key} a S3: {e}")
+            raise e
+
+    def download_file(self, key: str, path: str):
+        """Descarga un objeto de S3 a un fichero local."""
+        try:
+            self.s3.download_file(self.bucket_name, key, path)
+        except Exception as e:
+            print(f"Error al descargar el objeto {key} de S3: {e}")
+            raise e
+
+    def delete(self, key: str):
+        """Elimina un objeto de S3."""
+        try:
+            self.s3.delete_object(Bucket=self.bucket_name, Key=key)
+        except Exception as e:
+            print(f"Error al eliminar el objeto {key} de S3: {e}")
+            raise e
@@ -1,55 +1,89 @@
+import os
 import uuid
-import base64
 import logging
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, HTTPException
 from typing import List, Dict
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from app.infraestructure.messaging.rabbitmq import RabbitMQClient
+from app.infraestructure.storage.blob_store import document_blob_key, get_blob_store
 from app.core.config import get_settings
-from app.presentation.api.v1.routes import router
+from app.presentation.api.v1.routes import router, get_extractor, get_admission
+from app.presentation.exceptions import ServiceOverloadedError
+from app.presentation.uploads import receive_uploads, upload_openapi
+from app.preprocessing.pdf_extractor import shutdown_process_pool
+from app.semantic.model_registry import get_model_registry
+from app.infraestructure.database.pool import get_pool, close_pool
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cargar una sola vez los modelos y el extractor compartidos
+    get_model_registry().preload(settings.API_PRELOAD_MODELS)
+    get_extractor()
+    try:
+        get_pool()
+    except Exception as e:
+        # La API arranca igualmente; el pool se reintenta en la primera petición
+        logging.error(f"No se pudo crear el pool de PostgreSQL: {e}")
+    yield
+    # Liberar el pool de procesos de extracción
+    get_extractor().close()
+    get_admission().close()
+    close_pool()
+    shutdown_process_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(router, prefix="/api/v1")
 settings = get_settings()
 
 
+@app.exception_handler(ServiceOverloadedError)
+async def service_overloaded_handler(request: Request, exc: ServiceOverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 def create_batch(files: List[Dict]) -> List[List[Dict]]:
     """Crea batches de archivos del tamaño especificado"""
     return [files[i:i + settings.BATCH_SIZE] 
             for i in range(0, len(files), settings.BATCH_SIZE)]
 
-@app.post("/documents")
-async def upload_documents(
-    files: List[UploadFile] = File(..., description="Múltiples archivos PDF")
-):
-    if not files:
-        raise HTTPException(
-            status_code=400, 
-            detail="No se proporcionaron archivos"
-        )
+@app.post("/documents", openapi_extra=upload_openapi("files", multiple=True))
+async def upload_documents(request: Request):
+    admission = get_admission()
+    # Los archivos llegan en streaming a disco; un archivo demasiado grande corta la petición con 413
+    files = await receive_uploads(
+        request, "files", settings.UPLOAD_DIR, settings.MAX_UPLOAD_SIZE,
+        max_files=settings.MAX_FILES, run=admission.run
+    )
     
     try:
         rabbitmq = RabbitMQClient()
+        blob_store = get_blob_store()
         documents = []
         
-        # Procesar archivos
+        # Procesar archivos: el PDF va al almacén de blobs y a la cola solo su referencia
         for file in files:
-            content = await file.read()
             document_id = str(uuid.uuid4())
-            content_base64 = base64.b64encode(content).decode('utf-8')
+            blob_key = document_blob_key(document_id)
+            size = await admission.run(blob_store.put_file, blob_key, file.path)
             
             document = {
                 "document_id": document_id,
                 "filename": file.filename,
-                "content": content_base64,
+                "blob_key": blob_key,
+                "size": size,
                 "content_type": "application/pdf"
             }
             
             # Publicar en cola de subida
             rabbitmq.publish_upload(document)
             documents.append(document)
-            await file.close()
         
         # Crear y publicar batches para procesamiento
         batches = create_batch(documents)
@@ -75,5 +109,7 @@ async def upload_documents(
             detail="Error interno al procesar los archivos"
         )
     finally:
+        # El almacén local mueve el archivo; con S3 queda la copia temporal
         for file in files:
-            await file.close()
\ No newline at end of file
+            if os.path.exists(file.path):
+                os.remove(file.path)
\ No newline at end of file
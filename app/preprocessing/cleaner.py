@@ -1,8 +1,22 @@
 import re
+from typing import List, Sequence
+
+# Separador entre textos al procesar un lote como una sola cadena (uso privado de Unicode)
+SENTINEL = '\ue000'
+
+# Caracteres no alfanuméricos excepto espacios y puntuación básica
+_SPECIAL_CHARS = re.compile(r'[^A-Za-zÁÉÍÓÚáéíóúñÑ0-9\s.,;:!?¿¡]')
+_SPECIAL_CHARS_BATCH = re.compile(r'[^A-Za-zÁÉÍÓÚáéíóúñÑ0-9\s.,;:!?¿¡' + SENTINEL + r']')
 
 class TextCleaner:
     def clean(self, text: str) -> str:
         """Limpia el texto eliminando caracteres especiales."""
-        # Eliminar caracteres no alfanuméricos excepto espacios y puntuación básica
-        cleaned_text = re.sub(r'[^A-Za-zÁÉÍÓÚáéíóúñÑ0-9\s.,;:!?¿¡]', '', text)
-        return cleaned_text
\ No newline at end of file
+        return _SPECIAL_CHARS.sub('', text)
+
+    def clean_many(self, texts: Sequence[str]) -> List[str]:
+        """Limpia un lote de textos con una sola pasada de la expresión regular."""
+        if not texts:
+            return []
+        if any(SENTINEL in text for text in texts):
+            return [self.clean(text) for text in texts]
+        return _SPECIAL_CHARS_BATCH.sub('', SENTINEL.join(texts)).split(SENTINEL)
@@ -0,0 +1,143 @@
+from collections import Counter
+from typing import Dict, Optional, Tuple
+from pdfminer.layout import LTChar, LTText, LTTextContainer
+
+
+class ElementFeatures:
+    """Características de un elemento de texto obtenidas en un único recorrido"""
+
+    __slots__ = (
+        'raw_text', 'text', 'bbox',
+        'fontname', 'size',
+        'size_histogram', 'char_count', 'size_sum',
+        'bold_chars', 'italic_chars'
+    )
+
+    def __init__(self, bbox: Tuple[float, float, float, float]):
+        self.raw_text = ''
+        self.text = ''
+        self.bbox = bbox
+        # Fuente del primer carácter de la primera línea
+        self.fontname: Optional[str] = None
+        self.size: Optional[float] = None
+        self.size_histogram: Counter = Counter()
+        self.char_count = 0
+        self.size_sum = 0.0
+        self.bold_chars = 0
+        self.italic_chars = 0
+
+    @property
+    def x0(self) -> float:
+        return self.bbox[0]
+
+    @property
+    def average_size(self) -> float:
+        return self.size_sum / self.char_count if self.char_count else 0
+
+    @property
+    def dominant_size(self) -> float:
+        if not self.size_histogram:
+            return 0
+        return self.size_histogram.most_common(1)[0][0]
+
+    @property
+    def bold_ratio(self) -> float:
+        return self.bold_chars / self.char_count if self.char_count else 0
+
+    @property
+    def italic_ratio(self) -> float:
+        return self.italic_chars / self.char_count if self.char_count else 0
+
+
+def collect_features(element) -> ElementFeatures:
+    """Recorre una vez las líneas y caracteres del elemento y acumula texto, fuentes y bbox."""
+    features = ElementFeatures((element.x0, element.y0, element.x1, element.y1))
+
+    if not isinstance(element, LTTextContainer):
+        features.raw_text = element.get_text().strip() if isinstance(element, LTText) else ''
+        features.text = features.raw_text
+        return features
+
+    raw_parts = []
+    text_parts = []
+    fontnames = []
+    sizes = []
+    add_fontname = fontnames.append
+    add_size = sizes.append
+    for line_index, text_line in enumerate(element):
+        if not isinstance(text_line, LTTextContainer):
+            if isinstance(text_line, LTText):
+                raw_parts.append(text_line.get_text())
+            continue
+
+        # Las líneas solo contienen LTChar y LTAnno, ambos con get_text()
+        line_parts = []
+        add_part = line_parts.append
+        first_char = len(sizes)
+        for char in text_line:
+            add_part(char.get_text())
+            if isinstance(char, LTChar):
+                add_fontname(char.fontname)
+                add_size(char.size)
+
+        line_text = ''.join(line_parts)
+        raw_parts.append(line_text)
+        if len(sizes) > first_char:
+            text_parts.append(line_text.strip())
+            if line_index == 0:
+                features.fontname = fontnames[0]
+                features.size = sizes[0]
+
+    # Agregados calculados en C sobre las listas acumuladas
+    features.char_count = len(sizes)
+    features.size_sum = sum(sizes)
+    features.size_histogram = Counter(sizes)
+    for fontname, count in Counter(fontnames).items():
+        if 'Bold' in fontname:
+            features.bold_chars += count
+        if 'Italic' in fontname:
+            features.italic_chars += count
+
+    features.raw_text = ''.join(raw_parts).strip()
+    features.text = ' '.join(text_parts) if text_parts else features.raw_text
+    return features
+
+
+def collect_span_features(block: Dict, page_height: float) -> ElementFeatures:
+    """Características de un bloque de texto de PyMuPDF (``page.get_text("dict")``).
+
+    El bbox se pasa a coordenadas PDF (origen abajo a la izquierda) como en
+    pdfminer; los contadores por carácter se ponderan por la longitud de
+    cada span.
+    """
+    x0, y0, x1, y1 = block['bbox']
+    features = ElementFeatures((x0, page_height - y1, x1, page_height - y0))
+
+    raw_parts = []
+    text_parts = []
+    sizes: Counter = Counter()
+    for line_index, line in enumerate(block['lines']):
+        line_text = ''.join(span['text'] for span in line['spans'])
+        raw_parts.append(line_text)
+        if not line_text:
+            continue
+        text_parts.append(line_text.strip())
+        for span in line['spans']:
+            count = len(span['text'])
+            if not count:
+                continue
+            if line_index == 0 and features.fontname is None:
+                features.fontname = span['font']
+                features.size = span['size']
+            sizes[span['size']] += count
+            if 'Bold' in span['font']:
+                features.bold_chars += count
+            if 'Italic' in span['font']:
+                features.italic_chars += count
+
+    features.char_count = sum(sizes.values())
+    features.size_sum = sum(size * count for size, count in sizes.items())
+    features.size_histogram = sizes
+    features.raw_text = '\n'.join(raw_parts).strip()
+    features.text = ' '.join(text_parts) if text_parts else features.raw_text
+    return features
@@ -0,0 +1,27 @@
+from typing import Optional
+import fitz  # PyMuPDF
+
+# Motores de extracción: 'layout' (pdfminer, análisis de disposición) y 'fast' (PyMuPDF)
+ENGINES = ('layout', 'fast')
+ENGINE_CHOICES = ('auto',) + ENGINES
+
+
+def count_pages(pdf_path: str) -> int:
+    """Número de páginas leyendo solo el árbol de páginas"""
+    with fitz.open(pdf_path) as document:
+        return document.page_count
+
+
+def resolve_engine(requested: Optional[str], pdf_path: str, page_threshold: int) -> str:
+    """Motor a usar para un documento.
+
+    ``auto`` elige ``fast`` para documentos de ``page_threshold`` páginas o
+    más, donde el análisis de layout de pdfminer domina el tiempo, y
+    ``layout`` para el resto.
+    """
+    requested = requested or 'auto'
+    if requested not in ENGINE_CHOICES:
+        raise ValueError(f"Motor de extracción no soportado: {requested}")
+    if requested != 'auto':
+        return requested
+    return 'fast' if count_pages(pdf_path) >= page_threshold else 'layout'
@@ -0,0 +1,122 @@
+import hashlib
+import mmap
+from typing import Dict, Iterator, Optional
+import fitz  # PyMuPDF
+from .element_features import collect_span_features
+from .page_content import PageContent, PageContentBuilder
+from .pdf_extractor import PDFExtractor
+from .pdf_source import ParsedPDF, PDFSource, is_path
+
+# Bloques de texto sin las imágenes incrustadas (se describen aparte sin sus bytes)
+_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def _pdf_bbox(rect, page_height: float) -> tuple:
+    """Pasa un rectángulo de PyMuPDF (origen arriba) a coordenadas PDF (origen abajo)"""
+    x0, y0, x1, y1 = rect
+    return (x0, page_height - y1, x1, page_height - y0)
+
+
+def _open(source: PDFSource):
+    """Abre una ruta o un buffer con MuPDF (un mmap se pasa como memoryview, sin copiarlo)"""
+    if is_path(source):
+        return fitz.open(source)
+    return fitz.open(stream=memoryview(source) if isinstance(source, mmap.mmap) else source, filetype="pdf")
+
+
+def _position(bbox: tuple) -> Dict:
+    return {'x0': bbox[0], 'y0': bbox[1], 'x1': bbox[2], 'y1': bbox[3]}
+
+
+class FastPDFExtractor(PDFExtractor):
+    """Motor ``fast``: texto, bboxes de bloques y spans de fuente con PyMuPDF.
+
+    Produce el mismo ``PageContent`` que el motor ``layout`` (pdfminer) sin
+    su análisis de disposición: los bloques son los de MuPDF, las líneas
+    son los trazos rectos de la página y las imágenes se describen por xref
+    sin copiar sus bytes. Los metadatos, idiomas y estadísticas se calculan
+    igual que en ``PDFExtractor``.
+    """
+
+    ENGINE = 'fast'
+
+    def __init__(self, max_workers: int = 1, **kwargs):
+        # MuPDF recorre el documento en un único hilo; no usa el pool de procesos
+        super().__init__(extraction_mode='thread', max_workers=max_workers, **kwargs)
+
+    def cache_fingerprint(self) -> str:
+        detector = self.language_detector
+        config = f"{self.ENGINE}|{self.VERSION}|{fitz.VersionBind}|{detector.min_length}|{detector.sample_chars}"
+        return hashlib.sha1(config.encode('utf-8')).hexdigest()[:16]
+
+    def _count_pages(self, source: PDFSource) -> int:
+        with _open(source) as document:
+            return document.page_count
+
+    def iter_pages(
+        self,
+        source: PDFSource,
+        window: Optional[int] = None,
+        parsed: Optional[ParsedPDF] = None
+    ) -> Iterator[PageContent]:
+        """Genera los resultados página a página; ``window`` y ``parsed`` (pdfminer) no aplican a este motor"""
+        with _open(source) as document:
+            # Descriptores de imagen por xref, compartidos por todas las páginas
+            image_objects: Dict[int, Dict] = {}
+            for page_num, page in enumerate(document):
+                yield self._process_fitz_page(document, page, page_num, image_objects)
+
+    def _process_fitz_page(self, document, page, page_num: int, image_objects: Dict[int, Dict]) -> PageContent:
+        builder = PageContentBuilder(page_num)
+        height = page.rect.height
+
+        for block in page.get_text("dict", flags=_TEXT_FLAGS)['blocks']:
+            if block['type'] != 0:
+                continue
+            features = collect_span_features(block, height)
+            box = builder.add_text_box(features.bbox, features.raw_text)
+            self._process_text_element(builder, features, page, features, box)
+
+        for path in page.get_drawings():
+            items = path['items']
+            if len(items) == 1 and items[0][0] == 'l':
+                start, end = items[0][1], items[0][2]
+                rect = (min(start.x, end.x), min(start.y, end.y), max(start.x, end.x), max(start.y, end.y))
+                builder.add_line(_pdf_bbox(rect, height))
+
+        self._add_images(builder, document, page, image_objects)
+
+        languages, language_detection = self._assign_languages(builder.texts)
+        return builder.build(languages, language_detection)
+
+    def _add_images(self, builder: PageContentBuilder, document, page, image_objects: Dict[int, Dict]):
+        """Registra cada imagen como figura (como hace pdfminer con los XObject).
+
+        Las posiciones se piden por referencia con ``get_image_bbox``:
+        ``get_image_info(xrefs=True)`` decodifica cada imagen para calcular
+        su MD5 y es más lento que el propio análisis de pdfminer.
+        """
+        height = page.rect.height
+        for item in page.get_images(full=True):
+            xref, _, width, image_height, bits, _, _, name, filters, _ = item
+            if xref not in image_objects:
+                rawdata = document.xref_stream_raw(xref) or b''
+                image_objects[xref] = {
+                    'objid': xref,
+                    'filter': filters.split() if filters else [],
+                    'width': width,
+                    'height': image_height,
+                    'bits': bits,
+                    'length': len(rawdata),
+                    'sha256': hashlib.sha256(rawdata).hexdigest(),
+                    'blob_key': None
+                }
+            rect = page.get_image_bbox(item)
+            if rect.is_empty or rect.is_infinite:
+                continue
+            image_id = str(xref)
+            builder.image_objects[image_id] = image_objects[xref]
+            bbox = _pdf_bbox(rect, height)
+            content = [{**_position(bbox), 'name': name, 'image_id': image_id}]
+            builder.figures.append({"type": "figure", "content": content, "position": _position(bbox)})
+            builder.layout_figures.append({**_position(bbox), 'content': content})
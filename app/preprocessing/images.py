@@ -0,0 +1,116 @@
+import hashlib
+import io
+import logging
+from typing import Dict, Optional
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import PDFStream, resolve1
+from pdfminer.psparser import PSLiteral
+
+logger = logging.getLogger(__name__)
+
+IMAGE_KEY_PREFIX = "images"
+
+
+def _name(value) -> Optional[str]:
+    value = resolve1(value)
+    if isinstance(value, PSLiteral):
+        return value.name if isinstance(value.name, str) else value.name.decode('latin-1')
+    if isinstance(value, bytes):
+        return value.decode('latin-1')
+    return value if isinstance(value, str) else None
+
+
+def image_id(stream: PDFStream) -> str:
+    """Identificador de la imagen dentro del documento: su número de objeto PDF,
+    o el hash del contenido para imágenes en línea (BI/ID/EI), que no tienen"""
+    if stream.objid is not None:
+        return str(stream.objid)
+    digest = hashlib.sha256(stream.get_rawdata() or b'').hexdigest()
+    return f"inline-{digest[:16]}"
+
+
+def describe_image(element) -> Dict:
+    """Descriptor ligero de la imagen de un ``LTImage``: sin los bytes del stream"""
+    stream = element.stream
+    rawdata = stream.get_rawdata() or b''
+    filters = resolve1(stream.get_any(('F', 'Filter')))
+    if not isinstance(filters, list):
+        filters = [filters] if filters is not None else []
+    width, height = element.srcsize
+    return {
+        'objid': stream.objid,
+        'filter': [_name(f) for f in filters],
+        'width': resolve1(width),
+        'height': resolve1(height),
+        'bits': resolve1(element.bits),
+        'length': len(rawdata),
+        'sha256': hashlib.sha256(rawdata).hexdigest(),
+        'blob_key': None
+    }
+
+
+class ImageStreamReader:
+    """Lee bajo demanda los bytes de imágenes del PDF por número de objeto.
+
+    El documento se analiza una vez al abrir el lector; cada ``read`` solo
+    resuelve el objeto pedido a través de la tabla xref.
+    """
+
+    def __init__(self, pdf_path: str):
+        self._file = open(pdf_path, 'rb')
+        self.document = PDFDocument(PDFParser(self._file))
+
+    def read(self, objid: int) -> Optional[bytes]:
+        stream = self.document.getobj(objid)
+        return stream.get_rawdata() if isinstance(stream, PDFStream) else None
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_image(pdf_path: str, objid: int) -> Optional[bytes]:
+    """Bytes crudos (sin decodificar) de la imagen ``objid`` del PDF"""
+    with ImageStreamReader(pdf_path) as reader:
+        return reader.read(objid)
+
+
+def spill_images(pdf_path: str, image_objects: Dict[str, Dict], store) -> int:
+    """Copia al almacén de blobs las imágenes aún no guardadas y anota su ``blob_key``.
+
+    Las claves dependen del contenido (``images/<sha256>``), así que una
+    imagen repetida en varios objetos o documentos se guarda una sola vez.
+    Las imágenes en línea no se pueden releer por número de objeto y se
+    omiten. Devuelve el número de blobs escritos.
+    """
+    pending = [image for image in image_objects.values() if image.get('blob_key') is None]
+    if not pending:
+        return 0
+
+    written = 0
+    stored = set()
+    with ImageStreamReader(pdf_path) as reader:
+        for image in pending:
+            if image.get('objid') is None:
+                continue
+            key = f"{IMAGE_KEY_PREFIX}/{image['sha256']}"
+            if key not in stored:
+                data = reader.read(image['objid'])
+                if data is None:
+                    logger.warning(f"Objeto de imagen {image['objid']} no encontrado en {pdf_path}")
+                    continue
+                # La clave es el hash del contenido: no guardar bytes que no corresponden
+                if hashlib.sha256(data).hexdigest() != image['sha256']:
+                    logger.warning(f"El objeto de imagen {image['objid']} de {pdf_path} no coincide con su sha256")
+                    continue
+                store.put_stream(key, io.BytesIO(data))
+                stored.add(key)
+                written += 1
+            image['blob_key'] = key
+    return written
@@ -0,0 +1,83 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from langdetect import DetectorFactory, LangDetectException, detect
+
+# Semilla fija: langdetect muestrea n-gramas al azar en cada llamada
+DetectorFactory.seed = 0
+
+
+class LanguageDetector:
+    """Detección de idioma por página con caché LRU por hash de texto.
+
+    Los bloques más cortos que ``min_length`` no se analizan y heredan el
+    idioma de la página, que se detecta una vez sobre una ventana de
+    ``sample_chars`` caracteres.
+    """
+
+    def __init__(self, min_length: int = 40, sample_chars: int = 2000, cache_size: int = 4096):
+        self.min_length = min_length
+        self.sample_chars = sample_chars
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def empty_stats() -> Dict:
+        return {
+            'seconds': 0.0,
+            'detections': 0,
+            'cache_hits': 0,
+            'inherited_blocks': 0
+        }
+
+    def detect(self, text: str, stats: Optional[Dict] = None) -> Optional[str]:
+        """Idioma de ``text`` o ``None`` si es demasiado corto o no concluyente"""
+        sample = text.strip()[:self.sample_chars]
+        if len(sample) < self.min_length:
+            return None
+
+        key = hashlib.blake2b(sample.encode('utf-8', errors='ignore'), digest_size=16).digest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                if stats is not None:
+                    stats['cache_hits'] += 1
+                return self._cache[key]
+
+        start = time.perf_counter()
+        try:
+            lang = detect(sample)
+        except LangDetectException:
+            lang = None
+        if stats is not None:
+            stats['seconds'] += time.perf_counter() - start
+            stats['detections'] += 1
+
+        with self._lock:
+            self._cache[key] = lang
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return lang
+
+    def detect_page(self, texts: Iterable[str], stats: Optional[Dict] = None) -> Optional[str]:
+        """Detecta el idioma de la página sobre una ventana de texto muestreada"""
+        window = []
+        size = 0
+        for text in texts:
+            window.append(text)
+            size += len(text) + 1
+            if size >= self.sample_chars:
+                break
+        return self.detect(' '.join(window), stats)
+
+    def assign(self, text: str, page_language: Optional[str], stats: Optional[Dict] = None) -> str:
+        """Idioma de un bloque; los bloques cortos heredan el de la página"""
+        lang = None
+        if len(text) >= self.min_length:
+            lang = self.detect(text, stats)
+        elif stats is not None:
+            stats['inherited_blocks'] += 1
+        return lang or page_language or 'unknown'
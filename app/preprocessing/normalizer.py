@@ -1,17 +1,45 @@
 import unicodedata
 import re
-from typing import Optional
+from typing import List, Sequence
+from app.preprocessing.cleaner import SENTINEL
+
+# Equivale a r'\s+' -> ' ' sin reescribir los espacios simples, que ya están bien
+_WHITESPACE = re.compile(r'\s\s+|[^\S ]')
+
+
+class _AccentTable(dict):
+    """Tabla para ``str.translate``: cada carácter a su forma NFKD sin marcas combinantes.
+
+    Se rellena bajo demanda; el resultado es el mismo que normalizar la
+    cadena completa porque NFKD descompone carácter a carácter y el
+    reordenamiento canónico solo afecta a las marcas que se eliminan.
+    """
+
+    def __missing__(self, codepoint: int):
+        decomposed = unicodedata.normalize('NFKD', chr(codepoint))
+        value = ''.join(c for c in decomposed if not unicodedata.combining(c))
+        self[codepoint] = value
+        return value
+
+
+_ACCENTS = _AccentTable()
+
 
 class TextNormalizer:
     def normalize(self, text: str) -> str:
         """Normaliza el texto eliminando espacios extras y acentos."""
-        # Eliminar espacios en blanco al inicio y al final
-        normalized_text = text.strip()
-        # Convertir a minúsculas
-        normalized_text = normalized_text.lower()
-        # Eliminar acentos
-        normalized_text = unicodedata.normalize('NFKD', normalized_text)
-        normalized_text = ''.join([c for c in normalized_text if not unicodedata.combining(c)])
+        # Eliminar espacios al inicio y al final y convertir a minúsculas
+        normalized_text = text.strip().lower()
+        # Eliminar acentos (el ASCII no cambia con NFKD)
+        if not normalized_text.isascii():
+            normalized_text = normalized_text.translate(_ACCENTS)
         # Reemplazar múltiples espacios por uno
-        normalized_text = re.sub(r'\s+', ' ', normalized_text)
-        return normalized_text
\ No newline at end of file
+        return _WHITESPACE.sub(' ', normalized_text)
+
+    def normalize_many(self, texts: Sequence[str]) -> List[str]:
+        """Normaliza un lote de textos como una sola cadena separada por centinelas."""
+        if not texts:
+            return []
+        if any(SENTINEL in text for text in texts):
+            return [self.normalize(text) for text in texts]
+        return self.normalize(SENTINEL.join(text.strip() for text in texts)).split(SENTINEL)
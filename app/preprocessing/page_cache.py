@@ -0,0 +1,169 @@
+import hashlib
+from functools import lru_cache
+from typing import Dict, Optional, Set
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import PDFObjRef, PDFStream, resolve1
+from pdfminer.psparser import LIT, PSKeyword, PSLiteral
+from app.core.config import get_settings
+from app.infraestructure.cache.result_cache import (
+    DiskBackedCache, ExtractionResultCache, LocalCache, build_cache_backend
+)
+from .language import LanguageDetector
+from .page_content import PageContent
+
+
+class PageHasher:
+    """Hash del contenido de cada página de un documento.
+
+    Cubre los streams de contenido, los recursos resueltos en profundidad
+    (fuentes, XObjects e imágenes, incluidos sus bytes) y las cajas y la
+    rotación, que cambian las coordenadas. No depende de los números de
+    objeto, así que una página idéntica en un PDF reescrito da el mismo
+    hash. Los objetos compartidos entre páginas (una fuente, un logo) se
+    resumen una sola vez por documento.
+    """
+
+    def __init__(self):
+        self._digests: Dict[int, bytes] = {}
+        self._visiting: Set[int] = set()
+
+    def page_hash(self, page: PDFPage) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        h.update(repr((page.mediabox, page.cropbox, page.rotate)).encode('utf-8'))
+        for stream in page.contents:
+            self._update(h, stream)
+        self._update(h, page.resources)
+        return h.hexdigest()
+
+    def _object_digest(self, objid: int, obj) -> bytes:
+        if objid in self._digests:
+            return self._digests[objid]
+        if objid in self._visiting:
+            return b'<ciclo>'
+        self._visiting.add(objid)
+        try:
+            h = hashlib.blake2b(digest_size=20)
+            self._update(h, obj, resolved=True)
+            digest = h.digest()
+        finally:
+            self._visiting.discard(objid)
+        self._digests[objid] = digest
+        return digest
+
+    def _update(self, h, obj, resolved: bool = False):
+        if isinstance(obj, PDFObjRef):
+            h.update(b'R' + self._object_digest(obj.objid, obj.resolve()))
+        elif isinstance(obj, PDFStream):
+            if not resolved and obj.objid is not None:
+                h.update(b'R' + self._object_digest(obj.objid, obj))
+                return
+            h.update(b'S')
+            self._update(h, obj.attrs)
+            rawdata = obj.get_rawdata()
+            h.update(len(rawdata or b'').to_bytes(8, 'little'))
+            h.update(rawdata or b'')
+        elif isinstance(obj, dict):
+            h.update(b'{')
+            for key in sorted(obj, key=str):
+                # Parent apunta hacia arriba en el árbol y no describe la página
+                if key == 'Parent':
+                    continue
+                h.update(str(key).encode('utf-8') + b':')
+                self._update(h, obj[key])
+            h.update(b'}')
+        elif isinstance(obj, list):
+            h.update(b'[')
+            for item in obj:
+                self._update(h, item)
+            h.update(b']')
+        elif isinstance(obj, PSLiteral):
+            h.update(b'/' + (obj.name if isinstance(obj.name, bytes) else obj.name.encode('utf-8')))
+        elif isinstance(obj, PSKeyword):
+            h.update(b'K' + obj.name)
+        elif isinstance(obj, bytes):
+            h.update(b'b' + len(obj).to_bytes(8, 'little') + obj)
+        else:
+            h.update(repr(obj).encode('utf-8'))
+
+
+def page_image_objects(page: PDFPage) -> Dict[str, int]:
+    """SHA-256 de los bytes de cada imagen XObject de la página (también dentro
+    de XObjects de formulario) con su número de objeto en este documento"""
+    objids: Dict[str, int] = {}
+    visited: Set[int] = set()
+
+    def walk(resources):
+        resources = resolve1(resources)
+        xobjects = resolve1(resources.get('XObject')) if isinstance(resources, dict) else None
+        if not isinstance(xobjects, dict):
+            return
+        for xobject in xobjects.values():
+            stream = resolve1(xobject)
+            if not isinstance(stream, PDFStream) or stream.objid in visited:
+                continue
+            visited.add(stream.objid)
+            subtype = stream.get('Subtype')
+            if subtype is LIT('Image'):
+                digest = hashlib.sha256(stream.get_rawdata() or b'').hexdigest()
+                objids.setdefault(digest, stream.objid)
+            elif subtype is LIT('Form'):
+                walk(stream.get('Resources'))
+
+    walk(page.resources)
+    return objids
+
+
+class PageResultCache:
+    """Resultados de página (``PageContent``) indexados por el hash de la página.
+
+    Comparte el contrato de ``ExtractionResultCache`` (tipo ``page``), así
+    que el backend puede ser el LRU local, el LRU con respaldo en disco o
+    Redis.
+    """
+
+    def __init__(self, cache: ExtractionResultCache):
+        self.cache = cache
+
+    def get(self, page_hash: str, fingerprint: str, page_num: int, pdf_page: PDFPage) -> Optional[PageContent]:
+        """Resultado en caché de la página, con sus imágenes referidas a los
+        objetos de ``pdf_page``; ``None`` si no está o no se pueden reasignar"""
+        state = self.cache.get("page", page_hash, fingerprint)
+        if state is None:
+            return None
+        # La detección de idioma no se repite para una página en caché
+        page = PageContent.from_state(state, page_num, LanguageDetector.empty_stats())
+        # El hash no depende de los números de objeto: los del documento que
+        # llenó la caché no valen para este
+        referenced = {
+            image_id: image['sha256'] for image_id, image in page.image_objects.items()
+            if image.get('objid') is not None
+        }
+        if referenced:
+            current = page_image_objects(pdf_page)
+            if not set(referenced.values()) <= current.keys():
+                return None
+            page.remap_images({image_id: current[digest] for image_id, digest in referenced.items()})
+        return page
+
+    def put(self, page_hash: str, fingerprint: str, page: PageContent) -> bool:
+        return self.cache.put("page", page_hash, fingerprint, page.to_state())
+
+    def get_metrics(self) -> Dict:
+        return self.cache.get_metrics()
+
+
+@lru_cache()
+def get_page_cache() -> PageResultCache:
+    settings = get_settings()
+    if settings.RESULT_CACHE_BACKEND == "redis":
+        backend = build_cache_backend(settings.PAGE_CACHE_MAX_ENTRIES)
+    elif settings.PAGE_CACHE_DIR:
+        backend = DiskBackedCache(
+            settings.PAGE_CACHE_DIR,
+            max_entries=settings.PAGE_CACHE_MAX_ENTRIES,
+            max_bytes=settings.PAGE_CACHE_MAX_BYTES,
+            ttl=settings.RESULT_CACHE_TTL
+        )
+    else:
+        backend = LocalCache(max_entries=settings.PAGE_CACHE_MAX_ENTRIES)
+    return PageResultCache(ExtractionResultCache(backend, ttl=settings.RESULT_CACHE_TTL))
@@ -0,0 +1,324 @@
+import sys
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .images import describe_image, image_id
+
+# Códigos de las columnas categóricas
+BLOCK_TEXT, BLOCK_LINE = 0, 1
+HIERARCHIES = ('title', 'subtitle', 'body')
+ELEMENT_TYPES = ('title', 'subtitle', 'paragraph')
+NO_CODE = -1
+
+_BBOX = [('x0', 'f8'), ('y0', 'f8'), ('x1', 'f8'), ('y1', 'f8')]
+
+# Un registro por bloque de contenido (texto o línea), en orden de aparición
+BLOCK_DTYPE = np.dtype(_BBOX + [
+    ('kind', 'u1'),
+    ('box', 'i4'),          # cuadro de layout del que sale el texto (-1 si no hay)
+    ('length', 'i4'),       # longitud del texto del bloque
+    ('font', 'i2'),         # índice en ``fonts`` (-1 sin fuente)
+    ('size', 'f8'),
+    ('hierarchy', 'i1'),
+    ('type', 'i1'),
+    ('column', 'i1'),
+    ('language', 'i2'),     # índice en ``languages``
+])
+
+# Un registro por cuadro de texto del layout; su texto crudo vive en ``raw_text``
+BOX_DTYPE = np.dtype(_BBOX + [('start', 'i4'), ('end', 'i4')])
+
+
+def join_lines(raw_text: str) -> str:
+    """Texto de un bloque a partir de su texto crudo: líneas sin espacios extremos unidas por espacios"""
+    parts = [line.strip() for line in raw_text.split('\n')]
+    parts = [part for part in parts if part]
+    return ' '.join(parts) if parts else raw_text
+
+
+def _position(record) -> Dict:
+    return {'x0': record[0], 'y0': record[1], 'x1': record[2], 'y1': record[3]}
+
+
+class PageContent:
+    """Resultado compacto de una página en columnas.
+
+    Los bloques y los cuadros de layout son arrays estructurados de NumPy,
+    las fuentes e idiomas se guardan una vez por página y el texto crudo de
+    todos los cuadros va en una sola cadena con offsets. El texto de cada
+    bloque se deriva del cuadro del que sale (``join_lines``) y solo se
+    guarda aparte cuando no coincide, así el texto no se duplica entre
+    ``content`` y ``structure.layout.text_boxes``. Las imágenes se describen
+    una vez por objeto PDF en ``image_objects`` y cada aparición solo guarda
+    su ``image_id``. ``to_dict()`` reconstruye el formato de diccionarios.
+    """
+
+    __slots__ = (
+        'page_num', 'blocks', 'boxes', 'raw_text', 'text_overrides',
+        'fonts', 'languages', 'figures', 'images', 'layout_images',
+        'layout_figures', 'image_objects', 'language_detection', 'cached'
+    )
+
+    def __init__(
+        self,
+        page_num: int,
+        blocks: np.ndarray,
+        boxes: np.ndarray,
+        raw_text: str,
+        text_overrides: Dict[int, str],
+        fonts: Tuple[str, ...],
+        languages: Tuple[str, ...],
+        figures: List[Dict],
+        images: List[Dict],
+        layout_images: List[Dict],
+        layout_figures: List[Dict],
+        image_objects: Dict[str, Dict],
+        language_detection: Dict,
+        cached: bool = False
+    ):
+        self.page_num = page_num
+        self.blocks = blocks
+        self.boxes = boxes
+        self.raw_text = raw_text
+        self.text_overrides = text_overrides
+        self.fonts = fonts
+        self.languages = languages
+        self.figures = figures
+        self.images = images
+        self.layout_images = layout_images
+        self.layout_figures = layout_figures
+        self.image_objects = image_objects
+        self.language_detection = language_detection
+        # True si el resultado viene de la caché de páginas
+        self.cached = cached
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def box_text(self, box: int) -> str:
+        start, end = self.boxes['start'][box], self.boxes['end'][box]
+        return self.raw_text[start:end]
+
+    def text_blocks(self) -> List[int]:
+        """Índices de los bloques de texto, en orden"""
+        return np.flatnonzero(self.blocks['kind'] == BLOCK_TEXT).tolist()
+
+    def text(self, index: int) -> str:
+        override = self.text_overrides.get(index)
+        if override is not None:
+            return override
+        return join_lines(self.box_text(self.blocks['box'][index]))
+
+    def texts(self) -> List[str]:
+        return [self.text(index) for index in self.text_blocks()]
+
+    def position(self, index: int) -> Dict:
+        return _position(self.blocks[index].tolist())
+
+    def style(self, index: int) -> Dict:
+        record = self.blocks[index]
+        return self._style(int(record['font']), float(record['size']))
+
+    def language(self, index: int) -> Optional[str]:
+        code = int(self.blocks['language'][index])
+        return self.languages[code] if code != NO_CODE else None
+
+    def _style(self, font: int, size: float) -> Dict:
+        if font == NO_CODE:
+            return {}
+        fontname = self.fonts[font]
+        return {
+            'fontname': fontname,
+            'size': size,
+            'bold': 'Bold' in fontname,
+            'italic': 'Italic' in fontname
+        }
+
+    def type_counts(self) -> Dict[str, int]:
+        """Número de bloques de texto por tipo (title, subtitle, paragraph)"""
+        counts = np.bincount(self.blocks['type'][self.blocks['type'] != NO_CODE], minlength=len(ELEMENT_TYPES))
+        return dict(zip(ELEMENT_TYPES, counts.tolist()))
+
+    def total_characters(self) -> int:
+        return int(self.blocks['length'][self.blocks['kind'] == BLOCK_TEXT].sum())
+
+    def content(self) -> List[Dict]:
+        """Bloques de contenido en el formato de diccionarios anterior"""
+        content = []
+        for index, record in enumerate(self.blocks.tolist()):
+            x0, y0, x1, y1, kind, _, _, font, size, hierarchy, element_type, column, language = record
+            if kind == BLOCK_LINE:
+                content.append({'line': {'position': _position(record)}})
+                continue
+            content.append({
+                'text': self.text(index),
+                'position': _position(record),
+                'style': self._style(font, size),
+                'hierarchy': HIERARCHIES[hierarchy],
+                'language': self.languages[language] if language != NO_CODE else None,
+                'column': column,
+                'type': ELEMENT_TYPES[element_type]
+            })
+        return content
+
+    def to_state(self) -> Dict:
+        """Estado serializable en JSON (caché de páginas), sin ``page_num`` ni estadísticas de idioma"""
+        return {
+            'blocks': self.blocks.tolist(),
+            'boxes': self.boxes.tolist(),
+            'raw_text': self.raw_text,
+            'text_overrides': {str(index): text for index, text in self.text_overrides.items()},
+            'fonts': list(self.fonts),
+            'languages': list(self.languages),
+            'figures': self.figures,
+            'images': self.images,
+            'layout_images': self.layout_images,
+            'layout_figures': self.layout_figures,
+            'image_objects': self.image_objects
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict, page_num: int, language_detection: Dict, cached: bool = True) -> 'PageContent':
+        return cls(
+            page_num=page_num,
+            blocks=np.array([tuple(record) for record in state['blocks']], dtype=BLOCK_DTYPE),
+            boxes=np.array([tuple(record) for record in state['boxes']], dtype=BOX_DTYPE),
+            raw_text=state['raw_text'],
+            text_overrides={int(index): text for index, text in state['text_overrides'].items()},
+            fonts=tuple(state['fonts']),
+            languages=tuple(state['languages']),
+            figures=state['figures'],
+            images=state['images'],
+            layout_images=state['layout_images'],
+            layout_figures=state['layout_figures'],
+            image_objects=state['image_objects'],
+            language_detection=language_detection,
+            cached=cached
+        )
+
+    def remap_images(self, objids: Dict[str, int]):
+        """Reasigna las imágenes a los números de objeto de otro documento.
+
+        ``objids`` va del ``image_id`` actual al nuevo número de objeto; se
+        actualizan los descriptores y cada aparición en figuras e imágenes.
+        """
+        ids = {old_id: str(objid) for old_id, objid in objids.items()}
+        image_objects = {}
+        for old_id, image in self.image_objects.items():
+            if old_id in ids:
+                image = {**image, 'objid': objids[old_id]}
+            image_objects[ids.get(old_id, old_id)] = image
+        self.image_objects = image_objects
+        placements = self.images + self.layout_images + [
+            item for figures in (self.figures, self.layout_figures)
+            for figure in figures for item in figure['content']
+        ]
+        for placement in placements:
+            if placement.get('image_id') in ids:
+                placement['image_id'] = ids[placement['image_id']]
+
+    def to_dict(self) -> Dict:
+        """Resultado de la página en el formato de diccionarios de la API"""
+        text_boxes = [
+            {'x0': x0, 'y0': y0, 'x1': x1, 'y1': y1, 'text': self.raw_text[start:end]}
+            for x0, y0, x1, y1, start, end in self.boxes.tolist()
+        ]
+        return {
+            'content': self.content(),
+            'figures': self.figures,
+            'images': self.images,
+            'image_objects': self.image_objects,
+            'structure': {
+                'page_num': self.page_num,
+                'layout': {
+                    'text_boxes': text_boxes,
+                    'images': self.layout_images,
+                    'figures': self.layout_figures
+                }
+            },
+            'language_detection': self.language_detection
+        }
+
+
+class PageContentBuilder:
+    """Acumula los elementos de una página y construye su ``PageContent``"""
+
+    def __init__(self, page_num: int):
+        self.page_num = page_num
+        self.blocks: List[tuple] = []
+        self.boxes: List[tuple] = []
+        self.raw_parts: List[str] = []
+        self.raw_size = 0
+        self.text_overrides: Dict[int, str] = {}
+        self.texts: List[str] = []
+        self.fonts: Dict[str, int] = {}
+        self.figures: List[Dict] = []
+        self.images: List[Dict] = []
+        self.layout_images: List[Dict] = []
+        self.layout_figures: List[Dict] = []
+        self.image_objects: Dict[str, Dict] = {}
+
+    def add_text_box(self, bbox: Tuple[float, float, float, float], raw_text: str) -> int:
+        """Registra un cuadro de texto del layout y devuelve su índice"""
+        self.raw_parts.append(raw_text)
+        start = self.raw_size
+        self.raw_size += len(raw_text)
+        self.boxes.append((*bbox, start, self.raw_size))
+        return len(self.boxes) - 1
+
+    def add_text_block(
+        self,
+        bbox: Tuple[float, float, float, float],
+        text: str,
+        box: Optional[int],
+        fontname: Optional[str],
+        size: Optional[float],
+        hierarchy: str,
+        element_type: str,
+        column: int
+    ):
+        index = len(self.blocks)
+        if box is None or join_lines(self.raw_parts[box]) != text:
+            self.text_overrides[index] = text
+        font = NO_CODE
+        if fontname is not None:
+            font = self.fonts.setdefault(sys.intern(fontname), len(self.fonts))
+        self.blocks.append((
+            *bbox, BLOCK_TEXT, NO_CODE if box is None else box, len(text), font,
+            size if size is not None else np.nan,
+            HIERARCHIES.index(hierarchy), ELEMENT_TYPES.index(element_type), column, NO_CODE
+        ))
+        self.texts.append(text)
+
+    def add_line(self, bbox: Tuple[float, float, float, float]):
+        self.blocks.append((*bbox, BLOCK_LINE, NO_CODE, 0, NO_CODE, np.nan, NO_CODE, NO_CODE, NO_CODE, NO_CODE))
+
+    def add_image(self, element) -> Optional[str]:
+        """Registra la imagen de un ``LTImage`` (una vez por objeto) y devuelve su ``image_id``"""
+        if element.stream is None:
+            return None
+        key = image_id(element.stream)
+        if key not in self.image_objects:
+            self.image_objects[key] = describe_image(element)
+        return key
+
+    def build(self, languages: List[str], language_detection: Dict) -> PageContent:
+        """``languages`` trae el idioma de cada bloque de texto, en orden"""
+        blocks = np.array(self.blocks, dtype=BLOCK_DTYPE)
+        language_table: Dict[str, int] = {}
+        codes = [language_table.setdefault(language, len(language_table)) for language in languages]
+        blocks['language'][blocks['kind'] == BLOCK_TEXT] = codes
+        return PageContent(
+            page_num=self.page_num,
+            blocks=blocks,
+            boxes=np.array(self.boxes, dtype=BOX_DTYPE),
+            raw_text=''.join(self.raw_parts),
+            text_overrides=self.text_overrides,
+            fonts=tuple(self.fonts),
+            languages=tuple(language_table),
+            figures=self.figures,
+            images=self.images,
+            layout_images=self.layout_images,
+            layout_figures=self.layout_figures,
+            image_objects=self.image_objects,
+            language_detection=language_detection
+        )
@@ -1,25 +1,161 @@
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+import asyncio
+import hashlib
 import logging
-from concurrent.futures import ThreadPoolExecutor
-import spacy
-from pdfminer.pdfparser import PDFParser
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pdfminer.pdfdocument import PDFDocument
-from pdfminer.high_level import extract_pages
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.converter import PDFPageAggregator
 from pdfminer.layout import (
-    LTTextContainer, LTChar, LTLine, 
+    LTText, LTLine,
     LTFigure, LTImage, LAParams,
     LTTextBox, LTTextBoxHorizontal
 )
-from langdetect import detect, LangDetectException
 import os
+from .element_features import ElementFeatures, collect_features
+from .page_content import PageContent, PageContentBuilder
+from .page_cache import PageHasher
+from .pdf_source import ParsedPDF, PDFSource, source_label
+from .language import LanguageDetector
 from .exceptions import PDFProcessingError  # Asegúrate de que esta excepción esté definida
 
+EXTRACTION_MODES = ('thread', 'process')
+
+# Pool de procesos compartido por todas las instancias del extractor
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+# Extractor reutilizado dentro de cada proceso worker
+_worker_extractor: Optional['PDFExtractor'] = None
+# Último documento abierto en el worker: (ruta, inodo, mtime) y su análisis
+_worker_document: Optional[Tuple[Tuple, ParsedPDF]] = None
+# El mmap retiene el fichero aunque se borre: un worker sin más rangos del
+# documento lo libera tras este tiempo inactivo
+WORKER_DOCUMENT_IDLE = 2.0
+_worker_document_lock = threading.Lock()
+_worker_release_timer: Optional[threading.Timer] = None
+
+
+def _get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Devuelve el pool de procesos compartido, creándolo si es necesario"""
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers != max_workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            # 'spawn' evita heredar locks de hilos del proceso de la API
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            _process_pool_workers = max_workers
+        return _process_pool
+
+
+def shutdown_process_pool():
+    """Cierra el pool de procesos compartido"""
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown()
+            _process_pool = None
+            _process_pool_workers = 0
+
+
+def _worker_parsed_pdf(pdf_path: str) -> ParsedPDF:
+    """Documento mapeado y analizado una vez por worker para todos sus rangos de páginas"""
+    global _worker_document
+    stat = os.stat(pdf_path)
+    key = (pdf_path, stat.st_ino, stat.st_mtime_ns)
+    if _worker_document is None or _worker_document[0] != key:
+        _release_worker_document()
+        _worker_document = (key, ParsedPDF(pdf_path))
+    return _worker_document[1]
+
+
+def _release_worker_document(key: Optional[Tuple] = None):
+    """Cierra el documento del worker (solo si sigue siendo ``key``, si se indica)"""
+    global _worker_document
+    if _worker_document is not None and (key is None or _worker_document[0] == key):
+        _worker_document[1].close()
+        _worker_document = None
+
+
+def _release_idle_worker_document(key: Tuple):
+    with _worker_document_lock:
+        _release_worker_document(key)
+
+
+def _extract_page_range(
+    pdf_path: str,
+    page_numbers: Sequence[int],
+    la_params: LAParams,
+    last: bool = False
+) -> List[PageContent]:
+    """Ejecuta el análisis de layout de un rango de páginas dentro de un proceso worker.
+
+    ``last`` indica el último rango del documento: el worker lo cierra al
+    terminar. Los demás workers lo cierran al quedar inactivos.
+    """
+    global _worker_extractor, _worker_release_timer
+    if _worker_extractor is None:
+        _worker_extractor = PDFExtractor(extraction_mode='thread', max_workers=1)
+    _worker_extractor.la_params = la_params
+
+    with _worker_document_lock:
+        if _worker_release_timer is not None:
+            _worker_release_timer.cancel()
+            _worker_release_timer = None
+        parsed = _worker_parsed_pdf(pdf_path)
+        try:
+            return [
+                _worker_extractor._process_page(layout, page_num)
+                for page_num, layout in _worker_extractor._layout_pages(parsed, page_numbers)
+            ]
+        finally:
+            if last:
+                _release_worker_document()
+            elif _worker_document is not None:
+                _worker_release_timer = threading.Timer(
+                    WORKER_DOCUMENT_IDLE, _release_idle_worker_document, (_worker_document[0],)
+                )
+                _worker_release_timer.daemon = True
+                _worker_release_timer.start()
+
 
 class PDFExtractor:
-    def __init__(self, cache_dir: Optional[str] = None):
-        """Inicializa el extractor de PDF con opciones avanzadas"""
+    # Incrementar cuando cambie el formato o la lógica de los resultados
+    VERSION = "3"
+    # Motor de extracción (ver app.preprocessing.engines)
+    ENGINE = 'layout'
+
+    def __init__(
+        self,
+        extraction_mode: str = 'process',
+        max_workers: int = 4,
+        pages_per_task: int = 8,
+        language_detector: Optional[LanguageDetector] = None,
+        page_cache=None
+    ):
+        """Inicializa el extractor de PDF con opciones avanzadas.
+
+        El extractor no carga modelos NLP; las etapas que los necesitan los
+        obtienen del registro compartido (``app.semantic.model_registry``).
+        Con ``page_cache`` (``PageResultCache``) solo se analizan las páginas
+        cuyo contenido no se ha visto antes.
+        """
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"Modo de extracción no soportado: {extraction_mode}")
+        self.extraction_mode = extraction_mode
+        self.max_workers = max(1, max_workers)
+        self.pages_per_task = max(1, pages_per_task)
+        self.language_detector = language_detector or LanguageDetector()
+        self.page_cache = page_cache
         self._setup_logging()
-        self._load_models(cache_dir)
         self._setup_processors()
         self._initialize_thread_pool()
 
@@ -34,23 +170,6 @@ class PDFExtractor:
         self.logger.addHandler(handler)
         self.logger.setLevel(logging.INFO)
 
-    def _load_models(self, cache_dir: Optional[str]):
-        """Carga modelos NLP con manejo de errores mejorado"""
-        try:
-            if cache_dir:
-                spacy.prefer_gpu()
-                self.nlp_es = spacy.load('es_core_news_lg', disable=['ner'])
-                self.nlp_en = spacy.load('en_core_web_sm', disable=['ner'])
-                self.nlp_es.max_length = 2000000
-                self.nlp_en.max_length = 2000000
-            else:
-                self.logger.warning("No se especificó directorio de caché")
-                self.nlp_es = spacy.load('es_core_news_lg')
-                self.nlp_en = spacy.load('en_core_web_sm')
-        except OSError as e:
-            self.logger.error(f"Error cargando modelos NLP: {e}")
-            raise PDFProcessingError(f"Error en carga de modelos: {str(e)}")
-
     def _setup_processors(self):
         """Configura parámetros de procesamiento PDF"""
         self.la_params = LAParams(
@@ -71,85 +190,103 @@ class PDFExtractor:
             'lttextboxhorizontal': self._process_text_element
         }
 
+    def cache_fingerprint(self) -> str:
+        """Huella de la configuración que determina el resultado de la extracción"""
+        params = ','.join(f"{key}={value}" for key, value in sorted(vars(self.la_params).items()))
+        detector = self.language_detector
+        config = f"{self.VERSION}|{params}|{detector.min_length}|{detector.sample_chars}"
+        return hashlib.sha1(config.encode('utf-8')).hexdigest()[:16]
+
     def _initialize_thread_pool(self):
         """Inicializa pool de hilos para procesamiento paralelo"""
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _count_pages(self, source: PDFSource) -> int:
+        """Cuenta las páginas del PDF sin ejecutar el análisis de layout"""
+        with ParsedPDF(source) as parsed:
+            return parsed.page_count()
 
-    def _extract_metadata(self, pdf_path: str) -> Dict:
-        """Extrae metadatos del PDF."""
+    def _page_ranges(self, total_pages: int) -> List[List[int]]:
+        """Divide el documento en rangos contiguos de páginas para los workers"""
+        return [
+            list(range(start, min(start + self.pages_per_task, total_pages)))
+            for start in range(0, total_pages, self.pages_per_task)
+        ]
+
+    def _extract_metadata(self, source) -> Dict:
+        """Extrae metadatos del PDF (ruta, buffer o ``ParsedPDF`` ya analizado)."""
         metadata = {}
         try:
-            with open(pdf_path, 'rb') as f:
-                parser = PDFParser(f)
-                document = PDFDocument(parser)
-                
-                if document.info:
-                    doc_info = document.info[0]
-                    for key, value in doc_info.items():
-                        if isinstance(key, bytes):
-                            clean_key = key.decode('utf-8').lstrip('/')
-                        else:
-                            clean_key = key.lstrip('/')
-                        
-                        if isinstance(value, bytes):
-                            clean_value = value.decode('utf-8', errors='ignore')
-                        else:
-                            clean_value = value
-                        
-                        metadata[clean_key] = clean_value
+            if isinstance(source, ParsedPDF):
+                metadata = self._read_metadata(source.document)
+            else:
+                with ParsedPDF(source) as parsed:
+                    metadata = self._read_metadata(parsed.document)
         except Exception as e:
             self.logger.error(f"Error extrayendo metadatos: {e}")
             metadata = {}
         
         return metadata
 
-    def _analyze_page_layout(self, page) -> Dict:
-        """Analiza la disposición de una página del PDF."""
-        layout_info = {
-            'text_boxes': [],
-            'images': [],
-            'figures': []
-        }
-        
-        try:
-            for element in page:
-                if isinstance(element, LTTextBox) or isinstance(element, LTTextBoxHorizontal):
-                    text_info = {
-                        'x0': element.x0,
-                        'y0': element.y0,
-                        'x1': element.x1,
-                        'y1': element.y1,
-                        'text': element.get_text().strip()
-                    }
-                    layout_info['text_boxes'].append(text_info)
+    def _read_metadata(self, document: PDFDocument) -> Dict:
+        """Diccionario Info del documento con claves y valores decodificados"""
+        metadata = {}
+        if document.info:
+            doc_info = document.info[0]
+            for key, value in doc_info.items():
+                if isinstance(key, bytes):
+                    clean_key = key.decode('utf-8').lstrip('/')
+                else:
+                    clean_key = key.lstrip('/')
                 
-                elif isinstance(element, LTImage):
-                    image_info = {
-                        'x0': element.x0,
-                        'y0': element.y0,
-                        'x1': element.x1,
-                        'y1': element.y1,
-                        'name': element.name,
-                        'stream': element.stream.get_rawdata() if element.stream else None
-                    }
-                    layout_info['images'].append(image_info)
+                if isinstance(value, bytes):
+                    clean_value = value.decode('utf-8', errors='ignore')
+                else:
+                    clean_value = value
                 
-                elif isinstance(element, LTFigure):
-                    figure_info = {
-                        'x0': element.x0,
-                        'y0': element.y0,
-                        'x1': element.x1,
-                        'y1': element.y1,
-                        'content': self._extract_figure_content(element)
-                    }
-                    layout_info['figures'].append(figure_info)
+                metadata[clean_key] = clean_value
+        return metadata
+
+    def _add_layout_element(
+        self,
+        builder: PageContentBuilder,
+        element,
+        features: Optional[ElementFeatures]
+    ) -> Optional[int]:
+        """Registra un elemento en el análisis de disposición de la página.
+
+        Devuelve el índice del cuadro de texto registrado, si lo hay.
+        """
+        try:
+            if isinstance(element, LTTextBox) or isinstance(element, LTTextBoxHorizontal):
+                return builder.add_text_box(features.bbox, features.raw_text)
+            
+            elif isinstance(element, LTImage):
+                image_info = {
+                    'x0': element.x0,
+                    'y0': element.y0,
+                    'x1': element.x1,
+                    'y1': element.y1,
+                    'name': element.name,
+                    'image_id': builder.add_image(element)
+                }
+                builder.layout_images.append(image_info)
+            
+            elif isinstance(element, LTFigure):
+                figure_info = {
+                    'x0': element.x0,
+                    'y0': element.y0,
+                    'x1': element.x1,
+                    'y1': element.y1,
+                    'content': self._extract_figure_content(builder, element)
+                }
+                builder.layout_figures.append(figure_info)
         except Exception as e:
             self.logger.error(f"Error analizando disposición de página: {e}")
-        
-        return layout_info
+        return None
 
-    def _extract_figure_content(self, figure) -> List[Dict]:
-        """Extrae contenido de una figura."""
+    def _extract_figure_content(self, builder: PageContentBuilder, figure) -> List[Dict]:
+        """Extrae contenido de una figura (las imágenes como referencias a ``image_objects``)."""
         figures = []
         for element in figure:
             if isinstance(element, LTImage):
@@ -159,109 +296,81 @@ class PDFExtractor:
                     'x1': element.x1,
                     'y1': element.y1,
                     'name': element.name,
-                    'stream': element.stream.get_rawdata() if element.stream else None
+                    'image_id': builder.add_image(element)
                 }
                 figures.append(image_info)
         return figures
 
-    def _process_page(self, page, page_num: int) -> Dict:
-        """Procesa una página individual del PDF"""
-        result = {
-            'content': [],
-            'figures': [],
-            'structure': {
-                'page_num': page_num,
-                'layout': self._analyze_page_layout(page)
-            }
-        }
+    def _process_page(self, page, page_num: int) -> PageContent:
+        """Procesa una página individual del PDF en un único recorrido"""
+        builder = PageContentBuilder(page_num)
         
         for element in page:
+            features = collect_features(element) if isinstance(element, LTText) else None
+            box = self._add_layout_element(builder, element, features)
+
             processor = self.processors.get(element.__class__.__name__.lower())
             if processor:
-                processed = processor(element, page)
-                if processed:
-                    if 'text' in processed:
-                        result['content'].append(processed)
-                    elif 'figure' in processed:
-                        result['figures'].append(processed['figure'])
-                    elif 'line' in processed:
-                        result['content'].append(processed)
-                    elif 'image' in processed:
-                        result['images'].append(processed['image'])
-                    
-        return result
-
-    def _process_text_element(self, element, page) -> Optional[Dict]:
+                if features is not None:
+                    processor(builder, element, page, features, box)
+                else:
+                    processor(builder, element, page)
+
+        languages, language_detection = self._assign_languages(builder.texts)
+        return builder.build(languages, language_detection)
+
+    def _process_text_element(
+        self,
+        builder: PageContentBuilder,
+        element,
+        page,
+        features: Optional[ElementFeatures] = None,
+        box: Optional[int] = None
+    ):
         """Procesa elemento de texto con análisis detallado"""
-        text = element.get_text().strip()
-        if not text:
-            return None
-        
-        text_parts = []
-        if isinstance(element, LTTextContainer):
-            for text_line in element:
-                line_text = text_line.get_text().strip()
-                for char in text_line:
-                    if isinstance(char, LTChar):
-                        text_parts.append(line_text)
-                        break
-        text = ' '.join(text_parts) if text_parts else text
-        
-        style_info = self._extract_style_info(element)
-        hierarchy = self._detect_hierarchy(element, text)
-        language = self._detect_language(text)
-        column = self._detect_column(element, page)
-        element_type = self._detect_element_type(element, text)
+        if features is None:
+            features = collect_features(element)
+        if not features.raw_text:
+            return
+        text = features.text
         
-        return {
-            'text': text,
-            'position': self._get_element_position(element, page),
-            'style': style_info,
-            'hierarchy': hierarchy,
-            'language': language,
-            'column': column,
-            'type': element_type
-        }
+        style_info = self._extract_style_info(features)
+        builder.add_text_block(
+            features.bbox,
+            text,
+            box,
+            fontname=features.fontname,
+            size=features.size,
+            hierarchy=self._detect_hierarchy(features, text),
+            element_type=self._detect_element_type(style_info, text),
+            column=self._detect_column(element, page)
+        )
         
-    def _process_line_element(self, element, page) -> Optional[Dict]:
+    def _process_line_element(self, builder: PageContentBuilder, element, page):
         """Procesa elementos de línea en el PDF."""
-        line_info = {
-            'position': self._get_element_position(element, page)
-            # Puedes agregar más información si es necesario
-        }
-        return {
-            'line': line_info
-        }
+        builder.add_line((element.x0, element.y0, element.x1, element.y1))
 
-    def _process_figure(self, element, page) -> Optional[Dict]:
+    def _process_figure(self, builder: PageContentBuilder, element, page):
         """Procesa elementos de figura en el PDF."""
         try:
-            figure_data = self._extract_figure_content(element)
-            return {
-                "figure": {
-                    "type": "figure",
-                    "content": figure_data,
-                    "position": self._get_element_position(element, page)
-                }
-            }
+            builder.figures.append({
+                "type": "figure",
+                "content": self._extract_figure_content(builder, element),
+                "position": self._get_element_position(element, page)
+            })
         except Exception as e:
             self.logger.error(f"Error procesando figura: {e}")
-            return None
 
-    def _process_image(self, element, page) -> Optional[Dict]:
+    def _process_image(self, builder: PageContentBuilder, element, page):
         """Procesa elementos de imagen en el PDF."""
         try:
-            image_data = {
+            builder.images.append({
                 'name': element.name,
                 'position': self._get_element_position(element, page),
-                'stream': element.stream.get_rawdata() if element.stream else None
-            }
-            return {
-                "image": image_data
-            }
+                'image_id': builder.add_image(element)
+            })
         except Exception as e:
             self.logger.error(f"Error procesando imagen: {e}")
-            return None
 
     def _get_element_position(self, element, page) -> Dict:
         """Obtiene la posición de un elemento en la página."""
@@ -272,30 +381,19 @@ class PDFExtractor:
             'y1': element.y1
         }
 
-    def _extract_style_info(self, element) -> Dict:
+    def _extract_style_info(self, features: ElementFeatures) -> Dict:
         """Extrae información detallada de estilo"""
         style = {}
-        if isinstance(element, LTTextContainer):
-            for text_line in element:
-                for char in text_line:
-                    if isinstance(char, LTChar):
-                        style['fontname'] = char.fontname
-                        style['size'] = char.size
-                        style['bold'] = 'Bold' in char.fontname
-                        style['italic'] = 'Italic' in char.fontname
-                        break
-                break
+        if features.fontname is not None:
+            style['fontname'] = features.fontname
+            style['size'] = features.size
+            style['bold'] = 'Bold' in features.fontname
+            style['italic'] = 'Italic' in features.fontname
         return style
 
-    def _detect_hierarchy(self, element, text: str) -> str:
+    def _detect_hierarchy(self, features: ElementFeatures, text: str) -> str:
         """Detecta la jerarquía del texto."""
-        font_sizes = []
-        if isinstance(element, LTTextContainer):
-            for text_line in element:
-                for char in text_line:
-                    if isinstance(char, LTChar):
-                        font_sizes.append(char.size)
-        average_size = sum(font_sizes) / len(font_sizes) if font_sizes else 0
+        average_size = features.average_size
         if average_size > 14:
             return 'title'
         elif 12 < average_size <= 14:
@@ -303,13 +401,12 @@ class PDFExtractor:
         else:
             return 'body'
 
-    def _detect_language(self, text: str) -> str:
-        """Detecta el idioma del texto."""
-        try:
-            lang = detect(text)
-            return lang
-        except LangDetectException:
-            return 'unknown'
+    def _assign_languages(self, texts: List[str]) -> Tuple[List[str], Dict]:
+        """Detecta el idioma una vez por página y lo asigna a sus bloques de texto."""
+        stats = self.language_detector.empty_stats()
+        page_language = self.language_detector.detect_page(texts, stats)
+        languages = [self.language_detector.assign(text, page_language, stats) for text in texts]
+        return languages, stats
 
     def _detect_column(self, element, page) -> int:
         """Detecta la columna a la que pertenece el elemento de texto."""
@@ -322,9 +419,8 @@ class PDFExtractor:
         else:
             return 3
 
-    def _detect_element_type(self, element, text: str) -> str:
+    def _detect_element_type(self, style: Dict, text: str) -> str:
         """Detecta el tipo de elemento de texto."""
-        style = self._extract_style_info(element)
         if style.get('bold') and style.get('size', 0) > 14:
             return 'title'
         elif style.get('bold') and style.get('size', 0) > 12:
@@ -332,34 +428,40 @@ class PDFExtractor:
         else:
             return 'paragraph'
 
-    def extract_document(self, pdf_path: str) -> Dict:
+    def extract_document(self, source: PDFSource) -> Dict:
+        """Extrae el documento desde una ruta o un buffer (``bytes``, ``mmap``).
+
+        El PDF se abre y analiza una vez para los metadatos y las páginas.
+        """
+        label = source_label(source)
+        try:
+            self.logger.info(f"Iniciando procesamiento de {label}")
+            parsed = ParsedPDF(source)
+        except Exception as e:
+            self.logger.error(f"Error procesando {label}: {e}")
+            raise PDFProcessingError(f"Error en procesamiento: {str(e)}")
+
+        with parsed:
+            return self._extract_parsed_document(source, parsed, label)
+
+    def _extract_parsed_document(self, source: PDFSource, parsed: ParsedPDF, label: str) -> Dict:
         try:
-            self.logger.info(f"Iniciando procesamiento de {pdf_path}")
-            
             result = {
-                'metadata': self._extract_metadata(pdf_path),
+                'metadata': self._extract_metadata(parsed),
                 'content': [],
                 'structure': [],
                 'figures': [],
                 'images': [],
-                'statistics': {}
+                'image_objects': {},
+                'statistics': self.empty_statistics()
             }
             
-            pages = list(extract_pages(pdf_path, laparams=self.la_params))
-            futures = []
-            
-            for page_num, page in enumerate(pages):
-                future = self.executor.submit(
-                    self._process_page, 
-                    page, 
-                    page_num
-                )
-                futures.append(future)
-            
-            for future in futures:
-                page_result = future.result()
+            for page in self.iter_pages(source, parsed=parsed):
+                self.update_statistics(result['statistics'], page)
+                page_result = page.to_dict()
                 result['content'].extend(page_result['content'])
                 result['figures'].extend(page_result['figures'])
+                result['image_objects'].update(page_result['image_objects'])
                 result['structure'].append(page_result['structure'])
                 # Agregar imágenes si se procesan
                 for img in page_result['structure']['layout'].get('images', []):
@@ -367,40 +469,178 @@ class PDFExtractor:
             
             # Agregar texto completo
             result['full_text'] = self.get_full_text(result)
-            result['statistics'] = self._calculate_statistics(result)
             
-            self.logger.info(f"Procesamiento completado: {pdf_path}")
+            self.logger.info(f"Procesamiento completado: {label}")
             self.logger.info(f"Tipo de resultado: {type(result)}")  # Agregado para depuración
             return result
                 
         except Exception as e:
-            self.logger.error(f"Error procesando {pdf_path}: {e}")
+            self.logger.error(f"Error procesando {label}: {e}")
             raise PDFProcessingError(f"Error en procesamiento: {str(e)}")
 
-    def _calculate_statistics(self, result: Dict) -> Dict:
-        """Calcula estadísticas básicas del contenido extraído."""
-        statistics = {}
+    def iter_pages(
+        self,
+        source: PDFSource,
+        window: Optional[int] = None,
+        parsed: Optional[ParsedPDF] = None
+    ) -> Iterator[PageContent]:
+        """Genera los resultados página a página, en orden y con memoria acotada.
+
+        En modo proceso se mantienen como máximo ``window`` rangos de páginas
+        en vuelo; en modo hilo cada ``LTPage`` se libera antes de analizar la
+        siguiente. ``parsed`` reutiliza un documento ya analizado; si no, se
+        abre ``source`` una vez. Los workers mapean el mismo fichero, así que
+        un buffer en memoria se procesa siempre en este proceso.
+        """
+        if parsed is None:
+            with ParsedPDF(source) as parsed:
+                yield from self.iter_pages(source, window, parsed)
+            return
+
+        if self.page_cache is not None:
+            yield from self._iter_with_page_cache(parsed, window or self.max_workers)
+            return
+
+        if self.extraction_mode == 'process' and parsed.path is not None:
+            total_pages = parsed.page_count()
+            if total_pages > self.pages_per_task:
+                yield from self._iter_with_processes(parsed.path, total_pages, window or self.max_workers)
+                return
+
+        for page_num, layout in self._layout_pages(parsed):
+            yield self._process_page(layout, page_num)
+
+    def _layout_pages(self, parsed: ParsedPDF, page_numbers: Optional[Sequence[int]] = None):
+        """Análisis de layout (``LTPage``) de las páginas indicadas, o de todas, sobre el documento ya analizado"""
+        resource_manager = PDFResourceManager(caching=True)
+        if page_numbers is None:
+            page_numbers = range(len(parsed.pages))
+        for page_num in page_numbers:
+            device = PDFPageAggregator(resource_manager, laparams=self.la_params)
+            PDFPageInterpreter(resource_manager, device).process_page(parsed.pages[page_num])
+            yield page_num, device.get_result()
+
+    async def aiter_pages(self, source: PDFSource, window: Optional[int] = None) -> AsyncIterator[PageContent]:
+        """Variante asíncrona de ``iter_pages`` que no bloquea el event loop"""
+        loop = asyncio.get_running_loop()
+        pages = self.iter_pages(source, window)
+        done = object()
+        pending = None
         try:
-            statistics['numero_paginas'] = len(result.get('structure', []))
-            statistics['total_contenido'] = len(result.get('content', []))
-            statistics['total_figuras'] = len(result.get('figures', []))
-            statistics['total_imagenes'] = len(result.get('images', []))
-            statistics['total_paragraphs'] = sum(
-                1 for item in result.get('content', []) 
-                if isinstance(item, dict) and item.get('type') == 'paragraph'
-            )
-            statistics['total_titles'] = sum(
-                1 for item in result.get('content', []) 
-                if isinstance(item, dict) and item.get('type') == 'title'
-            )
-            statistics['total_subtitles'] = sum(
-                1 for item in result.get('content', []) 
-                if isinstance(item, dict) and item.get('type') == 'subtitle'
-            )
-            statistics['total_characters'] = sum(
-                len(item['text']) for item in result.get('content', []) 
-                if isinstance(item, dict) and 'text' in item
-            )
+            while True:
+                pending = loop.run_in_executor(self.executor, next, pages, done)
+                page_result = await asyncio.shield(pending)
+                if page_result is done:
+                    break
+                yield page_result
+        finally:
+            # Si el consumidor se detiene antes (error, cliente desconectado), cerrar
+            # el generador cancela los rangos en vuelo y libera el PDF mapeado ya,
+            # no al recolectarlo; antes hay que esperar al next() que siga en su hilo
+            if pending is not None:
+                await asyncio.wait({pending})
+            await loop.run_in_executor(self.executor, pages.close)
+
+    def _iter_with_processes(self, pdf_path: str, total_pages: int, window: int) -> Iterator[PageContent]:
+        """Reparte el análisis de layout por rangos de páginas en el pool de procesos"""
+        pool = _get_process_pool(self.max_workers)
+        page_ranges = self._page_ranges(total_pages)
+        in_flight = deque()
+        self.logger.info(
+            f"Extracción con {self.max_workers} procesos: {total_pages} páginas, "
+            f"{self.pages_per_task} páginas por rango, ventana de {window}"
+        )
+        try:
+            for index, page_numbers in enumerate(page_ranges):
+                last = index == len(page_ranges) - 1
+                in_flight.append(pool.submit(_extract_page_range, pdf_path, page_numbers, self.la_params, last))
+                if len(in_flight) >= window:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def _iter_with_page_cache(self, parsed: ParsedPDF, window: int) -> Iterator[PageContent]:
+        """Genera las páginas reutilizando las de la caché con el mismo contenido.
+
+        Con el documento ya analizado se calcula el hash de cada página; solo
+        las páginas sin resultado en caché pasan por el análisis de layout
+        (en este proceso o repartidas en el pool).
+        """
+        fingerprint = self.cache_fingerprint()
+        total_pages = len(parsed.pages)
+        hasher = PageHasher()
+        page_hashes = [hasher.page_hash(page) for page in parsed.pages]
+
+        use_processes = (
+            self.extraction_mode == 'process' and parsed.path is not None
+            and total_pages > self.pages_per_task
+        )
+        batch_size = self.pages_per_task * window if use_processes else 1
+        for start in range(0, total_pages, batch_size):
+            page_numbers = range(start, min(start + batch_size, total_pages))
+            results = {
+                page_num: self.page_cache.get(page_hashes[page_num], fingerprint, page_num, parsed.pages[page_num])
+                for page_num in page_numbers
+            }
+            misses = [page_num for page_num, page in results.items() if page is None]
+            if use_processes and misses:
+                pool = _get_process_pool(self.max_workers)
+                chunks = [misses[i:i + self.pages_per_task] for i in range(0, len(misses), self.pages_per_task)]
+                final_batch = start + batch_size >= total_pages
+                futures = [
+                    pool.submit(
+                        _extract_page_range, parsed.path, chunk, self.la_params,
+                        final_batch and index == len(chunks) - 1
+                    )
+                    for index, chunk in enumerate(chunks)
+                ]
+                for future in futures:
+                    for page in future.result():
+                        results[page.page_num] = page
+            else:
+                for page_num, layout in self._layout_pages(parsed, misses):
+                    results[page_num] = self._process_page(layout, page_num)
+
+            for page_num in misses:
+                self.page_cache.put(page_hashes[page_num], fingerprint, results[page_num])
+            for page_num in page_numbers:
+                yield results[page_num]
+
+    def empty_statistics(self) -> Dict:
+        """Estadísticas iniciales de un documento sin páginas procesadas"""
+        return {
+            'numero_paginas': 0,
+            'total_contenido': 0,
+            'total_figuras': 0,
+            'total_imagenes': 0,
+            'total_paragraphs': 0,
+            'total_titles': 0,
+            'total_subtitles': 0,
+            'total_characters': 0,
+            'language_detection': self.language_detector.empty_stats(),
+            'page_cache': {'hits': 0, 'misses': 0, 'hit_ratio': 0}
+        }
+
+    def update_statistics(self, statistics: Dict, page: PageContent) -> Dict:
+        """Acumula en ``statistics`` las estadísticas de una página procesada."""
+        try:
+            type_counts = page.type_counts()
+            statistics['numero_paginas'] += 1
+            statistics['total_contenido'] += len(page)
+            statistics['total_figuras'] += len(page.figures)
+            statistics['total_imagenes'] += len(page.layout_images)
+            statistics['total_paragraphs'] += type_counts['paragraph']
+            statistics['total_titles'] += type_counts['title']
+            statistics['total_subtitles'] += type_counts['subtitle']
+            statistics['total_characters'] += page.total_characters()
+            for key, value in page.language_detection.items():
+                statistics['language_detection'][key] += value
+            page_cache = statistics['page_cache']
+            page_cache['hits' if page.cached else 'misses'] += 1
+            page_cache['hit_ratio'] = round(page_cache['hits'] / statistics['numero_paginas'], 4)
         except Exception as e:
             self.logger.error(f"Error calculando estadísticas: {e}")
         return statistics
@@ -0,0 +1,79 @@
+import io
+import mmap
+import os
+from typing import List, Optional, Union
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import resolve1
+
+# Entrada del extractor: ruta del fichero o su contenido ya en memoria
+PDFSource = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap]
+
+
+def is_path(source: PDFSource) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def source_label(source: PDFSource) -> str:
+    """Descripción para logs: la ruta o el tamaño del buffer (nunca su contenido)"""
+    if is_path(source):
+        return os.fspath(source)
+    return f"<{type(source).__name__} de {len(source)} bytes>"
+
+
+class ParsedPDF:
+    """PDF abierto y analizado una sola vez (xref, catálogo y árbol de páginas).
+
+    Una ruta se mapea en memoria en solo lectura: pdfminer lee del mmap sin
+    copiar el fichero y el sistema operativo comparte las páginas entre los
+    procesos que mapean el mismo fichero. ``bytes`` se leen sin copia;
+    otros buffers (``bytearray``, ``memoryview``) se copian una vez.
+
+    El documento no es seguro entre hilos: cada hilo o proceso usa su
+    propio ``ParsedPDF``.
+    """
+
+    def __init__(self, source: PDFSource):
+        self.path: Optional[str] = None
+        self._mmap: Optional[mmap.mmap] = None
+        if is_path(source):
+            self.path = os.fspath(source)
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            fp = self._mmap
+        elif isinstance(source, mmap.mmap):
+            # mmap del llamador: se lee desde el inicio y no se cierra aquí
+            source.seek(0)
+            fp = source
+        else:
+            fp = io.BytesIO(source)
+        self.document = PDFDocument(PDFParser(fp))
+        self._pages: Optional[List[PDFPage]] = None
+
+    @property
+    def pages(self) -> List[PDFPage]:
+        if self._pages is None:
+            self._pages = list(PDFPage.create_pages(self.document))
+        return self._pages
+
+    def page_count(self) -> int:
+        """Número de páginas leyendo ``/Count`` del árbol de páginas si es fiable"""
+        if self._pages is None:
+            pages = resolve1(self.document.catalog.get('Pages'))
+            count = resolve1(pages.get('Count')) if isinstance(pages, dict) else None
+            if isinstance(count, int):
+                return count
+        return len(self.pages)
+
+    def close(self):
+        self._pages = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> 'ParsedPDF':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Callable, Dict
+from app.presentation.exceptions import ServiceOverloadedError
+
+
+class AdmissionController:
+    """Limita las extracciones concurrentes y ejecuta el trabajo bloqueante fuera del event loop.
+
+    Como máximo ``max_concurrent`` peticiones se procesan a la vez y
+    ``max_queue`` esperan turno; el resto se rechaza con
+    ``ServiceOverloadedError`` para que la API responda 503 con Retry-After.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, retry_after: int, io_workers: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self.executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="blocking-io")
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def admit(self):
+        with self._lock:
+            if self.active + self.waiting >= self.max_concurrent + self.max_queue:
+                self.rejected += 1
+                raise ServiceOverloadedError(
+                    "Demasiadas extracciones en curso, reintente más tarde",
+                    retry_after=self.retry_after
+                )
+            self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        with self._lock:
+            self.active += 1
+            self.admitted += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+            self._semaphore.release()
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Ejecuta una llamada bloqueante (BD, disco, CPU) en el pool acotado"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            return {
+                "active": self.active,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue
+            }
+
+    def close(self):
+        self.executor.shutdown(wait=False)
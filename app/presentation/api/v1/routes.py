@@ -1,41 +1,190 @@
+import asyncio
 import logging
 import os
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from numpy import mean
 import time
 from app.core.config import get_settings
-from app.infraestructure.metrics.performance_metrics import PerformanceMetrics
+from app.infraestructure.metrics.performance_metrics import PerformanceMetrics, stage_timer
 from app.domain.entities.document import Document
 from app.preprocessing.exceptions import PDFProcessingError
 from app.domain.entities.analysis import Analysis
 from app.infraestructure.database.postgres import PostgresDatabase
+from app.infraestructure.database.pool import get_pool_metrics
+from app.infraestructure.cache.result_cache import get_result_cache
 from app.infraestructure.storage.s3 import S3Client
+from app.infraestructure.storage.blob_store import get_blob_store
 from app.infraestructure.messaging.rabbitmq import RabbitMQClient
 from app.preprocessing.pdf_extractor import PDFExtractor
+from app.preprocessing.fast_extractor import FastPDFExtractor
+from app.preprocessing.engines import ENGINE_CHOICES, resolve_engine
+from app.preprocessing.page_content import PageContent
+from app.preprocessing.page_cache import get_page_cache
+from app.preprocessing.images import spill_images
 from app.preprocessing.normalizer import TextNormalizer
 from app.preprocessing.cleaner import TextCleaner
+from app.semantic.model_registry import get_model_registry
+from app.semantic.embedding import EmbeddingGenerator
+from app.semantic.vector_index import get_vector_index
+from app.presentation.api.v1.schemas import MAX_SIMILAR_RESULTS, SimilarSearchRequest
+from app.presentation.admission import AdmissionController
+from app.presentation.uploads import StreamedUpload, receive_uploads, upload_openapi
 from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import uuid
 
 router = APIRouter()
 metrics = PerformanceMetrics()
 settings = get_settings()
 
-@router.post("/upload")
-async def upload_document(file: UploadFile = File(...)):
+@lru_cache()
+def get_extractor() -> PDFExtractor:
+    """Extractor compartido por todas las peticiones del proceso"""
+    return PDFExtractor(
+        extraction_mode=settings.PDF_EXTRACTION_MODE,
+        max_workers=settings.PDF_EXTRACTION_WORKERS,
+        pages_per_task=settings.PDF_PAGES_PER_TASK,
+        page_cache=get_page_cache() if settings.PAGE_CACHE_ENABLED else None
+    )
+
+@lru_cache()
+def get_fast_extractor() -> FastPDFExtractor:
+    """Extractor rápido (PyMuPDF) compartido por todas las peticiones del proceso"""
+    return FastPDFExtractor()
+
+def select_extractor(engine: Optional[str], pdf_path: str) -> PDFExtractor:
+    """Extractor del motor pedido; "auto" decide por el número de páginas"""
+    name = resolve_engine(engine or settings.EXTRACTION_ENGINE, pdf_path, settings.FAST_ENGINE_PAGE_THRESHOLD)
+    return get_fast_extractor() if name == 'fast' else get_extractor()
+
+def validate_engine(engine: Optional[str]):
+    if engine is not None and engine not in ENGINE_CHOICES:
+        raise HTTPException(status_code=400, detail=f"Motor no soportado: {engine}. Opciones: {', '.join(ENGINE_CHOICES)}")
+
+ENGINE_QUERY = Query(default=None, description="Motor de extracción: auto, layout (pdfminer) o fast (PyMuPDF)")
+
+@lru_cache()
+def get_admission() -> AdmissionController:
+    """Control de admisión y pool de trabajo bloqueante de la API"""
+    return AdmissionController(
+        max_concurrent=settings.MAX_CONCURRENT_EXTRACTIONS,
+        max_queue=settings.EXTRACTION_QUEUE_DEPTH,
+        retry_after=settings.RETRY_AFTER_SECONDS,
+        io_workers=settings.BLOCKING_IO_WORKERS
+    )
+
+async def receive_pdf(request: Request) -> StreamedUpload:
+    """Recibe el PDF del campo ``file`` en streaming directamente a disco"""
+    uploads = await receive_uploads(
+        request, "file", settings.UPLOAD_DIR, settings.MAX_UPLOAD_SIZE, run=get_admission().run
+    )
+    return uploads[0]
+
+def clean_page(
+    page: PageContent,
+    cleaner: TextCleaner,
+    normalizer: TextNormalizer
+) -> List[Dict]:
+    """Limpia y normaliza los bloques de texto de una página"""
+    indices = page.text_blocks()
+    cleaned_texts = cleaner.clean_many(page.texts())
+    kept = [(index, text) for index, text in zip(indices, cleaned_texts) if text]
+    normalized_texts = normalizer.normalize_many([text for _, text in kept])
+    return [
+        {
+            'text': cleaned_text,
+            'position': page.position(index),
+            'style_info': page.style(index),
+            'linguistic_features': {
+                'normalized_text': normalized_text,
+                'language': page.language(index),
+                'page_num': page.page_num
+            }
+        }
+        for (index, cleaned_text), normalized_text in zip(kept, normalized_texts)
+    ]
+
+def clean_content(
+    content: List[Dict],
+    cleaner: TextCleaner,
+    normalizer: TextNormalizer
+) -> Tuple[List[str], List[str]]:
+    """Limpia y normaliza los textos de una extracción completa"""
+    texts = [
+        content_item['text'] for content_item in content
+        if isinstance(content_item, dict) and 'text' in content_item
+    ]
+    cleaned_content = [text for text in cleaner.clean_many(texts) if text]
+    normalized_content = normalizer.normalize_many(cleaned_content)
+    return cleaned_content, normalized_content
+
+async def extract_paragraphs(
+    extractor: PDFExtractor,
+    cleaner: TextCleaner,
+    normalizer: TextNormalizer,
+    pdf_path: str,
+    document_id: str,
+    db: PostgresDatabase,
+    stage_times: Dict[str, float]
+) -> Tuple[Dict, int, int]:
+    """Extrae, limpia, normaliza y persiste los párrafos página a página.
+
+    Devuelve las estadísticas y el número de párrafos y caracteres guardados;
+    los párrafos no se acumulan en memoria.
+    """
+    admission = get_admission()
+    statistics = extractor.empty_statistics()
+    total_paragraphs = 0
+    total_characters = 0
+    pages = extractor.aiter_pages(pdf_path)
+    try:
+        while True:
+            with stage_timer(stage_times, "extraction"):
+                page_result = await anext(pages, None)
+            if page_result is None:
+                break
+            extractor.update_statistics(statistics, page_result)
+            with stage_timer(stage_times, "cleaning"):
+                paragraphs = await admission.run(clean_page, page_result, cleaner, normalizer)
+            if paragraphs:
+                with stage_timer(stage_times, "persistence"):
+                    await admission.run(db.save_paragraphs, document_id, paragraphs)
+                total_paragraphs += len(paragraphs)
+                total_characters += sum(len(p['text']) for p in paragraphs)
+    finally:
+        # Cierra la extracción en curso si se sale antes de terminar
+        await pages.aclose()
+    return statistics, total_paragraphs, total_characters
+
+@router.post("/upload", openapi_extra=upload_openapi("file"))
+async def upload_document(request: Request, engine: Optional[str] = ENGINE_QUERY):
+    validate_engine(engine)
+    async with get_admission().admit():
+        return await process_upload(request, engine)
+
+async def process_upload(request: Request, engine: Optional[str] = None):
+    admission = get_admission()
     db = None
-    extractor = None
     temp_pdf_path = None
-    start_time = metrics.start_timer()
+    timer_id = None
+    stage_times: Dict[str, float] = {}
     
     try:
         # Generar ID y metadata inicial
         document_id = str(uuid.uuid4())
-        filename = file.filename
-        content = await file.read()
-        file_size = len(content)
+        timer_id = f"upload_{document_id}"
+        metrics.start_timer(timer_id)
         created_at = datetime.now(timezone.utc)
+
+        # Recibir el archivo en disco calculando su hash y tamaño
+        with stage_timer(stage_times, "upload"):
+            upload = await receive_pdf(request)
+        temp_pdf_path = upload.path
+        content_hash, file_size, filename = upload.sha256, upload.size, upload.filename
+        logging.info(f"Archivo temporal guardado en: {temp_pdf_path}")
         
         logging.info(f"Iniciando procesamiento del documento: {filename} (ID: {document_id})")
 
@@ -49,54 +198,66 @@ async def upload_document(file: UploadFile = File(...)):
             metadata={}
         )
 
-        # Guardar archivo temporalmente
-        temp_pdf_path = f"/tmp/{document_id}.pdf"
-        with open(temp_pdf_path, "wb") as f:
-            f.write(content)
-        logging.info(f"Archivo temporal guardado en: {temp_pdf_path}")
-
         # Inicializar DB y guardar documento
-        db = PostgresDatabase()
-        db.save_document(document)
+        with stage_timer(stage_times, "persistence"):
+            db = await admission.run(PostgresDatabase)
+            await admission.run(db.save_document, document)
         logging.info(f"Documento base guardado con ID: {document_id}")
 
         # Inicializar procesadores
-        extractor = PDFExtractor()
+        extractor = await admission.run(select_extractor, engine, temp_pdf_path)
         normalizer = TextNormalizer()
         cleaner = TextCleaner()
 
-        # Extraer y procesar contenido
-        extracted_data = extractor.extract_document(temp_pdf_path)
-        if not isinstance(extracted_data, dict):
-            logging.error("extract_document no retornó un diccionario.")
-            raise PDFProcessingError("Formato de datos extraído inválido.")
-        logging.info("Contenido del PDF extraído correctamente")
-
-        # Limpiar y normalizar contenido
-        cleaned_content = []
-        for content_item in extracted_data.get('content', []):
-            if isinstance(content_item, dict) and 'text' in content_item:
-                cleaned_text = cleaner.clean(content_item['text'])
-                if cleaned_text:
-                    cleaned_content.append(cleaned_text)
-        normalized_content = [normalizer.normalize(text) for text in cleaned_content]
-        
-        # Actualizar datos procesados
-        extracted_data['cleaned_content'] = cleaned_content
-        extracted_data['normalized_content'] = normalized_content
+        # Reutilizar la extracción previa de un PDF idéntico: la caché guarda
+        # las estadísticas y el documento cuyos párrafos se copian en la BD
+        result_cache = get_result_cache()
+        fingerprint = extractor.cache_fingerprint()
+        with stage_timer(stage_times, "cache"):
+            cached = await admission.run(result_cache.get, "upload-ref", content_hash, fingerprint, file_size)
+        if cached:
+            with stage_timer(stage_times, "persistence"):
+                copied = await admission.run(
+                    db.copy_paragraphs, cached['document_id'], document_id, expected=cached['total_paragraphs']
+                )
+            if copied != cached['total_paragraphs']:
+                # El documento de origen ya no tiene todos sus párrafos: extraer de nuevo
+                logging.info(f"Párrafos en caché no disponibles para {content_hash}")
+                cached = None
+        if cached:
+            logging.info(f"Extracción recuperada de caché para {content_hash}")
+            statistics = cached['statistics']
+            total_paragraphs = copied
+            total_characters = cached['total_characters']
+        else:
+            statistics, total_paragraphs, total_characters = await extract_paragraphs(
+                extractor, cleaner, normalizer, temp_pdf_path, document_id, db, stage_times
+            )
+        logging.info(f"Contenido del PDF extraído correctamente ({statistics['numero_paginas']} páginas)")
 
         # Guardar análisis y métricas
-        db.save_document_analysis(document_id, extracted_data.get('statistics', {}))
-        processing_time = metrics.end_timer(start_time)
+        with stage_timer(stage_times, "persistence"):
+            await admission.run(db.save_document_analysis, document_id, statistics)
+        if not cached:
+            # Solo un documento con el análisis ya guardado sirve de origen para la caché
+            with stage_timer(stage_times, "cache"):
+                await admission.run(result_cache.put, "upload-ref", content_hash, fingerprint, {
+                    'statistics': statistics,
+                    'document_id': document_id,
+                    'total_paragraphs': total_paragraphs,
+                    'total_characters': total_characters
+                })
+        processing_time = metrics.end_timer(timer_id)
+        metrics.record_stage_times(document_id, stage_times)
         
         metrics.record_document_metrics(
             document_id=document_id,
             processing_time=processing_time,
             file_size=file_size,
             stats={
-                "total_paragraphs": len(cleaned_content),
-                "total_characters": sum(len(text) for text in cleaned_content),
-                "document_statistics": extracted_data.get('statistics', {})
+                "total_paragraphs": total_paragraphs,
+                "total_characters": total_characters,
+                "document_statistics": statistics
             }
         )
         
@@ -106,11 +267,15 @@ async def upload_document(file: UploadFile = File(...)):
             content={
                 "document_id": document_id, 
                 "status": "success",
+                "cache": "hit" if cached else "miss",
+                "engine": extractor.ENGINE,
                 "metrics": metrics.get_document_metrics(document_id)
             },
             status_code=201
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error procesando el documento: {str(e)}")
         if db:
@@ -118,46 +283,68 @@ async def upload_document(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Error procesando el documento: {str(e)}")
 
     finally:
+        # Un error deja el temporizador sin cerrar: no debe quedarse en memoria
+        if timer_id:
+            metrics.timers.pop(timer_id, None)
         if temp_pdf_path and os.path.exists(temp_pdf_path):
             os.remove(temp_pdf_path)
             logging.info(f"Archivo temporal eliminado: {temp_pdf_path}")
-        if extractor:
-            extractor.close()
         if db:
             db.close()
 
 @router.get("/document/{document_id}")
 async def get_document(document_id: str):
+    admission = get_admission()
+    db = None
     try:
-        db = PostgresDatabase()
-        document = db.get_document(document_id)
+        db = await admission.run(PostgresDatabase)
+        document = await admission.run(db.get_document, document_id)
 
         if not document:
             raise HTTPException(status_code=404, detail="Documento no encontrado")
 
-        return JSONResponse(content=document.to_dict(), status_code=200)
+        return JSONResponse(content=jsonable_encoder(document), status_code=200)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error al recuperar el documento")
+    finally:
+        if db:
+            db.close()
 
 @router.get("/analysis/{document_id}")
 async def get_analysis(document_id: str):
+    admission = get_admission()
+    db = None
     try:
-        db = PostgresDatabase()
-        analysis = db.get_document_analysis(document_id)
+        db = await admission.run(PostgresDatabase)
+        analysis = await admission.run(db.get_document_analysis, document_id)
 
         if not analysis:
             raise HTTPException(status_code=404, detail="Análisis no encontrado")
 
-        return JSONResponse(content=analysis, status_code=200)
+        return JSONResponse(content=jsonable_encoder(analysis), status_code=200)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error al recuperar el análisis")
+    finally:
+        if db:
+            db.close()
 
 @router.get("/metrics")
 async def get_processing_metrics():
     """Endpoint para obtener métricas globales de procesamiento"""
-    return metrics.get_global_metrics()
+    global_metrics = metrics.get_global_metrics()
+    global_metrics["models"] = get_model_registry().get_metrics()
+    global_metrics["result_cache"] = get_result_cache().get_metrics()
+    global_metrics["page_cache"] = get_page_cache().get_metrics()
+    global_metrics["admission"] = get_admission().get_metrics()
+    global_metrics["database_pool"] = get_pool_metrics()
+    global_metrics["vector_index"] = get_vector_index().get_metrics()
+    return global_metrics
 
 @router.get("/metrics/document/{document_id}")
 async def get_document_metrics(document_id: str):
@@ -167,30 +354,105 @@ async def get_document_metrics(document_id: str):
         raise HTTPException(status_code=404, detail="Métricas no encontradas")
     return doc_metrics
 
-@router.post("/test_document")
-async def test_process_document(file: UploadFile = File(..., description="Archivo PDF para prueba")):
-    if not file:
-        raise HTTPException(status_code=400, detail="No se proporcionó ningún archivo")
-    
+@router.get("/search/similar/{document_id}")
+async def search_similar_documents(document_id: str, k: int = Query(10, ge=1, le=MAX_SIMILAR_RESULTS)):
+    """Documentos más parecidos a uno ya indexado"""
+    index = get_vector_index()
+    admission = get_admission()
+    vector = await admission.run(index.get_vector, document_id)
+    if vector is None:
+        raise HTTPException(status_code=404, detail="Documento no indexado")
+    try:
+        results = await admission.run(index.search, vector, k, document_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"document_id": document_id, "results": results}
+
+@router.post("/search/similar")
+async def search_similar(request: SimilarSearchRequest):
+    """Documentos más parecidos a un texto o a un vector dado"""
+    if (request.text is None) == (request.vector is None):
+        raise HTTPException(status_code=400, detail="Indique 'text' o 'vector'")
+    admission = get_admission()
+    vector = request.vector
+    if request.text is not None:
+        vector = await admission.run(EmbeddingGenerator().generate, request.text)
+    try:
+        results = await admission.run(get_vector_index().search, vector, request.k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"results": results}
+
+def dead_letter_source(queue: str) -> str:
+    """Traduce el nombre corto de la ruta ("upload", "processing") a la cola real"""
+    settings = get_settings()
+    queues = {"upload": settings.UPLOAD_QUEUE, "processing": settings.PROCESSING_QUEUE}
+    if queue not in queues:
+        raise HTTPException(status_code=404, detail=f"Cola desconocida: {queue}")
+    return queues[queue]
+
+def inspect_dead_letters(queue: str, limit: int) -> Dict:
+    rabbitmq = RabbitMQClient()
+    try:
+        return rabbitmq.inspect_dead_letters(queue, limit)
+    finally:
+        rabbitmq.close()
+
+def replay_dead_letters(queue: str, limit: int) -> int:
+    rabbitmq = RabbitMQClient()
+    try:
+        return rabbitmq.replay_dead_letters(queue, limit)
+    finally:
+        rabbitmq.close()
+
+@router.get("/dlq/{queue}")
+async def get_dead_letters(queue: str, limit: int = 20):
+    """Inspeccionar los mensajes en la cola de mensajes muertos sin consumirlos"""
+    source = dead_letter_source(queue)
+    try:
+        dead_letters = await get_admission().run(inspect_dead_letters, source, limit)
+    except Exception as e:
+        logging.error(f"Error inspeccionando DLQ de {source}: {str(e)}")
+        raise HTTPException(status_code=503, detail="No se pudo consultar la cola de mensajes muertos")
+    return JSONResponse(content=jsonable_encoder(dead_letters), status_code=200)
+
+@router.post("/dlq/{queue}/replay")
+async def replay_dead_letter_queue(queue: str, limit: int = 1000):
+    """Reenviar en bloque los mensajes muertos a su cola original (p. ej. tras un fix)"""
+    source = dead_letter_source(queue)
+    try:
+        replayed = await get_admission().run(replay_dead_letters, source, limit)
+    except Exception as e:
+        logging.error(f"Error reenviando DLQ de {source}: {str(e)}")
+        raise HTTPException(status_code=503, detail="No se pudo reenviar la cola de mensajes muertos")
+    return {"queue": source, "replayed": replayed}
+
+@router.post("/test_document", openapi_extra=upload_openapi("file"))
+async def test_process_document(request: Request, engine: Optional[str] = ENGINE_QUERY):
+    validate_engine(engine)
+    async with get_admission().admit():
+        return await process_test_document(request, engine)
+
+async def process_test_document(request: Request, engine: Optional[str] = None):
+    admission = get_admission()
+    stage_times: Dict[str, float] = {}
     db = None
-    extractor = None
     temp_pdf_path = None
-    timer_id = "test_document_timer"
-    metrics.start_timer(timer_id)
+    timer_id = None
     
     try:
         # Metadata inicial
         document_id = str(uuid.uuid4())
-        filename = file.filename
-        content = await file.read()
-        file_size = len(content)
+        timer_id = f"test_document_{document_id}"
+        metrics.start_timer(timer_id)
         created_at = datetime.now(timezone.utc)
-        temp_pdf_path = f"/tmp/{document_id}.pdf"
         
+        # Recibir el archivo en disco calculando su hash y tamaño
+        with stage_timer(stage_times, "upload"):
+            upload = await receive_pdf(request)
+        temp_pdf_path = upload.path
+        content_hash, file_size, filename = upload.sha256, upload.size, upload.filename
         logging.info(f"Iniciando prueba de procesamiento: {filename}")
-        # Guardar archivo temporal
-        with open(temp_pdf_path, "wb") as f:
-            f.write(content)
         logging.info(f"Archivo temporal guardado: {temp_pdf_path}")
         # Crear documento base
         document = Document(
@@ -202,33 +464,65 @@ async def test_process_document(file: UploadFile = File(..., description="Archiv
             metadata={}
         )
         # Inicializar DB y guardar documento
-        db = PostgresDatabase()
-        db.save_document(document)
+        with stage_timer(stage_times, "persistence"):
+            db = await admission.run(PostgresDatabase)
+            await admission.run(db.save_document, document)
         
         # Inicializar procesadores
-        extractor = PDFExtractor()
+        extractor = await admission.run(select_extractor, engine, temp_pdf_path)
         normalizer = TextNormalizer()
         cleaner = TextCleaner()
-        # Procesar documento
-        extracted_data = extractor.extract_document(temp_pdf_path)
-        cleaned_content = []
-        for content_item in extracted_data.get('content', []):
-            if isinstance(content_item, dict) and 'text' in content_item:
-                cleaned_text = cleaner.clean(content_item['text'])
-                if cleaned_text:
-                    cleaned_content.append(cleaned_text)
-        normalized_content = [normalizer.normalize(text) for text in cleaned_content]
+        # Procesar documento (o reutilizar la extracción de un PDF idéntico)
+        result_cache = get_result_cache()
+        fingerprint = extractor.cache_fingerprint()
+        with stage_timer(stage_times, "cache"):
+            extracted_data = await admission.run(result_cache.get, "document", content_hash, fingerprint, file_size)
+        cached = extracted_data is not None
+        if not cached:
+            with stage_timer(stage_times, "extraction"):
+                extracted_data = await admission.run(extractor.extract_document, temp_pdf_path)
+
+        # Las imágenes se copian al almacén de blobs mientras se limpia el texto
+        image_spill = None
+        image_objects = extracted_data.get('image_objects') or {}
+        unstored_images = sum(1 for image in image_objects.values() if image.get('blob_key') is None)
+        if settings.IMAGE_SPILL and unstored_images:
+            image_spill = asyncio.ensure_future(admission.run(
+                spill_images, temp_pdf_path, extracted_data['image_objects'], get_blob_store()
+            ))
+        with stage_timer(stage_times, "cleaning"):
+            cleaned_content, normalized_content = await admission.run(
+                clean_content, extracted_data.get('content', []), cleaner, normalizer
+            )
+        if image_spill is not None:
+            with stage_timer(stage_times, "images"):
+                try:
+                    await image_spill
+                except Exception as e:
+                    logging.error(f"Error copiando imágenes al almacén de blobs: {str(e)}")
+        # En un acierto solo se vuelve a guardar si se anotaron blob_key nuevos
+        keys_assigned = image_spill is not None and unstored_images > sum(
+            1 for image in image_objects.values() if image.get('blob_key') is None
+        )
+        if not cached or keys_assigned:
+            with stage_timer(stage_times, "cache"):
+                await admission.run(result_cache.put, "document", content_hash, fingerprint, extracted_data)
         
-        # Asignar párrafos limpiados
-        extracted_data['paragraphs'] = cleaned_content
-        extracted_data['normalized_paragraphs'] = normalized_content
+        # La respuesta lleva los párrafos limpiados; el resultado en caché no se modifica
+        analysis_data = {
+            **extracted_data,
+            'paragraphs': cleaned_content,
+            'normalized_paragraphs': normalized_content
+        }
 
         # Opcional: Loguear el texto completo extraído
-        logging.info(f"Texto completo extraído: {extracted_data.get('full_text', '')}")
+        logging.info(f"Texto completo extraído: {analysis_data.get('full_text', '')}")
     
         # Guardar análisis y métricas
-        db.save_document_analysis(document_id, extracted_data)
+        with stage_timer(stage_times, "persistence"):
+            await admission.run(db.save_document_analysis, document_id, analysis_data)
         processing_time = metrics.end_timer(timer_id)
+        metrics.record_stage_times(document_id, stage_times)
         
         metrics.record_document_metrics(
             document_id=document_id,
@@ -237,7 +531,7 @@ async def test_process_document(file: UploadFile = File(..., description="Archiv
             stats={
                 "total_paragraphs": len(cleaned_content),
                 "total_characters": sum(len(text) for text in cleaned_content),
-                "document_statistics": extracted_data.get('statistics', {})
+                "document_statistics": analysis_data.get('statistics', {})
             }
         )
         
@@ -246,11 +540,14 @@ async def test_process_document(file: UploadFile = File(..., description="Archiv
             content={
                 "document_id": document_id, 
                 "status": "success",
+                "engine": extractor.ENGINE,
                 "metrics": metrics.get_document_metrics(document_id),
-                "extracted_data": extracted_data
+                "extracted_data": analysis_data
             },
             status_code=201
         )
+    except HTTPException:
+        raise
     except PDFProcessingError as e:
         logging.error(f"Error en prueba de procesamiento: {str(e)}")
         if db:
@@ -268,10 +565,11 @@ async def test_process_document(file: UploadFile = File(..., description="Archiv
             detail=f"Error en prueba de procesamiento: {str(e)}"
         )
     finally:
+        # Un error deja el temporizador sin cerrar: no debe quedarse en memoria
+        if timer_id:
+            metrics.timers.pop(timer_id, None)
         if temp_pdf_path and os.path.exists(temp_pdf_path):
             os.remove(temp_pdf_path)
             logging.info(f"Archivo temporal eliminado: {temp_pdf_path}")
-        if extractor:
-            extractor.close()
         if db:
             db.close()
\ No newline at end of file
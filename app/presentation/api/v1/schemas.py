@@ -1,7 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
 from datetime import datetime
 
+# Máximo de resultados por búsqueda de similitud
+MAX_SIMILAR_RESULTS = 100
+
 class DocumentSchema(BaseModel):
     id: str
     filename: str
@@ -15,3 +18,8 @@ class AnalysisSchema(BaseModel):
     syntax_nodes: List[Dict]
     embeddings: List[float]
     metadata: Dict
+
+class SimilarSearchRequest(BaseModel):
+    text: Optional[str] = None
+    vector: Optional[List[float]] = None
+    k: int = Field(10, ge=1, le=MAX_SIMILAR_RESULTS)
@@ -0,0 +1,6 @@
+class ServiceOverloadedError(Exception):
+    """Se rechaza una petición porque la cola de extracciones está llena."""
+    
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,201 @@
+import hashlib
+import os
+import uuid
+from typing import Awaitable, Callable, List, Optional
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+from python_multipart.exceptions import MultipartParseError
+
+# Margen para cabeceras y delimitadores multipart al validar Content-Length
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def upload_openapi(field_name: str, multiple: bool = False) -> dict:
+    """Esquema OpenAPI del cuerpo; los endpoints en streaming no declaran parámetros File(...)"""
+    file_schema = {"type": "string", "format": "binary"}
+    schema = {"type": "array", "items": file_schema} if multiple else file_schema
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": {
+                "type": "object",
+                "properties": {field_name: schema},
+                "required": [field_name]
+            }}}
+        }
+    }
+
+
+class StreamedUpload:
+    """Fichero subido ya escrito en disco, con su hash y tamaño calculados al recibirlo"""
+
+    __slots__ = ('path', 'filename', 'content_type', 'sha256', 'size')
+
+    def __init__(self, path: str, filename: str, content_type: Optional[str], sha256: str, size: int):
+        self.path = path
+        self.filename = filename
+        self.content_type = content_type
+        self.sha256 = sha256
+        self.size = size
+
+
+class _UploadTooLarge(Exception):
+    pass
+
+
+class _MultipartFileWriter:
+    """Callbacks del parser multipart que vuelcan cada fichero a su ruta en disco.
+
+    Solo se guardan las partes con ``filename`` del campo ``field_name``;
+    el resto de campos se descarta. Cada fichero se hashea y mide mientras
+    se escribe y se corta en cuanto supera ``max_size``.
+    """
+
+    def __init__(self, field_name: str, upload_dir: str, max_size: int, max_files: int):
+        self.field_name = field_name
+        self.upload_dir = upload_dir
+        self.max_size = max_size
+        self.max_files = max_files
+        self.uploads: List[StreamedUpload] = []
+        self._headers = {}
+        self._header_field = b''
+        self._header_value = b''
+        self._file = None
+        self._hasher = None
+        self._current: Optional[StreamedUpload] = None
+
+    def callbacks(self) -> dict:
+        return {
+            'on_part_begin': self.on_part_begin,
+            'on_header_field': self.on_header_field,
+            'on_header_value': self.on_header_value,
+            'on_header_end': self.on_header_end,
+            'on_headers_finished': self.on_headers_finished,
+            'on_part_data': self.on_part_data,
+            'on_part_end': self.on_part_end
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b''
+        self._header_value = b''
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b'content-disposition'))
+        name = options.get(b'name', b'').decode('utf-8', errors='replace')
+        if name != self.field_name or b'filename' not in options:
+            return
+        if len(self.uploads) >= self.max_files:
+            raise _UploadTooLarge(f"Se admiten como máximo {self.max_files} archivos por petición")
+        content_type = self._headers.get(b'content-type')
+        self._current = StreamedUpload(
+            path=os.path.join(self.upload_dir, f"{uuid.uuid4()}.pdf"),
+            filename=options[b'filename'].decode('utf-8', errors='replace'),
+            content_type=content_type.decode('latin-1') if content_type else None,
+            sha256='',
+            size=0
+        )
+        self.uploads.append(self._current)
+        self._hasher = hashlib.sha256()
+        self._file = open(self._current.path, 'wb')
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._current is None:
+            return
+        self._current.size += end - start
+        if self._current.size > self.max_size:
+            raise _UploadTooLarge(f"El archivo supera el tamaño máximo de {self.max_size} bytes")
+        chunk = memoryview(data)[start:end]
+        self._hasher.update(chunk)
+        self._file.write(chunk)
+
+    def on_part_end(self):
+        if self._current is None:
+            return
+        self._file.close()
+        self._current.sha256 = self._hasher.hexdigest()
+        self._file = None
+        self._current = None
+
+    def discard(self):
+        """Cierra y borra los ficheros escritos (subida rechazada o incompleta)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for upload in self.uploads:
+            try:
+                os.remove(upload.path)
+            except FileNotFoundError:
+                pass
+
+
+async def receive_uploads(
+    request: Request,
+    field_name: str,
+    upload_dir: str,
+    max_size: int,
+    max_files: int = 1,
+    run: Optional[Callable[..., Awaitable]] = None,
+    chunk_size: int = 1024 * 1024
+) -> List[StreamedUpload]:
+    """Recibe los ficheros de un cuerpo multipart escribiéndolos en ``upload_dir``.
+
+    El cuerpo se lee en streaming: en memoria solo hay un bloque de hasta
+    ``chunk_size`` bytes, sin el fichero temporal intermedio de Starlette.
+    Un Content-Length o un fichero mayor que ``max_size`` se rechaza con
+    413 en cuanto se detecta y se borra lo escrito. ``run`` ejecuta la
+    escritura fuera del event loop (``AdmissionController.run``).
+    """
+    content_type, params = parse_options_header(request.headers.get('content-type'))
+    if content_type != b'multipart/form-data' or b'boundary' not in params:
+        raise HTTPException(status_code=400, detail="Se esperaba un cuerpo multipart/form-data")
+
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_size * max_files + MULTIPART_OVERHEAD:
+            raise HTTPException(status_code=413, detail=f"La petición supera el tamaño máximo de {max_size} bytes por archivo")
+
+    os.makedirs(upload_dir, exist_ok=True)
+    writer = _MultipartFileWriter(field_name, upload_dir, max_size, max_files)
+    parser = MultipartParser(params[b'boundary'], writer.callbacks())
+
+    async def feed(data: bytes):
+        if run is not None:
+            await run(parser.write, data)
+        else:
+            parser.write(data)
+
+    buffer = bytearray()
+    try:
+        async for chunk in request.stream():
+            buffer += chunk
+            if len(buffer) >= chunk_size:
+                await feed(bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await feed(bytes(buffer))
+        parser.finalize()
+        if writer._current is not None:
+            raise MultipartParseError("Cuerpo multipart incompleto")
+    except _UploadTooLarge as e:
+        writer.discard()
+        raise HTTPException(status_code=413, detail=str(e))
+    except MultipartParseError as e:
+        writer.discard()
+        raise HTTPException(status_code=400, detail=f"Cuerpo multipart no válido: {str(e)}")
+    except BaseException:
+        writer.discard()
+        raise
+
+    if not writer.uploads:
+        raise HTTPException(status_code=400, detail="No se proporcionó ningún archivo")
+    return writer.uploads
@@ -1,9 +1,121 @@
-from sentence_transformers import SentenceTransformer
+import re
+from functools import lru_cache
+from typing import List, Tuple
+import numpy as np
+from app.core.config import get_settings
+from app.semantic.model_registry import ModelRegistry, get_model_registry
+from app.semantic.embedding_cache import EmbeddingCache, content_key
+
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n|\f')
+
+
+def paragraph_spans(text: str) -> List[Tuple[int, str, int]]:
+    """Párrafos del texto como (offset en el documento, texto, página).
+
+    Los párrafos se separan por líneas en blanco; ``\\f`` marca el paso a la
+    página siguiente (páginas numeradas desde 0, como en el extractor).
+    """
+    spans = []
+    position, page = 0, 0
+    for match in list(PARAGRAPH_BREAK.finditer(text)) + [None]:
+        end = match.start() if match else len(text)
+        block = text[position:end]
+        paragraph = block.strip()
+        if paragraph:
+            spans.append((position + len(block) - len(block.lstrip()), paragraph, page))
+        if match:
+            page += match.group().count('\f')
+            position = match.end()
+    return spans
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Divide el texto en párrafos por líneas en blanco y saltos de página"""
+    return [paragraph for _, paragraph, _ in paragraph_spans(text)]
+
+
+@lru_cache()
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    settings = get_settings()
+    return EmbeddingCache(settings.EMBEDDING_CACHE_DIR, model_name, settings.EMBEDDING_CACHE_DTYPE)
+
 
 class EmbeddingGenerator:
-    def __init__(self, model_name: str = 'sentence-transformers/paraphrase-multilingual-mpnet-base-v2'):
-        self.model = SentenceTransformer(model_name)
+    def __init__(
+        self,
+        model_name: str = 'sentence-transformers/paraphrase-multilingual-mpnet-base-v2',
+        registry: ModelRegistry = None,
+        batch_size: int = None,
+        cache: EmbeddingCache = None
+    ):
+        settings = get_settings()
+        self.model_name = model_name
+        self.registry = registry or get_model_registry()
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        if cache is None and settings.EMBEDDING_CACHE_DIR:
+            cache = get_embedding_cache(model_name)
+        self.cache = cache
+
+    @property
+    def model(self):
+        return self.registry.sentence_transformer(self.model_name)
 
-    def generate(self, text: str) -> list:
-        embeddings = self.model.encode([text])
+    def generate(self, text: str, pooled: bool = True) -> list:
+        """Embeddings del texto por párrafos; con ``pooled`` un único vector de documento"""
+        embeddings = self.encode_paragraphs(split_paragraphs(text))
+        if pooled:
+            return self.pool(embeddings).tolist()
         return embeddings.tolist()
+
+    def encode_paragraphs(self, paragraphs: List[str]) -> np.ndarray:
+        """Matriz (párrafos x dim) float32; solo se codifican los párrafos que no están en caché"""
+        if not paragraphs:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        keys = [content_key(paragraph) for paragraph in paragraphs]
+        if self.cache is not None:
+            cached, missing = self.cache.get_many(keys)
+        else:
+            cached, missing = {}, list(range(len(paragraphs)))
+
+        # Párrafos repetidos dentro del documento se codifican una vez
+        unique = {}
+        for i in missing:
+            unique.setdefault(keys[i], paragraphs[i])
+        encoded = dict(zip(unique, self._encode_sorted(list(unique.values()))))
+        if self.cache is not None and encoded:
+            self.cache.put_many(list(encoded), np.stack(list(encoded.values())))
+
+        rows = [cached[i] if i in cached else encoded[keys[i]] for i in range(len(paragraphs))]
+        return np.stack(rows).astype(np.float32, copy=False)
+
+    def _encode_sorted(self, texts: List[str]) -> List[np.ndarray]:
+        """Codifica en lotes de longitud similar para minimizar el padding"""
+        if not texts:
+            return []
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            encoded = self.model.encode(
+                [texts[i] for i in batch],
+                batch_size=len(batch),
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            for i, vector in zip(batch, encoded):
+                vectors[i] = np.asarray(vector, dtype=np.float32)
+        return vectors
+
+    @staticmethod
+    def pool(embeddings: np.ndarray) -> np.ndarray:
+        """Vector de documento: media de los párrafos normalizada (L2)"""
+        if not len(embeddings):
+            return np.zeros(0, dtype=np.float32)
+        vector = embeddings.mean(axis=0)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get_metrics(self) -> dict:
+        return self.cache.get_metrics() if self.cache is not None else {}
@@ -0,0 +1,150 @@
+# app/semantic/embedding_cache.py
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+KEY_SIZE = 16
+
+
+def content_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=KEY_SIZE).digest()
+
+
+class EmbeddingCache:
+    """Caché en disco de embeddings por hash de contenido, leída con memory-map.
+
+    Un directorio por modelo con dos ficheros de solo-añadir alineados por
+    fila: ``keys.bin`` (hashes de 16 bytes) y ``vectors.bin`` (matriz
+    ``dtype`` de ``dim`` columnas). Varios procesos pueden compartirla: las
+    escrituras se serializan con ``flock`` y cada proceso incorpora las
+    filas nuevas de los demás al releer el final de ``keys.bin``.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str, dtype: str = "float16"):
+        self.dtype = np.dtype(dtype)
+        self.directory = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', model_name))
+        os.makedirs(self.directory, exist_ok=True)
+        self.keys_path = os.path.join(self.directory, "keys.bin")
+        self.vectors_path = os.path.join(self.directory, "vectors.bin")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.lock_path = os.path.join(self.directory, ".lock")
+        self.dim: Optional[int] = None
+        self._index: Dict[bytes, int] = {}
+        self._keys_offset = 0
+        self._vectors: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load_meta()
+
+    def _load_meta(self):
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            if meta["dtype"] != self.dtype.name:
+                raise ValueError(
+                    f"La caché {self.directory} usa {meta['dtype']}, no {self.dtype.name}"
+                )
+            self.dim = meta["dim"]
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Incorpora al índice las filas añadidas (por este u otro proceso) desde la última lectura"""
+        if self.dim is None:
+            self._load_meta()
+            if self.dim is None:
+                return
+        try:
+            with open(self.keys_path, "rb") as f:
+                f.seek(self._keys_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        usable = len(data) - len(data) % KEY_SIZE
+        if not usable:
+            return
+        first_row = self._keys_offset // KEY_SIZE
+        for i in range(usable // KEY_SIZE):
+            self._index.setdefault(data[i * KEY_SIZE:(i + 1) * KEY_SIZE], first_row + i)
+        self._keys_offset += usable
+        self._vectors = None
+
+    def _matrix(self) -> np.ndarray:
+        if self._vectors is None:
+            rows = self._keys_offset // KEY_SIZE
+            self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(rows, self.dim))
+        return self._vectors
+
+    def get_many(self, keys: Sequence[bytes]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """Devuelve ({posición: vector float32} de los aciertos, posiciones sin caché)"""
+        with self._lock:
+            if any(key not in self._index for key in keys):
+                self._refresh()
+            rows = [self._index.get(key) for key in keys]
+            found = {i: row for i, row in enumerate(rows) if row is not None}
+            missing = [i for i, row in enumerate(rows) if row is None]
+            vectors = {}
+            if found:
+                matrix = self._matrix()
+                positions = list(found)
+                block = np.asarray(matrix[[found[i] for i in positions]], dtype=np.float32)
+                vectors = dict(zip(positions, block))
+            self.hits += len(found)
+            self.misses += len(missing)
+            return vectors, missing
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray):
+        if not len(keys):
+            return
+        vectors = np.asarray(vectors)
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self.meta_path, "w") as f:
+                    json.dump({"dim": self.dim, "dtype": self.dtype.name}, f)
+            new = {}
+            for key, vector in zip(keys, vectors):
+                if key not in self._index:
+                    new.setdefault(key, vector)
+            if not new:
+                return
+            # Descartar restos de una escritura interrumpida para mantener las filas alineadas
+            rows = self._keys_offset // KEY_SIZE
+            for path, size in ((self.keys_path, self._keys_offset),
+                               (self.vectors_path, rows * self.dim * self.dtype.itemsize)):
+                if os.path.exists(path) and os.path.getsize(path) > size:
+                    os.truncate(path, size)
+            # Vectores antes que claves: una clave visible siempre tiene su fila escrita
+            block = np.stack(list(new.values())).astype(self.dtype, copy=False)
+            with open(self.vectors_path, "ab") as f:
+                f.write(block.tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.write(b"".join(new))
+            self._refresh()
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "dim": self.dim,
+                "dtype": self.dtype.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0
+            }
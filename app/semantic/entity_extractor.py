@@ -1,17 +1,72 @@
-import spacy
+from typing import Dict, List, Sequence, Union
+from app.core.config import get_settings
+from app.semantic.embedding import paragraph_spans
+from app.semantic.model_registry import ModelRegistry, get_model_registry
 
 class EntityExtractor:
-    def __init__(self, model_name: str = 'es_core_news_lg'):
-        self.nlp = spacy.load(model_name)
+    """NER por párrafos con ``nlp.pipe`` y solo el componente ``ner`` activo.
+
+    Cada entidad sale con las claves de la tabla ``entities``
+    (``entity_text``, ``entity_label``, ``start_char``/``end_char`` relativos
+    al párrafo, ``context``) más ``paragraph_index``, ``page_num`` y los
+    offsets en el documento.
+    """
+
+    def __init__(
+        self,
+        model_name: str = 'es_core_news_lg',
+        registry: ModelRegistry = None,
+        batch_size: int = None,
+        n_process: int = None,
+        context_chars: int = 60
+    ):
+        settings = get_settings()
+        self.model_name = model_name
+        self.registry = registry or get_model_registry()
+        self.batch_size = batch_size or settings.NER_BATCH_SIZE
+        self.n_process = n_process or settings.NER_N_PROCESS
+        self.context_chars = context_chars
+
+    @property
+    def nlp(self):
+        return self.registry.spacy(self.model_name)
 
     def extract_entities(self, text: str) -> list:
-        doc = self.nlp(text)
+        """Entidades de un texto completo, ubicadas por párrafo y página (``\\f`` entre páginas)"""
+        return self.extract_paragraph_entities([
+            {'text': paragraph, 'start_char': start, 'page_num': page}
+            for start, paragraph, page in paragraph_spans(text)
+        ])
+
+    def extract_paragraph_entities(self, paragraphs: Sequence[Union[str, Dict]]) -> List[Dict]:
+        """Entidades de una lista de párrafos (textos o dicts con ``text`` y, opcionalmente,
+        ``start_char`` en el documento y ``page_num`` o ``linguistic_features.page_num``)"""
+        paragraphs = [{'text': p} if isinstance(p, str) else p for p in paragraphs]
+        texts = [paragraph['text'] for paragraph in paragraphs]
+        if not texts:
+            return []
+
+        # Solo se necesita el componente 'ner'
+        disabled = self.registry.spacy_disabled_pipes(self.model_name, keep=['ner'])
+        # Lanzar procesos solo compensa si hay trabajo para varios lotes por proceso
+        n_process = self.n_process if len(texts) >= self.batch_size * self.n_process else 1
+        docs = self.nlp.pipe(texts, batch_size=self.batch_size, n_process=n_process, disable=disabled)
+
         entities = []
-        for ent in doc.ents:
-            entities.append({
-                "text": ent.text,
-                "start_char": ent.start_char,
-                "end_char": ent.end_char,
-                "label": ent.label_
-            })
+        for index, (paragraph, doc) in enumerate(zip(paragraphs, docs)):
+            text = paragraph['text']
+            offset = paragraph.get('start_char')
+            page_num = paragraph.get('page_num', paragraph.get('linguistic_features', {}).get('page_num'))
+            for ent in doc.ents:
+                entities.append({
+                    "entity_text": ent.text,
+                    "entity_label": ent.label_,
+                    "start_char": ent.start_char,
+                    "end_char": ent.end_char,
+                    "context": text[max(0, ent.start_char - self.context_chars):ent.end_char + self.context_chars],
+                    "paragraph_index": index,
+                    "page_num": page_num,
+                    "document_start_char": offset + ent.start_char if offset is not None else None,
+                    "document_end_char": offset + ent.end_char if offset is not None else None
+                })
         return entities
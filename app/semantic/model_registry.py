@@ -0,0 +1,100 @@
+# app/semantic/model_registry.py
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List
+
+
+class ModelRegistry:
+    """Registro de modelos NLP compartido por todo el proceso.
+
+    Cada modelo se carga una sola vez, de forma perezosa, la primera vez que
+    una etapa lo solicita (o al arrancar, mediante ``preload``).
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._models: Dict[str, Any] = {}
+        self._load_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def _get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Un lock por modelo: cargas de modelos distintos no se bloquean entre sí
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                start = time.perf_counter()
+                model = loader()
+                elapsed = time.perf_counter() - start
+                self._models[key] = model
+                self._load_times[key] = elapsed
+                self.logger.info(f"Modelo {key} cargado en {elapsed:.2f}s")
+        return model
+
+    def spacy(self, model_name: str):
+        """Pipeline de spaCy con todos sus componentes disponibles"""
+        def load():
+            import spacy
+            nlp = spacy.load(model_name)
+            nlp.max_length = 2000000
+            return nlp
+        return self._get_or_load(f"spacy:{model_name}", load)
+
+    def spacy_disabled_pipes(self, model_name: str, keep: Iterable[str]) -> List[str]:
+        """Componentes a desactivar en una llamada para usar solo ``keep``.
+
+        Se pasa como ``disable=`` a ``nlp(...)`` o ``nlp.pipe(...)``, sin
+        modificar el pipeline compartido.
+        """
+        keep = set(keep)
+        return [name for name in self.spacy(model_name).pipe_names if name not in keep]
+
+    def sentence_transformer(self, model_name: str):
+        def load():
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(model_name)
+        return self._get_or_load(f"sentence_transformer:{model_name}", load)
+
+    def summarizer(self, model_name: str):
+        def load():
+            from transformers import pipeline
+            return pipeline("summarization", model=model_name)
+        return self._get_or_load(f"summarizer:{model_name}", load)
+
+    def preload(self, specs: Iterable[str]):
+        """Carga los modelos indicados como ``tipo:nombre`` (p. ej. ``spacy:es_core_news_lg``)"""
+        loaders = {
+            'spacy': self.spacy,
+            'sentence_transformer': self.sentence_transformer,
+            'summarizer': self.summarizer
+        }
+        for spec in specs:
+            kind, _, model_name = spec.partition(':')
+            loader = loaders.get(kind)
+            if loader is None or not model_name:
+                self.logger.warning(f"Especificación de modelo no válida: {spec}")
+                continue
+            loader(model_name)
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._models
+
+    def get_metrics(self) -> Dict:
+        return {
+            "loaded_models": len(self._models),
+            "total_load_time_seconds": sum(self._load_times.values()),
+            "load_time_seconds": dict(self._load_times)
+        }
+
+
+@lru_cache()
+def get_model_registry() -> ModelRegistry:
+    return ModelRegistry()
@@ -1,9 +1,150 @@
-from transformers import pipeline
+import hashlib
+import re
+import threading
+from functools import lru_cache
+from typing import List
+from app.core.config import get_settings
+from app.infraestructure.cache.result_cache import ExtractionResultCache, build_cache_backend
+from app.semantic.embedding import split_paragraphs
+from app.semantic.model_registry import ModelRegistry, get_model_registry
+
+_thread_budget_lock = threading.Lock()
+_thread_budget_applied = False
+
+
+@lru_cache()
+def get_summary_cache() -> ExtractionResultCache:
+    settings = get_settings()
+    return ExtractionResultCache(
+        build_cache_backend(settings.SUMMARY_CACHE_MAX_ENTRIES), ttl=settings.RESULT_CACHE_TTL
+    )
+
+
+def apply_thread_budget(threads: int):
+    """Limita los hilos de torch del proceso (0 = valor por defecto de torch)"""
+    global _thread_budget_applied
+    if not threads:
+        return
+    with _thread_budget_lock:
+        if not _thread_budget_applied:
+            import torch
+            torch.set_num_threads(threads)
+            _thread_budget_applied = True
+
 
 class TextSummarizer:
-    def __init__(self, model_name: str = 'facebook/bart-large-cnn'):
-        self.summarizer = pipeline("summarization", model=model_name)
+    """Resumen map-reduce: el texto se parte en fragmentos que caben en el
+    contexto del modelo (respetando párrafos), se resumen en lotes y los
+    resúmenes parciales se vuelven a resumir hasta quedar uno."""
+
+    def __init__(
+        self,
+        model_name: str = 'facebook/bart-large-cnn',
+        registry: ModelRegistry = None,
+        chunk_tokens: int = None,
+        batch_size: int = None,
+        threads: int = None,
+        cache: ExtractionResultCache = None
+    ):
+        settings = get_settings()
+        self.model_name = model_name
+        self.registry = registry or get_model_registry()
+        self.chunk_tokens = chunk_tokens or settings.SUMMARY_CHUNK_TOKENS
+        self.batch_size = batch_size or settings.SUMMARY_BATCH_SIZE
+        self.threads = settings.SUMMARY_THREADS if threads is None else threads
+        self.cache = cache or get_summary_cache()
+
+    @property
+    def summarizer(self):
+        return self.registry.summarizer(self.model_name)
+
+    @property
+    def tokenizer(self):
+        return self.summarizer.tokenizer
 
     def summarize(self, text: str, max_length: int = 130, min_length: int = 30, do_sample: bool = False) -> str:
-        summary = self.summarizer(text, max_length=max_length, min_length=min_length, do_sample=do_sample)
-        return summary[0]['summary_text']
+        paragraphs = split_paragraphs(text)
+        if not paragraphs:
+            return ""
+        apply_thread_budget(self.threads)
+
+        # Map: un resumen por fragmento
+        summaries = self._summarize_chunks(self.chunk(paragraphs), max_length, min_length, do_sample)
+        # Reduce: agrupar resúmenes parciales en fragmentos y resumir de nuevo
+        while len(summaries) > 1:
+            chunks = self.chunk(summaries)
+            if len(chunks) == len(summaries):
+                # Los resúmenes no se pueden agrupar más: un último pase truncado
+                chunks = ["\n\n".join(summaries)]
+            summaries = self._summarize_chunks(chunks, max_length, min_length, do_sample)
+        return summaries[0]
+
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        return [len(ids) for ids in self.tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+    def chunk(self, paragraphs: List[str]) -> List[str]:
+        """Agrupa párrafos consecutivos en fragmentos de hasta ``chunk_tokens`` tokens"""
+        chunks, current, current_tokens = [], [], 0
+        for paragraph, tokens in zip(paragraphs, self._count_tokens(paragraphs)):
+            pieces = [(paragraph, tokens)] if tokens <= self.chunk_tokens else self._split_long(paragraph)
+            for piece, piece_tokens in pieces:
+                if current and current_tokens + piece_tokens > self.chunk_tokens:
+                    chunks.append("\n\n".join(current))
+                    current, current_tokens = [], 0
+                current.append(piece)
+                current_tokens += piece_tokens
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+
+    def _split_long(self, paragraph: str) -> List[tuple]:
+        """Parte un párrafo demasiado largo por oraciones y, si no basta, por tokens"""
+        sentences = re.split(r'(?<=[.!?])\s+', paragraph)
+        pieces = []
+        for sentence, tokens in zip(sentences, self._count_tokens(sentences)):
+            if tokens <= self.chunk_tokens:
+                pieces.append((sentence, tokens))
+                continue
+            ids = self.tokenizer(sentence, add_special_tokens=False)["input_ids"]
+            for start in range(0, len(ids), self.chunk_tokens):
+                window = ids[start:start + self.chunk_tokens]
+                pieces.append((self.tokenizer.decode(window, skip_special_tokens=True), len(window)))
+        return pieces
+
+    def _summarize_chunks(self, chunks: List[str], max_length: int, min_length: int, do_sample: bool) -> List[str]:
+        fingerprint = hashlib.sha1(
+            f"{self.model_name}:{max_length}:{min_length}:{do_sample}".encode()
+        ).hexdigest()[:16]
+        hashes = [hashlib.sha256(chunk.encode('utf-8')).hexdigest() for chunk in chunks]
+        summaries = [None] * len(chunks)
+        pending = []
+        for i, (chunk, chunk_hash) in enumerate(zip(chunks, hashes)):
+            cached = None if do_sample else self.cache.get("summary", chunk_hash, fingerprint)
+            if cached is not None:
+                summaries[i] = cached["summary"]
+            else:
+                pending.append(i)
+
+        # Fragmentos más cortos que el resumen mínimo no se resumen
+        token_counts = self._count_tokens([chunks[i] for i in pending]) if pending else []
+        to_model = []
+        for i, tokens in zip(pending, token_counts):
+            if tokens <= min_length:
+                summaries[i] = chunks[i]
+            else:
+                to_model.append(i)
+
+        if to_model:
+            outputs = self.summarizer(
+                [chunks[i] for i in to_model],
+                batch_size=self.batch_size,
+                max_length=max_length,
+                min_length=min_length,
+                do_sample=do_sample,
+                truncation=True
+            )
+            for i, output in zip(to_model, outputs):
+                summaries[i] = output['summary_text']
+                if not do_sample:
+                    self.cache.put("summary", hashes[i], fingerprint, {"summary": summaries[i]})
+        return summaries
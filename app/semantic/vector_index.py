@@ -0,0 +1,260 @@
+# app/semantic/vector_index.py
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from app.core.config import get_settings
+
+ID_SIZE = 64
+
+
+class VectorIndex:
+    """Índice de similitud coseno sobre vectores de documento, persistido en disco.
+
+    Los vectores (normalizados, float32) se añaden a ``vectors.bin`` y sus
+    identificadores a ``ids.bin``, ambos de solo-añadir y leídos con
+    memory-map; si un identificador se repite, gana la última fila. Con
+    pocos vectores la búsqueda es exacta (fuerza bruta). A partir de
+    ``ivf_threshold`` se entrena un índice IVF (k-means): cada consulta
+    solo compara contra las ``nprobe`` listas más cercanas, más las filas
+    añadidas después del último entrenamiento, que se recorren en plano.
+    """
+
+    def __init__(self, index_dir: str, mode: str = "auto", ivf_threshold: int = 20000,
+                 nprobe: int = 8, rebuild_ratio: float = 0.2):
+        if mode not in ("auto", "flat", "ivf"):
+            raise ValueError(f"Modo de índice no soportado: {mode}")
+        self.index_dir = index_dir
+        self.mode = mode
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.rebuild_ratio = rebuild_ratio
+        os.makedirs(index_dir, exist_ok=True)
+        self.ids_path = os.path.join(index_dir, "ids.bin")
+        self.vectors_path = os.path.join(index_dir, "vectors.bin")
+        self.meta_path = os.path.join(index_dir, "meta.json")
+        self.centroids_path = os.path.join(index_dir, "ivf_centroids.npy")
+        self.assign_path = os.path.join(index_dir, "ivf_assign.npy")
+        self.lock_path = os.path.join(index_dir, ".lock")
+        self._lock = threading.RLock()
+        self.dim: Optional[int] = None
+        self._rows = 0
+        self._ids: List[str] = []
+        self._latest: Dict[str, int] = {}
+        self._live = np.zeros(0, dtype=bool)
+        self._vectors: Optional[np.memmap] = None
+        self._ivf_version = None
+        self._centroids: Optional[np.ndarray] = None
+        self._ivf_rows = 0
+        self._list_order: Optional[np.ndarray] = None
+        self._list_offsets: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._latest)
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Incorpora filas e IVF escritos por este u otro proceso"""
+        if self.dim is None:
+            if not os.path.exists(self.meta_path):
+                return
+            with open(self.meta_path) as f:
+                self.dim = json.load(f)["dim"]
+        try:
+            with open(self.ids_path, "rb") as f:
+                f.seek(self._rows * ID_SIZE)
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        new_rows = len(data) // ID_SIZE
+        if new_rows:
+            live = np.concatenate([self._live, np.ones(new_rows, dtype=bool)])
+            for i in range(new_rows):
+                row = self._rows + i
+                document_id = data[i * ID_SIZE:(i + 1) * ID_SIZE].rstrip(b"\0").decode()
+                previous = self._latest.get(document_id)
+                if previous is not None:
+                    live[previous] = False
+                self._latest[document_id] = row
+                self._ids.append(document_id)
+            self._rows += new_rows
+            self._live = live
+            self._vectors = None
+        self._load_ivf()
+
+    def _load_ivf(self):
+        try:
+            version = os.stat(self.assign_path).st_mtime_ns
+        except FileNotFoundError:
+            self._centroids, self._ivf_rows, self._ivf_version = None, 0, None
+            return
+        if version == self._ivf_version:
+            return
+        self._centroids = np.load(self.centroids_path)
+        assign = np.load(self.assign_path)
+        self._ivf_rows = len(assign)
+        # Filas de cada lista contiguas: order[offsets[l]:offsets[l+1]]
+        self._list_order = np.argsort(assign, kind="stable")
+        self._list_offsets = np.searchsorted(assign[self._list_order], np.arange(len(self._centroids) + 1))
+        self._ivf_version = version
+
+    def _matrix(self) -> np.ndarray:
+        if self._vectors is None:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self.dim))
+        return self._vectors
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add(self, document_id: str, vector: Sequence[float]):
+        self.add_many([document_id], [vector])
+
+    def add_many(self, document_ids: Sequence[str], vectors):
+        if not len(document_ids):
+            return
+        vectors = self._normalize(vectors)
+        encoded = [document_id.encode() for document_id in document_ids]
+        if any(len(document_id) > ID_SIZE for document_id in encoded):
+            raise ValueError(f"Identificador de más de {ID_SIZE} bytes")
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self.meta_path, "w") as f:
+                    json.dump({"dim": self.dim}, f)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Dimensión {vectors.shape[1]} distinta de la del índice ({self.dim})")
+            # Descartar restos de una escritura interrumpida para mantener las filas alineadas
+            for path, size in ((self.ids_path, self._rows * ID_SIZE),
+                               (self.vectors_path, self._rows * self.dim * 4)):
+                if os.path.exists(path) and os.path.getsize(path) > size:
+                    os.truncate(path, size)
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self.ids_path, "ab") as f:
+                f.write(b"".join(document_id.ljust(ID_SIZE, b"\0") for document_id in encoded))
+            self._refresh()
+            if self._needs_rebuild():
+                self._build_ivf()
+
+    def _needs_rebuild(self) -> bool:
+        if self.mode == "flat":
+            return False
+        if self.mode == "auto" and self._rows < self.ivf_threshold:
+            return False
+        tail = self._rows - self._ivf_rows
+        return self._centroids is None or tail > self.rebuild_ratio * max(self._ivf_rows, 1)
+
+    def build_ivf(self):
+        """Entrena (o re-entrena) el IVF con todas las filas actuales"""
+        with self._lock, self._file_lock():
+            self._refresh()
+            self._build_ivf()
+
+    def _build_ivf(self, iterations: int = 10, seed: int = 0):
+        matrix = self._matrix()
+        rows = self._rows
+        if rows == 0:
+            return
+        nlist = max(1, int(np.sqrt(rows)))
+        rng = np.random.default_rng(seed)
+        # k-means (esférico) sobre una muestra; después se asignan todas las filas
+        sample = np.asarray(matrix[np.sort(rng.choice(rows, min(rows, nlist * 64), replace=False))])
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = sample[labels == cluster]
+                if len(members):
+                    centroids[cluster] = members.mean(axis=0)
+            centroids = self._normalize(centroids)
+
+        assign = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, 65536):
+            block = np.asarray(matrix[start:start + 65536])
+            assign[start:start + 65536] = np.argmax(block @ centroids.T, axis=1)
+
+        for path, array in ((self.centroids_path, centroids), (self.assign_path, assign)):
+            tmp_path = f"{path}.tmp.npy"
+            np.save(tmp_path, array)
+            os.replace(tmp_path, path)
+        self._load_ivf()
+
+    def get_vector(self, document_id: str) -> Optional[np.ndarray]:
+        with self._lock:
+            self._refresh()
+            row = self._latest.get(document_id)
+            return None if row is None else np.array(self._matrix()[row])
+
+    def search(self, vector: Sequence[float], k: int = 10, exclude: Optional[str] = None,
+               exact: bool = False) -> List[Dict]:
+        """Los ``k`` documentos más similares (coseno) a ``vector``"""
+        query = self._normalize(vector)[0]
+        with self._lock:
+            self._refresh()
+            if not self._rows:
+                return []
+            if query.shape[0] != self.dim:
+                raise ValueError(f"Dimensión {query.shape[0]} distinta de la del índice ({self.dim})")
+            matrix = self._matrix()
+            if exact or self._centroids is None or self.mode == "flat":
+                candidates = np.arange(self._rows)
+            else:
+                probes = np.argsort(-(self._centroids @ query))[:self.nprobe]
+                lists = [self._list_order[self._list_offsets[p]:self._list_offsets[p + 1]] for p in probes]
+                candidates = np.concatenate(lists + [np.arange(self._ivf_rows, self._rows)])
+            live = self._live.copy()
+            if exclude is not None and exclude in self._latest:
+                live[self._latest[exclude]] = False
+            rows = np.sort(candidates[live[candidates]])
+            ids = self._ids
+        if not len(rows):
+            return []
+
+        block = np.asarray(matrix) if len(rows) == len(matrix) else np.asarray(matrix[rows])
+        scores = block @ query
+        top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{"document_id": ids[rows[i]], "score": float(scores[i])} for i in top]
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            self._refresh()
+            return {
+                "documents": len(self._latest),
+                "rows": self._rows,
+                "dim": self.dim,
+                "mode": "ivf" if self._centroids is not None and self.mode != "flat" else "flat",
+                "ivf_lists": len(self._centroids) if self._centroids is not None else 0,
+                "ivf_rows": self._ivf_rows,
+                "nprobe": self.nprobe
+            }
+
+
+@lru_cache()
+def get_vector_index() -> VectorIndex:
+    settings = get_settings()
+    return VectorIndex(
+        settings.VECTOR_INDEX_DIR,
+        mode=settings.VECTOR_INDEX_MODE,
+        ivf_threshold=settings.VECTOR_INDEX_IVF_THRESHOLD,
+        nprobe=settings.VECTOR_INDEX_NPROBE
+    )
@@ -8,5 +8,6 @@ class ExtractTextUseCase:
         document = fitz.open(file_path)
         text = ""
         for page in document:
-            text += page.get_text()
+            # \f separa páginas para poder ubicar párrafos y entidades
+            text += page.get_text() + "\f"
         return text
@@ -0,0 +1,144 @@
+# app/use_cases/pipeline.py
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class StageFailedError(Exception):
+    """Falló una etapa obligatoria del pipeline."""
+
+    def __init__(self, stage: str, cause: BaseException):
+        super().__init__(f"La etapa '{stage}' falló: {cause}")
+        self.stage = stage
+        self.cause = cause
+
+
+@dataclass
+class Stage:
+    """Etapa del DAG: ``func`` recibe los resultados de las etapas de las que depende"""
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    depends_on: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    optional: bool = False
+    skip: bool = False
+    default: Any = None
+    executor: Optional[Executor] = None
+
+
+@dataclass
+class PipelineResult:
+    results: Dict[str, Any] = field(default_factory=dict)
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def succeeded(self, name: str) -> bool:
+        return self.stages.get(name, {}).get("status") == "ok"
+
+
+class PipelineExecutor:
+    """Ejecuta un DAG de etapas: cada etapa arranca en cuanto terminan sus
+    dependencias, así que las independientes corren a la vez. Una etapa
+    opcional que falla, excede su timeout o se omite deja ``default`` como
+    resultado y omite a las que dependen de ella; si falla una obligatoria
+    se cancela el resto y se lanza ``StageFailedError``.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None):
+        self.executor = executor
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @staticmethod
+    def time_budget(stages: List[Stage]) -> float:
+        """Suma de timeouts del camino más largo del DAG: lo que puede tardar la
+        ejecución en el peor caso (las etapas omitidas o sin timeout no cuentan)"""
+        by_name = {stage.name: stage for stage in stages}
+        finish: Dict[str, float] = {}
+
+        def finish_time(name: str) -> float:
+            if name not in finish:
+                stage = by_name[name]
+                start = max((finish_time(dep) for dep in stage.depends_on), default=0.0)
+                finish[name] = start + (0.0 if stage.skip else stage.timeout or 0.0)
+            return finish[name]
+
+        return max((finish_time(name) for name in by_name), default=0.0)
+
+    async def run(self, stages: List[Stage]) -> PipelineResult:
+        by_name = {stage.name: stage for stage in stages}
+        for stage in stages:
+            missing = [dep for dep in stage.depends_on if dep not in by_name]
+            if missing:
+                raise ValueError(f"La etapa '{stage.name}' depende de etapas inexistentes: {missing}")
+
+        result = PipelineResult()
+        done = {name: asyncio.Event() for name in by_name}
+        tasks = [asyncio.create_task(self._run_stage(stage, result, done)) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return result
+
+    async def _run_stage(self, stage: Stage, result: PipelineResult, done: Dict[str, asyncio.Event]):
+        try:
+            for dep in stage.depends_on:
+                await done[dep].wait()
+            failed_deps = [dep for dep in stage.depends_on if not result.succeeded(dep)]
+            if stage.skip or failed_deps:
+                reason = "skip" if stage.skip else f"dependencias sin resultado: {failed_deps}"
+                result.results[stage.name] = stage.default
+                result.stages[stage.name] = {"status": "skipped", "reason": reason}
+                return
+            await self._execute(stage, result)
+        finally:
+            done[stage.name].set()
+
+    async def _execute(self, stage: Stage, result: PipelineResult):
+        inputs = {dep: result.results[dep] for dep in stage.depends_on}
+        timing = {}
+
+        def call():
+            # Tiempo de CPU del hilo que ejecuta la etapa (no incluye hilos internos de torch)
+            cpu_start = time.thread_time()
+            try:
+                return stage.func(inputs)
+            finally:
+                timing["cpu_seconds"] = time.thread_time() - cpu_start
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        future = loop.run_in_executor(stage.executor or self.executor, call)
+        try:
+            value = await asyncio.wait_for(asyncio.shield(future), stage.timeout)
+        except asyncio.CancelledError:
+            # Cancelado el pipeline (timeout del documento): el hilo no se puede
+            # interrumpir, así que la cancelación no termina hasta que acaba
+            await asyncio.wait({future})
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = TimeoutError(f"excedió {stage.timeout}s")
+            result.stages[stage.name] = {
+                "status": "failed",
+                "error": f"{type(e).__name__}: {e}",
+                "wall_seconds": time.perf_counter() - start,
+                "cpu_seconds": timing.get("cpu_seconds")
+            }
+            if not stage.optional:
+                raise StageFailedError(stage.name, e) from e
+            self.logger.warning(f"Etapa opcional '{stage.name}' falló: {e}")
+            result.results[stage.name] = stage.default
+            return
+
+        result.results[stage.name] = value
+        result.stages[stage.name] = {
+            "status": "ok",
+            "wall_seconds": time.perf_counter() - start,
+            "cpu_seconds": timing.get("cpu_seconds")
+        }
@@ -1,36 +1,74 @@
 # app/use_cases/process_document.py
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from app.core.config import get_settings
 from ..domain.entities.document import Document
 from ..domain.entities.analysis import Analysis
 from ..preprocessing.cleaner import TextCleaner
 from ..semantic.embedding import EmbeddingGenerator
 from ..semantic.entity_extractor import EntityExtractor
 from ..semantic.summarizing import TextSummarizer
+from .pipeline import PipelineExecutor, Stage
 
 class ProcessDocumentUseCase:
     def __init__(
-        self, 
-        cleaner: TextCleaner,
-        embedding_generator: EmbeddingGenerator,
-        entity_extractor: EntityExtractor,
-        summarizer: TextSummarizer
+        self,
+        cleaner: TextCleaner = None,
+        embedding_generator: EmbeddingGenerator = None,
+        entity_extractor: EntityExtractor = None,
+        summarizer: TextSummarizer = None
     ):
-        self.cleaner = cleaner
-        self.embedding_generator = embedding_generator
-        self.entity_extractor = entity_extractor
-        self.summarizer = summarizer
+        settings = get_settings()
+        # Los componentes semánticos obtienen sus modelos del registro compartido
+        self.cleaner = cleaner or TextCleaner()
+        self.embedding_generator = embedding_generator or EmbeddingGenerator()
+        self.entity_extractor = entity_extractor or EntityExtractor()
+        self.summarizer = summarizer or TextSummarizer()
+        self.stage_timeouts = settings.PIPELINE_STAGE_TIMEOUTS
+        self.skip_stages = set(settings.PIPELINE_SKIP_STAGES)
+        self.optional_stages = set(settings.PIPELINE_OPTIONAL_STAGES)
+        # La inferencia es bloqueante: las etapas corren en hilos para no frenar
+        # a los demás handlers del consumidor (torch y spaCy liberan el GIL)
+        self.pipeline = PipelineExecutor(ThreadPoolExecutor(
+            max_workers=settings.PIPELINE_STAGE_WORKERS, thread_name_prefix="pipeline-stage"
+        ))
 
-    async def execute(self, document: Document) -> Analysis:
-        cleaned_text = self.cleaner.clean(document.content)
-        embeddings = self.embedding_generator.generate(cleaned_text)
-        entities = self.entity_extractor.extract_entities(cleaned_text)
-        summary = self.summarizer.summarize(cleaned_text)
+    def _stage(self, name: str, func, depends_on=(), default=None) -> Stage:
+        return Stage(
+            name=name,
+            func=func,
+            depends_on=depends_on,
+            timeout=self.stage_timeouts.get(name),
+            optional=name in self.optional_stages,
+            skip=name in self.skip_stages,
+            default=default
+        )
+
+    def build_stages(self, text: str) -> List[Stage]:
+        # Embeddings, entidades y resumen solo dependen del texto limpio
+        return [
+            self._stage("clean", lambda _: self.cleaner.clean(text)),
+            self._stage("embeddings", lambda r: self.embedding_generator.generate(r["clean"]), ("clean",)),
+            self._stage("entities", lambda r: self.entity_extractor.extract_entities(r["clean"]), ("clean",), []),
+            self._stage("summary", lambda r: self.summarizer.summarize(r["clean"]), ("clean",)),
+        ]
+
+    def time_budget(self) -> float:
+        """Duración máxima del pipeline según ``PIPELINE_STAGE_TIMEOUTS``"""
+        return self.pipeline.time_budget(self.build_stages(""))
+
+    async def execute(self, document_id: str, text: str) -> Analysis:
+        result = await self.pipeline.run(self.build_stages(text))
 
+        # Con etapas opcionales fallidas se devuelve igualmente el análisis parcial
         analysis = Analysis(
-            document_id=document.id,
-            syntax_nodes=entities,
-            embeddings=embeddings,
+            document_id=document_id,
+            syntax_nodes=result.results["entities"],
+            embeddings=result.results["embeddings"],
             metadata={
-                "summary": summary
+                "summary": result.results["summary"],
+                "stages": result.stages,
+                "partial": any(stage["status"] != "ok" for stage in result.stages.values())
             }
         )
 
@@ -1,34 +1,340 @@
 # app/workers.py
-import asyncio
+import json
+import logging
+import math
 import multiprocessing
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
 from app.infraestructure.messaging.consumers.upload_consumer import UploadConsumer
 from app.infraestructure.messaging.consumers.processing_consumer import ProcessingConsumer
 from app.core.config import get_settings
+from app.semantic.model_registry import get_model_registry
 
 settings = get_settings()
+logger = logging.getLogger("WorkerSupervisor")
 
-def run_consumer(consumer_class):
+# fork: los hijos heredan copy-on-write los modelos precargados por el supervisor
+mp_context = multiprocessing.get_context("fork")
+
+
+def run_consumer(consumer_class, held_messages=None):
+    # El consumidor instala sus propios handlers de señal para drenar al salir
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # No-op si el supervisor ya precargó los modelos antes del fork
+    get_model_registry().preload(settings.WORKER_PRELOAD_MODELS)
     consumer = consumer_class()
+    consumer.held_messages = held_messages
+    # Un worker retirado por el autoescalado termina sus mensajes en curso
+    consumer.drain_timeout = max(consumer.drain_timeout, consumer.max_message_time())
     consumer.start()
 
-def main():
-    processes = []
-    consumers = [UploadConsumer, ProcessingConsumer]
-    
-    for consumer_class in consumers:
-        process = multiprocessing.Process(
+
+def read_memory(pid: int) -> Dict[str, int]:
+    """RSS y PSS del proceso en bytes (PSS reparte las páginas compartidas)"""
+    memory = {}
+    for path, keys in ((f"/proc/{pid}/status", ("VmRSS",)), (f"/proc/{pid}/smaps_rollup", ("Pss", "Shared_Clean", "Shared_Dirty"))):
+        try:
+            with open(path) as f:
+                for line in f:
+                    name, _, value = line.partition(":")
+                    if name in keys:
+                        memory[name] = int(value.split()[0]) * 1024
+        except OSError:
+            pass
+    return {
+        "rss_bytes": memory.get("VmRSS"),
+        "pss_bytes": memory.get("Pss"),
+        "shared_bytes": memory.get("Shared_Clean", 0) + memory.get("Shared_Dirty", 0) if "Pss" in memory else None
+    }
+
+
+@dataclass
+class WorkerSlot:
+    """Un puesto de worker: se conserva entre reinicios del proceso"""
+    pool: str
+    index: int
+    process: Optional[multiprocessing.Process] = None
+    started_at: Optional[float] = None
+    restarts: int = 0
+    consecutive_failures: int = 0
+    next_start: float = 0.0
+    last_exitcode: Optional[int] = None
+    retiring: bool = False
+    # Mensajes sin ack en poder del proceso (los escribe BaseConsumer)
+    held_messages: Optional[Any] = None
+
+    def held(self) -> int:
+        return self.held_messages.value if self.held_messages is not None else 0
+
+    def to_dict(self) -> Dict:
+        alive = self.process is not None and self.process.is_alive()
+        status = {
+            "pool": self.pool,
+            "index": self.index,
+            "pid": self.process.pid if self.process else None,
+            "alive": alive,
+            "retiring": self.retiring,
+            "uptime_seconds": time.time() - self.started_at if alive else 0,
+            "restarts": self.restarts,
+            "last_exitcode": self.last_exitcode,
+            "held_messages": self.held() if alive else 0,
+        }
+        if alive:
+            status.update(read_memory(self.process.pid))
+        return status
+
+
+@dataclass
+class WorkerPool:
+    name: str
+    consumer_class: type
+    queue: str
+    min_workers: int
+    max_workers: int
+    slots: List[WorkerSlot] = field(default_factory=list)
+    queue_depth: Optional[int] = None
+    held_messages: int = 0
+    # Desde cuándo sobran workers (None: no sobran)
+    surplus_since: Optional[float] = None
+
+    def active_slots(self) -> List[WorkerSlot]:
+        return [slot for slot in self.slots if not slot.retiring]
+
+
+class WorkerSupervisor:
+    """Mantiene N procesos por tipo de consumidor, los reinicia con backoff
+    y, si está activado, ajusta N entre mínimo y máximo según la profundidad
+    de la cola."""
+
+    def __init__(self, pools: List[WorkerPool], interval: float, backoff: float,
+                 backoff_max: float, autoscale: bool, messages_per_worker: int,
+                 scale_down_delay: float = 0.0):
+        self.pools = pools
+        self.interval = interval
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.autoscale = autoscale
+        self.messages_per_worker = messages_per_worker
+        self.scale_down_delay = scale_down_delay
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.rabbitmq = None
+
+    def run(self):
+        for pool in self.pools:
+            for _ in range(pool.min_workers):
+                self._add_slot(pool)
+        while not self.stopping.is_set():
+            # Las consultas al broker bloquean: fuera del lock para no frenar /status
+            depths = {pool.name: self._queue_depth(pool.queue) for pool in self.pools} if self.autoscale else None
+            with self.lock:
+                if depths is not None:
+                    self._autoscale(depths)
+                self._reap_and_restart()
+            self.stopping.wait(self.interval)
+        self._shutdown()
+
+    def stop(self):
+        self.stopping.set()
+
+    def _add_slot(self, pool: WorkerPool):
+        used = {slot.index for slot in pool.slots}
+        index = next(i for i in range(len(pool.slots) + 1) if i not in used)
+        slot = WorkerSlot(pool=pool.name, index=index)
+        pool.slots.append(slot)
+        self._spawn(pool, slot)
+
+    def _spawn(self, pool: WorkerPool, slot: WorkerSlot):
+        slot.held_messages = mp_context.Value('i', 0, lock=False)
+        slot.process = mp_context.Process(
             target=run_consumer,
-            args=(consumer_class,)
+            args=(pool.consumer_class, slot.held_messages),
+            name=f"{pool.name}-worker-{slot.index}"
         )
-        processes.append(process)
-        process.start()
+        slot.process.start()
+        slot.started_at = time.time()
+        logger.info(f"Worker {slot.process.name} iniciado (pid {slot.process.pid})")
 
-    try:
-        for process in processes:
-            process.join()
-    except KeyboardInterrupt:
+    def _reap_and_restart(self):
+        now = time.time()
+        for pool in self.pools:
+            for slot in list(pool.slots):
+                if slot.process is not None and slot.process.is_alive():
+                    continue
+                if slot.process is not None:
+                    slot.process.join()
+                    slot.last_exitcode = slot.process.exitcode
+                    uptime = now - slot.started_at
+                    slot.process = None
+                    if slot.retiring:
+                        pool.slots.remove(slot)
+                        continue
+                    # Un worker que aguantó varios backoff máximos se considera estable
+                    if uptime > self.backoff_max:
+                        slot.consecutive_failures = 0
+                    delay = min(self.backoff * 2 ** slot.consecutive_failures, self.backoff_max)
+                    slot.consecutive_failures += 1
+                    slot.next_start = now + delay
+                    logger.warning(
+                        f"Worker {pool.name}-{slot.index} terminó con código {slot.last_exitcode}; "
+                        f"reinicio en {delay:.1f}s"
+                    )
+                elif slot.retiring:
+                    # Retirado mientras esperaba su backoff: no se vuelve a lanzar
+                    pool.slots.remove(slot)
+                    continue
+                if now >= slot.next_start:
+                    slot.restarts += 1
+                    self._spawn(pool, slot)
+
+    def _queue_depth(self, queue: str) -> Optional[int]:
+        try:
+            if self.rabbitmq is None or self.rabbitmq.connection.is_closed:
+                from app.infraestructure.messaging.rabbitmq import RabbitMQClient
+                self.rabbitmq = RabbitMQClient()
+            self.rabbitmq.connection.process_data_events()
+            return self.rabbitmq.channel.queue_declare(queue=queue, passive=True).method.message_count
+        except Exception as e:
+            logger.warning(f"No se pudo leer la profundidad de {queue}: {e}")
+            self.rabbitmq = None
+            return None
+
+    def _autoscale(self, depths: Dict[str, Optional[int]]):
+        now = time.time()
+        for pool in self.pools:
+            pool.queue_depth = depths.get(pool.name)
+            if pool.queue_depth is None:
+                continue
+            active = pool.active_slots()
+            # message_count solo cuenta los mensajes listos: los que ya tienen los
+            # workers por el prefetch también son carga
+            pool.held_messages = sum(slot.held() for slot in active)
+            load = pool.queue_depth + pool.held_messages
+            desired = math.ceil(load / self.messages_per_worker)
+            desired = max(pool.min_workers, min(pool.max_workers, desired))
+            if desired >= len(active):
+                pool.surplus_since = None
+            if desired > len(active):
+                for _ in range(desired - len(active)):
+                    self._add_slot(pool)
+                logger.info(f"{pool.name}: escalado a {desired} workers (carga {load})")
+            elif desired < len(active):
+                # Bajar de uno en uno y solo tras scale_down_delay con carga baja,
+                # para no oscilar; el worker retirado drena sus mensajes antes de salir
+                if pool.surplus_since is None:
+                    pool.surplus_since = now
+                if now - pool.surplus_since < self.scale_down_delay:
+                    continue
+                pool.surplus_since = now
+                slot = max(active, key=lambda s: s.index)
+                slot.retiring = True
+                if slot.process is not None and slot.process.is_alive():
+                    slot.process.terminate()
+                logger.info(f"{pool.name}: retirando worker {slot.index} (carga {load})")
+
+    def _shutdown(self):
+        processes = [
+            slot.process for pool in self.pools for slot in pool.slots
+            if slot.process is not None and slot.process.is_alive()
+        ]
         for process in processes:
             process.terminate()
+        deadline = time.time() + settings.CONSUMER_DRAIN_TIMEOUT + 5
+        for process in processes:
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        if self.rabbitmq is not None:
+            self.rabbitmq.close()
+
+    def get_status(self) -> Dict:
+        with self.lock:
+            return {
+                "supervisor_pid": os.getpid(),
+                "supervisor_memory": read_memory(os.getpid()),
+                "autoscale": self.autoscale,
+                "pools": {
+                    pool.name: {
+                        "queue": pool.queue,
+                        "queue_depth": pool.queue_depth,
+                        "held_messages": pool.held_messages,
+                        "min_workers": pool.min_workers,
+                        "max_workers": pool.max_workers,
+                        "alive_workers": sum(
+                            1 for slot in pool.slots if slot.process is not None and slot.process.is_alive()
+                        ),
+                        "workers": [slot.to_dict() for slot in pool.slots]
+                    }
+                    for pool in self.pools
+                }
+            }
+
+
+def serve_status(supervisor: WorkerSupervisor, port: int) -> ThreadingHTTPServer:
+    """Expone el estado de los workers en GET /status"""
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/", "/status"):
+                self.send_error(404)
+                return
+            body = json.dumps(supervisor.get_status()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), StatusHandler)
+    threading.Thread(target=server.serve_forever, name="worker-status", daemon=True).start()
+    return server
+
+
+def build_pools() -> List[WorkerPool]:
+    """Un pool por cola con ``*_PROCESSES`` procesos; dentro de cada proceso el
+    consumidor atiende ``*_WORKERS`` mensajes a la vez (ver BaseConsumer)"""
+    pools = []
+    for name, consumer_class, queue, workers in (
+        ("upload", UploadConsumer, settings.UPLOAD_QUEUE, settings.UPLOAD_PROCESSES),
+        ("processing", ProcessingConsumer, settings.PROCESSING_QUEUE, settings.PROCESSING_PROCESSES),
+    ):
+        max_workers = max(workers, settings.WORKER_MAX_PROCESSES) if settings.WORKER_AUTOSCALE else workers
+        pools.append(WorkerPool(name, consumer_class, queue, workers, max_workers))
+    return pools
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    # Cargar los modelos una vez antes de hacer fork
+    get_model_registry().preload(settings.WORKER_PRELOAD_MODELS)
+
+    supervisor = WorkerSupervisor(
+        build_pools(),
+        interval=settings.SUPERVISOR_INTERVAL,
+        backoff=settings.WORKER_RESTART_BACKOFF,
+        backoff_max=settings.WORKER_RESTART_BACKOFF_MAX,
+        autoscale=settings.WORKER_AUTOSCALE,
+        messages_per_worker=settings.AUTOSCALE_MESSAGES_PER_WORKER,
+        scale_down_delay=settings.AUTOSCALE_SCALE_DOWN_DELAY
+    )
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: supervisor.stop())
+
+    server = serve_status(supervisor, settings.WORKER_STATUS_PORT) if settings.WORKER_STATUS_PORT else None
+    try:
+        supervisor.run()
+    finally:
+        if server is not None:
+            server.shutdown()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark de escritura de párrafos y entidades (filas/s).
+
+Compara la inserción fila a fila (un ``cursor.execute`` por párrafo y por
+entidad) con la ruta COPY de ``PostgresDatabase.save_document_analysis``.
+Usa la base de datos configurada (DB_*) y borra las filas que crea.
+
+Uso:
+    python -m benchmarks.bench_bulk_writes --paragraphs 5000 --entities-per-paragraph 4
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+from app.domain.entities.document import Document
+from app.infraestructure.database.postgres import PostgresDatabase
+
+
+def build_analysis(paragraphs: int, entities_per_paragraph: int) -> dict:
+    return {
+        'total_paragraphs': paragraphs,
+        'paragraphs': [
+            {
+                'text': f"Párrafo {i} del contrato de prestación de servicios entre las partes.",
+                'position': {'x0': 72.0, 'y0': 700.0 - i % 50, 'x1': 520.0, 'y1': 712.0},
+                'style_info': {'fontname': 'Times-Roman', 'size': 10.0},
+                'linguistic_features': {'language': 'es', 'page_num': i // 50},
+                'entities': [
+                    {
+                        'entity_text': 'Medellín', 'entity_label': 'LOC',
+                        'start_char': 10 * j, 'end_char': 10 * j + 8, 'context': None
+                    }
+                    for j in range(entities_per_paragraph)
+                ]
+            }
+            for i in range(paragraphs)
+        ]
+    }
+
+
+def row_by_row(db: PostgresDatabase, document_id: str, analysis: dict):
+    """Ruta anterior: un round trip por fila"""
+    for paragraph in analysis['paragraphs']:
+        paragraph_id = str(uuid.uuid4())
+        db.cursor.execute(
+            "INSERT INTO paragraphs (paragraph_id, document_id, text, position, style_info, linguistic_features) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            (paragraph_id, document_id, paragraph['text'], json.dumps(paragraph['position']),
+             json.dumps(paragraph['style_info']), json.dumps(paragraph['linguistic_features']))
+        )
+        for entity in paragraph['entities']:
+            db.cursor.execute(
+                "INSERT INTO entities (document_id, paragraph_id, entity_text, entity_label, start_char, end_char, context) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                (document_id, paragraph_id, entity['entity_text'], entity['entity_label'],
+                 entity['start_char'], entity['end_char'], entity['context'])
+            )
+    db.connection.commit()
+
+
+def new_document(db: PostgresDatabase) -> str:
+    document_id = str(uuid.uuid4())
+    db.save_document(Document(
+        id=document_id, filename="bench.pdf", created_at=datetime.now(timezone.utc),
+        sections=[], metadata={}
+    ))
+    return document_id
+
+
+def cleanup(db: PostgresDatabase, document_ids: list):
+    for table, column in (('entities', 'document_id'), ('paragraphs', 'document_id'),
+                          ('document_analysis', 'document_id'), ('documents', 'id')):
+        db.cursor.execute(f"DELETE FROM {table} WHERE {column} = ANY(%s::uuid[])", (document_ids,))
+    db.connection.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paragraphs", type=int, default=5000)
+    parser.add_argument("--entities-per-paragraph", type=int, default=4)
+    args = parser.parse_args()
+
+    analysis = build_analysis(args.paragraphs, args.entities_per_paragraph)
+    rows = args.paragraphs * (1 + args.entities_per_paragraph)
+    db = PostgresDatabase()
+    document_ids = []
+    try:
+        document_ids.append(new_document(db))
+        start = time.perf_counter()
+        row_by_row(db, document_ids[-1], analysis)
+        legacy = time.perf_counter() - start
+
+        document_ids.append(new_document(db))
+        start = time.perf_counter()
+        db.save_document_analysis(document_ids[-1], analysis)
+        bulk = time.perf_counter() - start
+
+        print(f"Filas por documento: {rows:,}")
+        print(f"Fila a fila : {rows / legacy:,.0f} filas/s ({legacy:.2f}s)")
+        print(f"COPY        : {rows / bulk:,.0f} filas/s ({bulk:.2f}s)")
+        print(f"Aceleración : {legacy / bulk:.1f}x")
+    finally:
+        cleanup(db, document_ids)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
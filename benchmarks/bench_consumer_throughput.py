@@ -0,0 +1,75 @@
+"""Benchmark de throughput del consumidor (mensajes/s) según prefetch y concurrencia.
+
+Usa ``LocalBroker`` como sustituto de RabbitMQ. Cada handler simula un
+mensaje con ``--io-ms`` de espera (descarga, BD) y ``--cpu-ms`` de CPU;
+``--round-trip-ms`` modela la latencia de red entre el ack y la siguiente
+entrega, que es lo que un prefetch mayor amortiza.
+
+Uso:
+    python -m benchmarks.bench_consumer_throughput --messages 400 --prefetch 1 4 16 --concurrency 1 4 16
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from app.infraestructure.messaging.consumers.base_consumer import BaseConsumer
+from app.infraestructure.messaging.local_broker import LocalBroker
+
+QUEUE = "bench_queue"
+
+
+class BenchConsumer(BaseConsumer):
+    def __init__(self, broker: LocalBroker, messages: int, io_ms: float, cpu_ms: float, **kwargs):
+        super().__init__(QUEUE, rabbitmq=broker.client(), **kwargs)
+        self.expected = messages
+        self.io_seconds = io_ms / 1000
+        self.cpu_seconds = cpu_ms / 1000
+        self.done = 0
+        self.lock = threading.Lock()
+
+    async def process_message(self, message: dict):
+        await asyncio.sleep(self.io_seconds)
+        deadline = time.perf_counter() + self.cpu_seconds
+        while time.perf_counter() < deadline:
+            pass
+        with self.lock:
+            self.done += 1
+            if self.done == self.expected:
+                self.stop()
+
+
+def run(args, prefetch: int, concurrency: int) -> float:
+    broker = LocalBroker(round_trip=args.round_trip_ms / 1000)
+    for i in range(args.messages):
+        broker.publish(QUEUE, {"document_id": str(i)})
+    consumer = BenchConsumer(
+        broker, args.messages, args.io_ms, args.cpu_ms,
+        concurrency=concurrency, prefetch=prefetch
+    )
+    start = time.perf_counter()
+    consumer.start()
+    elapsed = time.perf_counter() - start
+    assert broker.acked == args.messages, (broker.acked, args.messages)
+    return args.messages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--prefetch", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--io-ms", type=float, default=10.0)
+    parser.add_argument("--cpu-ms", type=float, default=0.5)
+    parser.add_argument("--round-trip-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{'prefetch':>8} | {'concurrencia':>12} | {'mensajes/s':>10}")
+    for prefetch in args.prefetch:
+        for concurrency in args.concurrency:
+            throughput = run(args, prefetch, concurrency)
+            print(f"{prefetch:>8} | {concurrency:>12} | {throughput:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
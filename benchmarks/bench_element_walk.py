@@ -0,0 +1,138 @@
+"""Micro-benchmark del recorrido de elementos de texto.
+
+Compara el recorrido anterior (cuatro pasadas sobre LTChar más llamadas
+repetidas a get_text) con el recolector de características de una sola
+pasada, sobre un PDF denso a varias columnas.
+
+Uso:
+    python -m benchmarks.bench_element_walk [--pdf ruta.pdf] [--pages 30] [--columns 3]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTChar, LTText, LTTextContainer
+
+from app.preprocessing.element_features import collect_features
+
+WORDS = (
+    "el la de contrato cláusula partes acuerdo servicio plazo pago entrega "
+    "información obligaciones responsabilidad vigencia anexo"
+).split()
+
+
+def build_dense_pdf(path: str, pages: int, columns: int):
+    """Genera un PDF denso a varias columnas con PyMuPDF"""
+    import fitz
+
+    rng = random.Random(0)
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_text((50, 50), f"Informe {page_num}", fontsize=18, fontname="hebo")
+        width = (page.rect.width - 80) / columns
+        for column in range(columns):
+            y = 80
+            while y < page.rect.height - 40:
+                line = " ".join(rng.choice(WORDS) for _ in range(6))
+                page.insert_text((40 + column * width, y), line, fontsize=7, fontname="tiro")
+                y += 9
+    doc.save(path)
+
+
+def legacy_walk(element) -> dict:
+    """Recorrido previo: layout, texto, estilo, jerarquía y tipo en pasadas separadas"""
+    layout_text = element.get_text().strip()
+    text = element.get_text().strip()
+    text_parts = []
+    for text_line in element:
+        line_text = text_line.get_text().strip()
+        for char in text_line:
+            if isinstance(char, LTChar):
+                text_parts.append(line_text)
+                break
+    text = ' '.join(text_parts) if text_parts else text
+
+    def style_info():
+        style = {}
+        for text_line in element:
+            for char in text_line:
+                if isinstance(char, LTChar):
+                    style['fontname'] = char.fontname
+                    style['size'] = char.size
+                    style['bold'] = 'Bold' in char.fontname
+                    break
+            break
+        return style
+
+    style = style_info()
+    font_sizes = [
+        char.size for text_line in element for char in text_line if isinstance(char, LTChar)
+    ]
+    average = sum(font_sizes) / len(font_sizes) if font_sizes else 0
+    element_type = style_info()
+    return {'layout': layout_text, 'text': text, 'style': style,
+            'average': average, 'type': element_type}
+
+
+def single_pass_walk(element) -> dict:
+    features = collect_features(element)
+    style = {'fontname': features.fontname, 'size': features.size}
+    return {'layout': features.raw_text, 'text': features.text, 'style': style,
+            'average': features.average_size, 'type': style}
+
+
+def run(pages_layout, walker, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages_layout:
+            for element in page:
+                if isinstance(element, LTTextContainer):
+                    walker(element)
+                elif isinstance(element, LTText):
+                    element.get_text()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdf", help="PDF a utilizar (por defecto se genera uno)")
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--columns", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pdf_path = args.pdf
+    tmp_dir = None
+    if not pdf_path:
+        tmp_dir = tempfile.mkdtemp()
+        pdf_path = os.path.join(tmp_dir, "dense.pdf")
+        build_dense_pdf(pdf_path, args.pages, args.columns)
+
+    laparams = LAParams(line_margin=0.5, word_margin=0.1, char_margin=2.0,
+                        boxes_flow=0.5, detect_vertical=True, all_texts=True)
+    pages_layout = list(extract_pages(pdf_path, laparams=laparams))
+    total_chars = sum(
+        1 for page in pages_layout for element in page if isinstance(element, LTTextContainer)
+        for line in element if isinstance(line, LTTextContainer)
+        for char in line if isinstance(char, LTChar)
+    ) * args.repeat
+
+    legacy = run(pages_layout, legacy_walk, args.repeat)
+    single = run(pages_layout, single_pass_walk, args.repeat)
+
+    print(f"PDF: {pdf_path} ({len(pages_layout)} páginas)")
+    print(f"Recorrido anterior : {total_chars / legacy:,.0f} chars/s ({legacy:.3f}s)")
+    print(f"Recorrido único    : {total_chars / single:,.0f} chars/s ({single:.3f}s)")
+    print(f"Aceleración        : {legacy / single:.2f}x")
+
+    if tmp_dir:
+        os.remove(pdf_path)
+        os.rmdir(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark de generación de embeddings por párrafo en CPU (párrafos/s).
+
+Compara tres rutas sobre los mismos párrafos sintéticos de longitud
+variable:
+
+- ``encode`` párrafo a párrafo;
+- lotes ordenados por longitud (``EmbeddingGenerator.encode_paragraphs``)
+  con la caché en frío;
+- la misma llamada con la caché en caliente (sin inferencia).
+
+Necesita sentence-transformers y el modelo descargado.
+
+Uso:
+    python -m benchmarks.bench_embeddings --paragraphs 1000 --batch-size 256
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from app.semantic.embedding import EmbeddingGenerator
+from app.semantic.embedding_cache import EmbeddingCache
+
+WORDS = (
+    "el contrato de prestación de servicios entre las partes establece obligaciones "
+    "plazos pagos garantías y condiciones para la terminación anticipada del acuerdo"
+).split()
+
+
+def build_paragraphs(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        f"{i}. " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 160)))
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paragraphs", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--dtype", default="float16")
+    parser.add_argument("--model", default="sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
+    parser.add_argument("--skip-naive", action="store_true", help="Omitir la ruta párrafo a párrafo (lenta)")
+    args = parser.parse_args()
+
+    paragraphs = build_paragraphs(args.paragraphs)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = EmbeddingCache(cache_dir, args.model, args.dtype)
+        generator = EmbeddingGenerator(args.model, batch_size=args.batch_size, cache=cache)
+        generator.model.encode(["calentamiento"])
+
+        if not args.skip_naive:
+            start = time.perf_counter()
+            for paragraph in paragraphs:
+                generator.model.encode([paragraph], show_progress_bar=False)
+            naive = time.perf_counter() - start
+            print(f"Párrafo a párrafo : {len(paragraphs) / naive:8.1f} párrafos/s")
+
+        start = time.perf_counter()
+        generator.encode_paragraphs(paragraphs)
+        cold = time.perf_counter() - start
+        print(f"Lotes (caché fría) : {len(paragraphs) / cold:8.1f} párrafos/s")
+
+        start = time.perf_counter()
+        generator.encode_paragraphs(paragraphs)
+        warm = time.perf_counter() - start
+        print(f"Caché caliente     : {len(paragraphs) / warm:8.1f} párrafos/s")
+        print(f"Caché: {cache.get_metrics()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark de motores de extracción: páginas/s y paridad de la salida.
+
+Sobre un corpus de PDFs (generados o pasados con ``--pdf``) ejecuta el
+motor ``layout`` (pdfminer) y el ``fast`` (PyMuPDF) y compara:
+
+- páginas/s de cada motor (mejor de ``--repeat`` vueltas),
+- F1 de la bolsa de palabras del texto completo,
+- número de bloques de texto, títulos, subtítulos, líneas y figuras.
+
+Uso:
+    python -m benchmarks.bench_engines [--pdf a.pdf b.pdf ...] [--pages 30] [--repeat 2]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from app.preprocessing.fast_extractor import FastPDFExtractor
+from app.preprocessing.page_content import BLOCK_LINE
+from app.preprocessing.pdf_extractor import PDFExtractor
+from benchmarks.bench_element_walk import WORDS, build_dense_pdf
+from benchmarks.bench_image_pages import build_image_pdf
+
+
+def build_report_pdf(path: str, pages: int):
+    """Informe a una columna con títulos, subtítulos, párrafos y separadores"""
+    import fitz
+
+    rng = random.Random(1)
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_text((50, 60), f"Capítulo {page_num + 1}", fontsize=20, fontname="hebo")
+        y = 100
+        for section in range(3):
+            page.insert_text((50, y), f"Sección {page_num + 1}.{section + 1}", fontsize=13, fontname="hebo")
+            y += 22
+            for _ in range(8):
+                page.insert_text((50, y), " ".join(rng.choice(WORDS) for _ in range(12)), fontsize=10, fontname="tiro")
+                y += 13
+            page.draw_line((50, y), (545, y))
+            y += 30
+    doc.save(path)
+
+
+def summarize(pages) -> dict:
+    words = Counter()
+    summary = Counter()
+    for page in pages:
+        for text in page.texts():
+            words.update(text.split())
+        summary['bloques'] += len(page.text_blocks())
+        summary['lineas'] += int((page.blocks['kind'] == BLOCK_LINE).sum())
+        summary['figuras'] += len(page.figures)
+        for element_type, count in page.type_counts().items():
+            summary[element_type] += count
+    return {'words': words, 'summary': summary}
+
+
+def word_f1(expected: Counter, actual: Counter) -> float:
+    common = sum((expected & actual).values())
+    if not common:
+        return 0.0
+    precision = common / sum(actual.values())
+    recall = common / sum(expected.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def run(extractor, pdf_path: str, repeat: int):
+    best = float("inf")
+    pages = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = list(extractor.iter_pages(pdf_path))
+        best = min(best, time.perf_counter() - start)
+    return pages, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdf", nargs="*", default=[])
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    engines = {
+        'layout': PDFExtractor(extraction_mode='thread', max_workers=1),
+        'fast': FastPDFExtractor()
+    }
+    keys = ['bloques', 'title', 'subtitle', 'paragraph', 'lineas', 'figuras']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = {os.path.basename(path): path for path in args.pdf}
+        if not corpus:
+            generated = {
+                'denso_3col.pdf': lambda path: build_dense_pdf(path, args.pages, 3),
+                'informe.pdf': lambda path: build_report_pdf(path, args.pages),
+                'imagenes.pdf': lambda path: build_image_pdf(path, max(1, args.pages // 3), 6, 200),
+            }
+            for name, build in generated.items():
+                corpus[name] = os.path.join(tmp, name)
+                build(corpus[name])
+
+        print(f"{'documento':<16} {'motor':<7} {'págs/s':>8}  " + " ".join(f"{key:>9}" for key in keys) + "  F1 palabras")
+        for name, pdf_path in corpus.items():
+            results = {}
+            for engine, extractor in engines.items():
+                pages, elapsed = run(extractor, pdf_path, args.repeat)
+                results[engine] = summarize(pages)
+                summary = results[engine]['summary']
+                f1 = word_f1(results['layout']['words'], results[engine]['words'])
+                print(f"{name:<16} {engine:<7} {len(pages) / elapsed:8.1f}  "
+                      + " ".join(f"{summary[key]:>9}" for key in keys) + f"  {f1:.3f}")
+
+    for extractor in engines.values():
+        extractor.close()
+
+
+if __name__ == "__main__":
+    main()
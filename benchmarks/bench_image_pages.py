@@ -0,0 +1,86 @@
+"""Benchmark de memoria de páginas con muchas imágenes.
+
+Genera un PDF con ``--images`` imágenes distintas por página (más una
+repetida en todas) y mide cuánto ocupa en memoria el resultado de cada
+página frente a los bytes de imagen que contiene. Con ``--spill`` copia
+además las imágenes a un ``LocalBlobStore`` temporal y mide el tiempo.
+
+Uso:
+    python -m benchmarks.bench_image_pages [--pages 20] [--images 6] [--size 300] [--spill]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from app.infraestructure.storage.blob_store import LocalBlobStore
+from app.preprocessing.images import spill_images
+from app.preprocessing.pdf_extractor import PDFExtractor
+from benchmarks.bench_page_content import deep_sizeof
+
+
+def build_image_pdf(path: str, pages: int, images: int, size: int):
+    """PDF con imágenes distintas sin comprimir y un logo repetido (mismo xref) en cada página"""
+    import fitz
+
+    rng = random.Random(0)
+    logo = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+    logo.clear_with(90)
+    doc = fitz.open()
+    logo_xref = 0
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_text((50, 40), f"Anexo fotográfico {page_num}", fontsize=14)
+        logo_xref = page.insert_image(fitz.Rect(500, 20, 560, 80), pixmap=logo, xref=logo_xref)
+        for index in range(images):
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, size, size), False)
+            pixmap.set_rect(pixmap.irect, tuple(rng.randrange(256) for _ in range(3)))
+            pixmap.set_pixel(rng.randrange(size), rng.randrange(size), (0, 0, 0))
+            x = 40 + (index % 3) * 180
+            y = 100 + (index // 3) * 180
+            page.insert_image(fitz.Rect(x, y, x + 160, y + 160), pixmap=pixmap)
+    doc.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--images", type=int, default=6)
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--spill", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "images.pdf")
+        build_image_pdf(pdf_path, args.pages, args.images, args.size)
+
+        extractor = PDFExtractor(extraction_mode='thread', max_workers=1)
+        start = time.perf_counter()
+        pages = list(extractor.iter_pages(pdf_path))
+        elapsed = time.perf_counter() - start
+        extractor.close()
+
+        image_objects = {}
+        placements = 0
+        for page in pages:
+            image_objects.update(page.image_objects)
+            placements += len(page.layout_images) + sum(len(f['content']) for f in page.layout_figures)
+        image_bytes = sum(image['length'] for image in image_objects.values())
+        result_bytes = deep_sizeof(pages)
+
+        print(f"{len(pages)} páginas en {elapsed:.2f}s, {placements} apariciones de "
+              f"{len(image_objects)} imágenes ({image_bytes / 1e6:.1f} MB de streams)")
+        print(f"streams por página  : {image_bytes / len(pages) / 1e3:10.1f} KB")
+        print(f"resultado por página: {result_bytes / len(pages) / 1e3:10.1f} KB")
+
+        if args.spill:
+            store = LocalBlobStore(os.path.join(tmp, "blobs"))
+            start = time.perf_counter()
+            written = spill_images(pdf_path, image_objects, store)
+            elapsed = time.perf_counter() - start
+            print(f"spill: {written} blobs en {elapsed:.2f}s ({image_bytes / 1e6 / elapsed:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
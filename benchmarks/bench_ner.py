@@ -0,0 +1,68 @@
+"""Benchmark de extracción de entidades (documentos/s) según ``n_process``.
+
+Cada documento sintético tiene ``--paragraphs`` párrafos con nombres de
+personas, lugares y organizaciones. Se compara la ruta anterior
+(``nlp(texto)`` sobre el documento entero, con todos los componentes)
+con ``EntityExtractor`` (``nlp.pipe`` por párrafos, solo ``ner``) para
+cada valor de ``--n-process``. Necesita spaCy y el modelo instalado.
+
+Uso:
+    python -m benchmarks.bench_ner --docs 20 --paragraphs 200 --n-process 1 2 4
+"""
+import argparse
+import random
+import time
+
+from app.semantic.entity_extractor import EntityExtractor
+
+TEMPLATES = [
+    "La Alcaldía de {city} firmó un convenio con {org} para ampliar la cobertura del servicio.",
+    "{person} presentó el informe ante el Concejo de {city} el pasado martes.",
+    "Según {org}, las obras en {city} terminarán antes de diciembre.",
+    "El contrato fue supervisado por {person}, funcionaria de {org}.",
+]
+CITIES = ["Medellín", "Bogotá", "Cali", "Barranquilla", "Manizales"]
+ORGS = ["Empresas Públicas de Medellín", "el Ministerio de Transporte", "la Gobernación de Antioquia"]
+PEOPLE = ["María Fernanda López", "Carlos Restrepo", "Ana Lucía Gómez"]
+
+
+def build_document(paragraphs: int, rng: random.Random) -> str:
+    return "\n\n".join(
+        " ".join(
+            rng.choice(TEMPLATES).format(city=rng.choice(CITIES), org=rng.choice(ORGS), person=rng.choice(PEOPLE))
+            for _ in range(rng.randint(2, 5))
+        )
+        for _ in range(paragraphs)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--model", default="es_core_news_lg")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    documents = [build_document(args.paragraphs, rng) for _ in range(args.docs)]
+
+    extractor = EntityExtractor(args.model, batch_size=args.batch_size, n_process=1)
+    nlp = extractor.nlp
+    start = time.perf_counter()
+    for document in documents:
+        list(nlp(document).ents)
+    legacy = time.perf_counter() - start
+    print(f"nlp(texto) completo  : {args.docs / legacy:6.2f} docs/s")
+
+    for n_process in args.n_process:
+        extractor.n_process = n_process
+        start = time.perf_counter()
+        total = sum(len(extractor.extract_entities(document)) for document in documents)
+        elapsed = time.perf_counter() - start
+        print(f"nlp.pipe n_process={n_process:<2}: {args.docs / elapsed:6.2f} docs/s ({total} entidades)")
+
+
+if __name__ == "__main__":
+    main()
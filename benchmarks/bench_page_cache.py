@@ -0,0 +1,76 @@
+"""Benchmark de la caché de páginas con documentos reemitidos.
+
+Genera un informe, lo extrae una vez para poblar la caché y después
+extrae una versión reemitida con ``--changed`` páginas modificadas (el PDF
+se reescribe entero, como haría el sistema de origen). Compara el tiempo
+de la extracción sin caché, con caché fría y con la versión reemitida, y
+muestra la tasa de aciertos de páginas.
+
+Uso:
+    python -m benchmarks.bench_page_cache [--pages 40] [--changed 3] [--disk]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from app.infraestructure.cache.result_cache import DiskBackedCache, ExtractionResultCache, LocalCache
+from app.preprocessing.page_cache import PageResultCache
+from app.preprocessing.pdf_extractor import PDFExtractor
+from benchmarks.bench_engines import build_report_pdf
+
+
+def reissue_pdf(source: str, path: str, changed: int):
+    """Copia de ``source`` con una nota añadida en ``changed`` páginas al azar"""
+    import fitz
+
+    rng = random.Random(2)
+    with fitz.open(source) as doc:
+        for page_num in rng.sample(range(doc.page_count), min(changed, doc.page_count)):
+            doc[page_num].insert_text((50, 800), "Revisión 2: corregida", fontsize=9)
+        doc.save(path, garbage=3)
+
+
+def extract(extractor: PDFExtractor, pdf_path: str):
+    statistics = extractor.empty_statistics()
+    start = time.perf_counter()
+    for page in extractor.iter_pages(pdf_path):
+        extractor.update_statistics(statistics, page)
+    return time.perf_counter() - start, statistics['page_cache']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--changed", type=int, default=3)
+    parser.add_argument("--disk", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original = os.path.join(tmp, "informe_v1.pdf")
+        reissued = os.path.join(tmp, "informe_v2.pdf")
+        build_report_pdf(original, args.pages)
+        reissue_pdf(original, reissued, args.changed)
+
+        backend = DiskBackedCache(os.path.join(tmp, "pages")) if args.disk else LocalCache(max_entries=4096)
+        page_cache = PageResultCache(ExtractionResultCache(backend))
+        plain = PDFExtractor(extraction_mode='thread', max_workers=1)
+        cached = PDFExtractor(extraction_mode='thread', max_workers=1, page_cache=page_cache)
+
+        runs = [
+            ("sin caché (v2)", plain, reissued),
+            ("caché fría (v1)", cached, original),
+            ("reemitido (v2)", cached, reissued),
+        ]
+        print(f"{'extracción':<18} {'segundos':>9} {'aciertos':>9} {'fallos':>7} {'tasa':>6}")
+        for label, extractor, pdf_path in runs:
+            elapsed, stats = extract(extractor, pdf_path)
+            print(f"{label:<18} {elapsed:9.2f} {stats['hits']:>9} {stats['misses']:>7} {stats['hit_ratio']:>6.2f}")
+
+        plain.close()
+        cached.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark de memoria del resultado de extracción (bytes por bloque de texto).
+
+Extrae un PDF denso y compara el tamaño en memoria de las páginas en el
+formato de diccionarios anterior (``PageContent.to_dict()``) con el de
+``PageContent`` (arrays estructurados, texto en un único buffer). Mide
+también el tamaño serializado con pickle, que es lo que viaja desde los
+procesos worker.
+
+Uso:
+    python -m benchmarks.bench_page_content [--pdf ruta.pdf] [--pages 100] [--columns 3]
+"""
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+
+import numpy as np
+
+from app.preprocessing.pdf_extractor import PDFExtractor
+from benchmarks.bench_element_walk import build_dense_pdf
+
+
+def deep_sizeof(obj, seen=None) -> int:
+    """Tamaño en memoria de ``obj`` y de todo lo que referencia (cada objeto se cuenta una vez)"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) if obj.base is None else sys.getsizeof(obj) + obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_sizeof(getattr(obj, name), seen) for name in obj.__slots__ if hasattr(obj, name))
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdf", help="PDF a medir; por defecto se genera uno denso")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--columns", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(tmp, "dense.pdf")
+            build_dense_pdf(pdf_path, args.pages, args.columns)
+
+        extractor = PDFExtractor(extraction_mode='thread', max_workers=1)
+        pages = list(extractor.iter_pages(pdf_path))
+        extractor.close()
+
+    dicts = [page.to_dict() for page in pages]
+    blocks = sum(len(page.text_blocks()) for page in pages)
+    text_bytes = sum(sys.getsizeof(text) for page in pages for text in page.texts())
+
+    rows = [
+        ("diccionarios", deep_sizeof(dicts), len(pickle.dumps(dicts, protocol=pickle.HIGHEST_PROTOCOL))),
+        ("PageContent", deep_sizeof(pages), len(pickle.dumps(pages, protocol=pickle.HIGHEST_PROTOCOL))),
+    ]
+    print(f"{len(pages)} páginas, {blocks} bloques de texto ({text_bytes / blocks:.0f} B/bloque solo en str)")
+    for name, memory, pickled in rows:
+        print(f"{name:<13}: {memory / blocks:8.0f} B/bloque en memoria, {pickled / blocks:8.0f} B/bloque en pickle")
+    print(f"reducción en memoria: {rows[0][1] / rows[1][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
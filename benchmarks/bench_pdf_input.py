@@ -0,0 +1,99 @@
+"""Benchmark de E/S y análisis sintáctico del PDF por documento.
+
+Compara el coste de abrir y analizar el PDF (xref, catálogo y árbol de
+páginas, sin el análisis de layout) de dos formas:
+
+- por separado: metadatos, recuento de páginas y ``extract_pages`` abren y
+  analizan el fichero cada uno, y cada rango de páginas de un worker
+  vuelve a hacerlo;
+- compartido: un único ``ParsedPDF`` mapeado en memoria para metadatos y
+  páginas, y un análisis por worker reutilizado en todos sus rangos.
+
+Muestra también la extracción completa en modo hilo para situar el ahorro.
+
+Uso:
+    python -m benchmarks.bench_pdf_input [--pdf a.pdf ...] [--pages 200] [--pages-per-task 8] [--workers 4] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+
+from app.preprocessing.pdf_extractor import PDFExtractor
+from app.preprocessing.pdf_source import ParsedPDF
+from benchmarks.bench_element_walk import build_dense_pdf
+from benchmarks.bench_engines import build_report_pdf
+
+
+def parse_from_file(pdf_path: str):
+    """Apertura y análisis como lo hacían metadatos, recuento y ``extract_pages``"""
+    with open(pdf_path, 'rb') as f:
+        document = PDFDocument(PDFParser(f))
+        for _ in PDFPage.create_pages(document):
+            pass
+
+
+def separate_parses(pdf_path: str, ranges: int):
+    # Metadatos, recuento de páginas, y extract_pages por cada rango
+    for _ in range(2 + ranges):
+        parse_from_file(pdf_path)
+
+
+def shared_parses(pdf_path: str, workers: int):
+    # Documento compartido en el proceso principal y uno por worker
+    for _ in range(1 + workers):
+        with ParsedPDF(pdf_path) as parsed:
+            parsed.document.info
+            parsed.pages
+
+
+def best_of(repeat: int, func, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdf", nargs="*", default=[])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--pages-per-task", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = {os.path.basename(path): path for path in args.pdf}
+        if not corpus:
+            corpus['informe.pdf'] = os.path.join(tmp, 'informe.pdf')
+            build_report_pdf(corpus['informe.pdf'], args.pages)
+            corpus['denso_3col.pdf'] = os.path.join(tmp, 'denso_3col.pdf')
+            build_dense_pdf(corpus['denso_3col.pdf'], args.pages, 3)
+
+        extractor = PDFExtractor(extraction_mode='thread', max_workers=1)
+        print(f"{'documento':<16} {'págs':>5} {'MB':>6} {'separado ms':>12} {'compartido ms':>14} "
+              f"{'ahorro ms':>10} {'extracción s':>13}")
+        for name, pdf_path in corpus.items():
+            with ParsedPDF(pdf_path) as parsed:
+                pages = parsed.page_count()
+            workers = min(args.workers, -(-pages // args.pages_per_task))
+            ranges = -(-pages // args.pages_per_task)
+            separate = best_of(args.repeat, separate_parses, pdf_path, ranges)
+            shared = best_of(args.repeat, shared_parses, pdf_path, workers)
+            start = time.perf_counter()
+            extractor.extract_document(pdf_path)
+            extraction = time.perf_counter() - start
+            print(f"{name:<16} {pages:>5} {os.path.getsize(pdf_path) / 1e6:6.1f} {separate * 1e3:12.1f} "
+                  f"{shared * 1e3:14.1f} {(separate - shared) * 1e3:10.1f} {extraction:13.2f}")
+        extractor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark del resumen map-reduce: latencia por cada 100 páginas.
+
+Resume un documento sintético de ``--pages`` páginas con el
+``TextSummarizer`` fragmentado y lo compara con el pase único anterior
+(que el pipeline trunca a ~1024 tokens, por lo que solo cubre el
+principio). Una segunda pasada mide el efecto de la caché por fragmento.
+Necesita transformers y el modelo descargado.
+
+Uso:
+    python -m benchmarks.bench_summarization --pages 100 --threads 4 --batch-size 4
+"""
+import argparse
+import random
+import time
+
+from app.infraestructure.cache.result_cache import ExtractionResultCache, LocalCache
+from app.semantic.embedding import split_paragraphs
+from app.semantic.summarizing import TextSummarizer
+
+SENTENCES = [
+    "El informe describe la ejecución presupuestal del proyecto durante el trimestre.",
+    "Se identificaron retrasos en la entrega de materiales por parte del proveedor.",
+    "La interventoría recomendó ajustar el cronograma y reforzar los controles de calidad.",
+    "Los indicadores de avance físico superan lo previsto en los frentes de obra norte.",
+    "El comité aprobó una adición al contrato para cubrir las obras complementarias.",
+]
+
+
+def build_document(pages: int, paragraphs_per_page: int = 4, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    paragraphs = [
+        " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 7)))
+        for _ in range(pages * paragraphs_per_page)
+    ]
+    return "\n\n".join(paragraphs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--model", default="facebook/bart-large-cnn")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--chunk-tokens", type=int, default=900)
+    args = parser.parse_args()
+
+    text = build_document(args.pages)
+    summarizer = TextSummarizer(
+        args.model, chunk_tokens=args.chunk_tokens, batch_size=args.batch_size,
+        threads=args.threads, cache=ExtractionResultCache(LocalCache(max_entries=100000))
+    )
+    summarizer.summarizer("Calentamiento del modelo antes de medir.", max_length=20, min_length=5)
+    scale = 100 / args.pages
+
+    start = time.perf_counter()
+    summarizer.summarizer(text, max_length=130, min_length=30, truncation=True)
+    single = time.perf_counter() - start
+    print(f"Pase único (truncado): {single * scale:7.1f}s / 100 páginas")
+
+    start = time.perf_counter()
+    summarizer.summarize(text)
+    cold = time.perf_counter() - start
+    print(f"Map-reduce           : {cold * scale:7.1f}s / 100 páginas "
+          f"({len(summarizer.chunk(split_paragraphs(text)))} fragmentos)")
+
+    start = time.perf_counter()
+    summarizer.summarize(text)
+    warm = time.perf_counter() - start
+    print(f"Map-reduce (caché)   : {warm * scale:7.1f}s / 100 páginas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark de limpieza y normalización de texto (MB/s).
+
+Compara la ruta anterior (``re.sub`` y comprensión carácter a carácter con
+``unicodedata.combining``, un bloque de texto a la vez) con
+``clean_many``/``normalize_many`` sobre páginas sintéticas de bloques
+cortos, y verifica que la salida sea idéntica.
+
+Uso:
+    python -m benchmarks.bench_text_cleaning [--pages 200] [--blocks 40] [--repeat 3]
+"""
+import argparse
+import random
+import re
+import time
+import unicodedata
+
+from app.preprocessing.cleaner import TextCleaner
+from app.preprocessing.normalizer import TextNormalizer
+
+WORDS = (
+    "el la de contrato cláusula partes acuerdo servicio plazo pago entrega "
+    "información obligaciones responsabilidad vigencia anexo Medellín Nº "
+    "«ÁREA» cigüeña $1.250.000 (i) – § 3.2 año ÑANDÚ"
+).split()
+
+
+def legacy_clean(text: str) -> str:
+    return re.sub(r'[^A-Za-zÁÉÍÓÚáéíóúñÑ0-9\s.,;:!?¿¡]', '', text)
+
+
+def legacy_normalize(text: str) -> str:
+    normalized_text = text.strip()
+    normalized_text = normalized_text.lower()
+    normalized_text = unicodedata.normalize('NFKD', normalized_text)
+    normalized_text = ''.join([c for c in normalized_text if not unicodedata.combining(c)])
+    normalized_text = re.sub(r'\s+', ' ', normalized_text)
+    return normalized_text
+
+
+def build_pages(pages: int, blocks: int, rng: random.Random) -> list:
+    return [
+        [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 40))) for _ in range(blocks)]
+        for _ in range(pages)
+    ]
+
+
+def legacy_page(texts):
+    cleaned = [text for text in (legacy_clean(text) for text in texts) if text]
+    return cleaned, [legacy_normalize(text) for text in cleaned]
+
+
+def batch_page(texts, cleaner, normalizer):
+    cleaned = [text for text in cleaner.clean_many(texts) if text]
+    return cleaned, normalizer.normalize_many(cleaned)
+
+
+def measure(pages, func, repeat: int):
+    best, output = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = [func(texts) for texts in pages]
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = build_pages(args.pages, args.blocks, random.Random(0))
+    megabytes = sum(len(text.encode("utf-8")) for texts in pages for text in texts) / 1e6
+    cleaner, normalizer = TextCleaner(), TextNormalizer()
+
+    legacy, expected = measure(pages, legacy_page, args.repeat)
+    batch, output = measure(pages, lambda texts: batch_page(texts, cleaner, normalizer), args.repeat)
+    assert output == expected, "la salida por lotes difiere de la anterior"
+
+    print(f"texto: {megabytes:.2f} MB en {args.pages} páginas x {args.blocks} bloques")
+    print(f"por bloque (anterior): {megabytes / legacy:7.2f} MB/s")
+    print(f"por lotes            : {megabytes / batch:7.2f} MB/s ({legacy / batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
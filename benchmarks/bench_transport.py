@@ -0,0 +1,122 @@
+"""Benchmark del transporte de documentos por RabbitMQ.
+
+Antes: el PDF viaja en base64 dentro de un JSON, dos veces (cola de subida
+y batch de procesamiento). Después (claim-check): el PDF va al almacén de
+blobs y a las colas solo una referencia serializada con msgpack.
+
+Para cada tamaño se reportan los bytes retenidos por el broker (los
+cuerpos publicados) y la latencia de publicación por MB. Con ``--amqp``
+se publica contra un RabbitMQ real con confirmaciones de entrega; sin él
+se mide la preparación de los mensajes y el envío al almacén local.
+
+Uso:
+    python -m benchmarks.bench_transport --sizes 1 5 20 [--amqp]
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+from app.infraestructure.messaging.codec import encode_message
+from app.infraestructure.storage.blob_store import LocalBlobStore
+
+MB = 1024 * 1024
+
+
+def legacy_messages(document_id: str, content: bytes) -> list:
+    document = {
+        "document_id": document_id,
+        "filename": "bench.pdf",
+        "content": base64.b64encode(content).decode('utf-8'),
+        "content_type": "application/pdf"
+    }
+    return [json.dumps(document).encode(), json.dumps({"batch": [document]}).encode()]
+
+
+def claim_check_messages(document_id: str, content: bytes, blob_store: LocalBlobStore) -> list:
+    blob_key = f"documents/{document_id}.pdf"
+    size = blob_store.put_stream(blob_key, io.BytesIO(content))
+    reference = {
+        "document_id": document_id,
+        "filename": "bench.pdf",
+        "blob_key": blob_key,
+        "size": size,
+        "content_type": "application/pdf"
+    }
+    return [encode_message(reference)[0], encode_message({"batch": [reference]})[0]]
+
+
+class AmqpPublisher:
+    def __init__(self):
+        import pika
+        from app.core.config import get_settings
+
+        settings = get_settings()
+        self.connection = pika.BlockingConnection(pika.ConnectionParameters(
+            host=settings.RABBITMQ_HOST,
+            port=settings.RABBITMQ_PORT,
+            credentials=pika.PlainCredentials(settings.RABBITMQ_USER, settings.RABBITMQ_PASS)
+        ))
+        self.channel = self.connection.channel()
+        self.channel.confirm_delivery()
+        self.queue = self.channel.queue_declare(queue='', exclusive=True).method.queue
+
+    def publish(self, bodies: list):
+        for body in bodies:
+            self.channel.basic_publish(exchange='', routing_key=self.queue, body=body)
+
+    def close(self):
+        self.connection.close()
+
+
+def measure(build, publisher, repeat: int):
+    best = None
+    bodies = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        bodies = build()
+        if publisher:
+            publisher.publish(bodies)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, sum(len(body) for body in bodies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--amqp", action="store_true", help="Publicar contra el RabbitMQ configurado")
+    args = parser.parse_args()
+
+    blob_dir = tempfile.mkdtemp()
+    blob_store = LocalBlobStore(blob_dir)
+    publisher = AmqpPublisher() if args.amqp else None
+    try:
+        print(f"{'MB':>4} | {'broker antes':>13} | {'broker después':>14} | {'ms/MB antes':>11} | {'ms/MB después':>13}")
+        for size_mb in args.sizes:
+            content = os.urandom(size_mb * MB)
+            document_id = str(uuid.uuid4())
+            legacy_time, legacy_bytes = measure(
+                lambda: legacy_messages(document_id, content), publisher, args.repeat
+            )
+            claim_time, claim_bytes = measure(
+                lambda: claim_check_messages(document_id, content, blob_store), publisher, args.repeat
+            )
+            print(
+                f"{size_mb:>4} | {legacy_bytes / MB:>10.2f} MB | {claim_bytes:>11,} B  | "
+                f"{legacy_time * 1000 / size_mb:>11.1f} | {claim_time * 1000 / size_mb:>13.1f}"
+            )
+    finally:
+        if publisher:
+            publisher.close()
+        shutil.rmtree(blob_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark del índice vectorial: latencia de consulta y recall@k según tamaño del corpus.
+
+Genera vectores sintéticos agrupados (como documentos de temas parecidos),
+los indexa en modo plano y en IVF y compara ambas búsquedas; el recall se
+mide contra la búsqueda exacta.
+
+Uso:
+    python -m benchmarks.bench_vector_index --sizes 1000 10000 100000 --dim 768 --nprobe 8
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from app.semantic.vector_index import VectorIndex
+
+
+def build_corpus(size: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size)
+    return centers[labels] + 0.6 * rng.standard_normal((size, dim)).astype(np.float32)
+
+
+def timed_search(index: VectorIndex, queries: np.ndarray, k: int, exact: bool):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append({hit["document_id"] for hit in index.search(query, k, exact=exact)})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'corpus':>8} | {'plano p50':>9} | {'IVF p50':>8} | {'recall@' + str(args.k):>9} | {'construcción IVF':>16}")
+    for size in args.sizes:
+        corpus = build_corpus(size, args.dim, clusters=max(8, size // 500))
+        queries = build_corpus(args.queries, args.dim, clusters=max(8, size // 500), seed=1)
+        with tempfile.TemporaryDirectory() as index_dir:
+            index = VectorIndex(index_dir, mode="flat", nprobe=args.nprobe)
+            for start in range(0, size, 10000):
+                index.add_many([f"doc-{i}" for i in range(start, min(size, start + 10000))],
+                               corpus[start:start + 10000])
+            flat_latencies, exact = timed_search(index, queries, args.k, exact=True)
+
+            index.mode = "ivf"
+            start = time.perf_counter()
+            index.build_ivf()
+            build_seconds = time.perf_counter() - start
+            ivf_latencies, approx = timed_search(index, queries, args.k, exact=False)
+
+        recall = statistics.mean(len(a & e) / len(e) for a, e in zip(approx, exact))
+        print(
+            f"{size:>8} | {statistics.median(flat_latencies):>7.2f}ms | {statistics.median(ivf_latencies):>6.2f}ms | "
+            f"{recall:>9.3f} | {build_seconds:>15.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
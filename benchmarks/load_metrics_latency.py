@@ -0,0 +1,80 @@
+"""Prueba de carga: latencia de /api/v1/metrics mientras se suben PDFs grandes.
+
+Mide la latencia de /metrics en reposo y después con ``--uploads``
+subidas concurrentes en curso contra un servidor en ejecución. Si la
+extracción no bloquea el event loop, ambas distribuciones deben ser
+similares. Las subidas rechazadas por control de admisión (503) se
+cuentan aparte.
+
+Uso:
+    uvicorn app.main:app &
+    python -m benchmarks.load_metrics_latency --pdf grande.pdf --uploads 6
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def poll_metrics(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/api/v1/metrics")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def upload(client: httpx.AsyncClient, pdf_path: str, endpoint: str) -> int:
+    with open(pdf_path, "rb") as f:
+        response = await client.post(endpoint, files={"file": ("load.pdf", f, "application/pdf")})
+    return response.status_code
+
+
+def summarize(label: str, latencies: list):
+    if not latencies:
+        print(f"{label}: sin muestras")
+        return
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{label}: n={len(ordered)} p50={statistics.median(ordered):.1f}ms "
+        f"p95={p95:.1f}ms max={ordered[-1]:.1f}ms"
+    )
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        stop = asyncio.Event()
+        idle = asyncio.create_task(poll_metrics(client, stop, args.interval))
+        await asyncio.sleep(args.idle_seconds)
+        stop.set()
+        summarize("/metrics en reposo", await idle)
+
+        stop = asyncio.Event()
+        loaded = asyncio.create_task(poll_metrics(client, stop, args.interval))
+        start = time.perf_counter()
+        statuses = await asyncio.gather(
+            *(upload(client, args.pdf, args.endpoint) for _ in range(args.uploads))
+        )
+        elapsed = time.perf_counter() - start
+        stop.set()
+        summarize("/metrics con subidas", await loaded)
+
+        counts = {status: statuses.count(status) for status in set(statuses)}
+        print(f"Subidas: {counts} en {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--pdf", required=True)
+    parser.add_argument("--uploads", type=int, default=6)
+    parser.add_argument("--endpoint", default="/api/v1/upload")
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,74 @@
+import random
+import re
+import unicodedata
+
+import pytest
+
+from app.preprocessing.cleaner import SENTINEL, TextCleaner
+from app.preprocessing.normalizer import TextNormalizer
+
+
+def reference_clean(text: str) -> str:
+    """Implementación original de TextCleaner.clean"""
+    return re.sub(r'[^A-Za-zÁÉÍÓÚáéíóúñÑ0-9\s.,;:!?¿¡]', '', text)
+
+
+def reference_normalize(text: str) -> str:
+    """Implementación original de TextNormalizer.normalize"""
+    normalized_text = text.strip()
+    normalized_text = normalized_text.lower()
+    normalized_text = unicodedata.normalize('NFKD', normalized_text)
+    normalized_text = ''.join([c for c in normalized_text if not unicodedata.combining(c)])
+    normalized_text = re.sub(r'\s+', ' ', normalized_text)
+    return normalized_text
+
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "Medellín, Antioquia — Contrato Nº 123/2024 (anexo «A»)",
+    "  ÁRBOL   Ñandú\t\tcigüeña\n\nPingüino  ",
+    "ΟΔΟΣ ΣΟΦΟΣ Σ",
+    "İstanbul DİYARBAKIR",
+    "a¨ ´e ﬁnanzas ＡＢＣ １２３",
+    "no break em line",
+    "é ọ̈ 한국어 文字",
+    "emoji 😀 y símbolos ©®™ ½ ²",
+    "\x1c\x1d\x1e\x1f separadores",
+]
+
+
+def random_texts(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    alphabet = (
+        "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 \t\n.,;:!?¿¡"
+        "áéíóúÁÉÍÓÚñÑüÜçÇàèìòùâêîôûãõ¨´ﬁﬂ½²€£©ΣσςİıẞßΩ  ́̈한文😀"
+    )
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 80))) for _ in range(count)]
+
+
+CASES = EDGE_CASES + random_texts(500)
+
+
+def test_clean_matches_reference():
+    cleaner = TextCleaner()
+    assert [cleaner.clean(text) for text in CASES] == [reference_clean(text) for text in CASES]
+
+
+def test_clean_many_matches_reference():
+    assert TextCleaner().clean_many(CASES) == [reference_clean(text) for text in CASES]
+
+
+def test_normalize_matches_reference():
+    normalizer = TextNormalizer()
+    assert [normalizer.normalize(text) for text in CASES] == [reference_normalize(text) for text in CASES]
+
+
+def test_normalize_many_matches_reference():
+    assert TextNormalizer().normalize_many(CASES) == [reference_normalize(text) for text in CASES]
+
+
+@pytest.mark.parametrize("batch", [[], [""], ["", ""], [f"a{SENTINEL}b", "Árbol"]])
+def test_batches_with_empty_items_or_sentinel(batch):
+    assert TextCleaner().clean_many(batch) == [reference_clean(text) for text in batch]
+    assert TextNormalizer().normalize_many(batch) == [reference_normalize(text) for text in batch]
@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+import os
+import tracemalloc
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.presentation.uploads import receive_uploads
+
+BOUNDARY = b"capp-upload-boundary-7d3c1f"
+MB = 1024 * 1024
+# Bloque de relleno sin secuencias CRLF que puedan confundirse con el delimitador
+PATTERN = bytes(range(256)) * (MB // 256)
+
+
+def multipart_request(files, chunks_per_file: int, declared_length: bool = True) -> Request:
+    """Petición multipart cuyo cuerpo se genera bloque a bloque, sin tenerlo entero en memoria"""
+    def parts():
+        for field, filename in files:
+            yield (
+                b"--" + BOUNDARY + b"\r\n"
+                b'Content-Disposition: form-data; name="' + field.encode() + b'"; filename="' + filename.encode() + b'"\r\n'
+                b"Content-Type: application/pdf\r\n\r\n"
+            )
+            for _ in range(chunks_per_file):
+                yield PATTERN
+            yield b"\r\n"
+        yield b"--" + BOUNDARY + b"--\r\n"
+
+    length = sum(len(part) if part is not PATTERN else 0 for part in parts()) + len(files) * chunks_per_file * MB
+    headers = [(b"content-type", b"multipart/form-data; boundary=" + BOUNDARY)]
+    if declared_length:
+        headers.append((b"content-length", str(length).encode()))
+    body = parts()
+
+    async def receive():
+        chunk = next(body, None)
+        return {"type": "http.request", "body": chunk or b"", "more_body": chunk is not None}
+
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers}, receive)
+
+
+def receive(request: Request, upload_dir: str, max_size: int, max_files: int = 1):
+    async def run(func, *args):
+        return await asyncio.to_thread(func, *args)
+    return asyncio.run(receive_uploads(request, "file", upload_dir, max_size, max_files=max_files, run=run))
+
+
+def test_500mb_upload_streams_to_disk_with_bounded_memory(tmp_path):
+    chunks = 500
+    expected = hashlib.sha256()
+    for _ in range(chunks):
+        expected.update(PATTERN)
+
+    tracemalloc.start()
+    try:
+        uploads = receive(multipart_request([("file", "grande.pdf")], chunks), str(tmp_path), 600 * MB)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(uploads) == 1
+    upload = uploads[0]
+    assert upload.filename == "grande.pdf"
+    assert upload.size == chunks * MB
+    assert os.path.getsize(upload.path) == chunks * MB
+    assert upload.sha256 == expected.hexdigest()
+    # Solo unos pocos bloques de 1 MB en vuelo, nunca el archivo
+    assert peak < 16 * MB, f"pico de memoria {peak / MB:.1f} MB"
+
+
+def test_content_length_over_limit_is_rejected_before_reading(tmp_path):
+    request = multipart_request([("file", "grande.pdf")], 20)
+    with pytest.raises(HTTPException) as error:
+        receive(request, str(tmp_path), 10 * MB)
+    assert error.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_oversized_file_without_content_length_is_cut_and_removed(tmp_path):
+    request = multipart_request([("file", "grande.pdf")], 20, declared_length=False)
+    with pytest.raises(HTTPException) as error:
+        receive(request, str(tmp_path), 10 * MB)
+    assert error.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_multiple_files_and_unrelated_fields(tmp_path):
+    request = multipart_request([("file", "a.pdf"), ("otro", "b.pdf"), ("file", "c.pdf")], 2)
+    uploads = receive(request, str(tmp_path), 10 * MB, max_files=5)
+    assert [upload.filename for upload in uploads] == ["a.pdf", "c.pdf"]
+    assert all(upload.size == 2 * MB for upload in uploads)
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(upload.path) for upload in uploads)